@@ -57,6 +57,7 @@ INSTALLED_APPS = [
     'library',
     'crm',
     'docs',
+    'uploads',
     "corsheaders",
     "rest_framework",
     "rest_framework.authtoken",
@@ -141,6 +142,26 @@ else:
 
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
 
+
+# Cache
+# Shared Redis cache in production; per-process memory cache for CI + local development
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -188,7 +209,31 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
+# Media storage: "local" keeps uploads under MEDIA_ROOT and serves them
+# through utils.storage.LocalMediaStorage; "cloudinary" stores them there.
+MEDIA_STORAGE_BACKEND = os.getenv("MEDIA_STORAGE_BACKEND", "local")
+
+MEDIA_STORAGE_BACKENDS = {
+    "local": "utils.storage.LocalMediaStorage",
+    "cloudinary": "utils.cloud_storage.DirectCloudinaryStorage",
+}
+
+STORAGES = {
+    "default": {"BACKEND": MEDIA_STORAGE_BACKENDS[MEDIA_STORAGE_BACKEND]},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+# How LocalMediaStorage hands downloads to the front server: "" streams
+# them from Django, "x-sendfile" (Apache, lighttpd) or "x-accel-redirect"
+# (nginx, with an internal location mapped from MEDIA_ACCEL_PREFIX to
+# MEDIA_ROOT) lets it send the file itself.
+MEDIA_OFFLOAD = os.getenv("MEDIA_OFFLOAD", "")
+MEDIA_ACCEL_PREFIX = os.getenv("MEDIA_ACCEL_PREFIX", "/protected-media/")
+
+# Opt-in: keep earlier versions of text-like library files (CSV, JSON,
+# markdown...) as compressed deltas between periodic full snapshots
+# rather than full copies; see library.versions.
+LIBRARY_DELTA_VERSIONS = os.getenv("LIBRARY_DELTA_VERSIONS", "").lower() in ("1", "true", "yes")
 
 CLOUDINARY_STORAGE = {
     "CLOUD_NAME": os.environ.get("CLOUDINARY_CLOUD_NAME"),
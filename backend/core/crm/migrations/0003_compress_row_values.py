@@ -0,0 +1,45 @@
+"""
+Swap CRMRow.values to a CompressedJSONField through a new column copied
+in batches; see docs/migrations/0003_compress_content.py.
+"""
+from django.db import migrations
+
+import utils.fields
+
+
+def compress_values(apps, schema_editor):
+    utils.fields.copy_json_column(apps, "crm", "CRMRow", "values", "values_packed")
+
+
+def expand_values(apps, schema_editor):
+    utils.fields.copy_json_column(apps, "crm", "CRMRow", "values_packed", "values")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0002_crmcolumn_url_field_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='crmrow',
+            name='values_packed',
+            field=utils.fields.CompressedJSONField(null=True),
+        ),
+        migrations.RunPython(compress_values, expand_values),
+        migrations.RemoveField(
+            model_name='crmrow',
+            name='values',
+        ),
+        migrations.RenameField(
+            model_name='crmrow',
+            old_name='values_packed',
+            new_name='values',
+        ),
+        migrations.AlterField(
+            model_name='crmrow',
+            name='values',
+            field=utils.fields.CompressedJSONField(default=dict),
+        ),
+    ]
@@ -2,6 +2,8 @@ import uuid
 from django.db import models
 from django.conf import settings
 
+from utils.fields import CompressedJSONField
+
 
 class CRMSheet(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -52,7 +54,7 @@ class CRMColumn(models.Model):
 class CRMRow(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     sheet = models.ForeignKey(CRMSheet, on_delete=models.CASCADE, related_name="rows")
-    values = models.JSONField(default=dict)
+    values = CompressedJSONField(default=dict)
     order = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -0,0 +1,195 @@
+"""
+Helpers for BlockNote content — the list of blocks stored in Doc.content.
+
+A block is {"id", "type", "props", "content", "children"}: content is a
+list of inline items ({"type": "text", "text": ...}, links wrapping
+their own inline content) or, for tables, {"type": "tableContent",
+"rows": [{"cells": [...]}]}; children are nested blocks.
+
+plain_text() gives the text Doc.search_text indexes. apply_ops() edits
+content block by block for the docs block patch endpoint, so an
+autosave sends only the blocks that changed.
+"""
+
+
+def _inline_text(content):
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(_inline_text(item) for item in content)
+    if isinstance(content, dict):
+        if isinstance(content.get("text"), str):
+            return content["text"]
+        if content.get("type") == "tableContent":
+            return "\n".join(
+                " ".join(_inline_text(cell) for cell in row.get("cells", []))
+                for row in content.get("rows", []) if isinstance(row, dict)
+            )
+        return _inline_text(content.get("content"))
+    return ""
+
+
+def plain_text(blocks):
+    """The readable text of a block list, one line per block, for search."""
+    lines = []
+    for block in blocks if isinstance(blocks, list) else []:
+        if not isinstance(block, dict):
+            continue
+        text = _inline_text(block.get("content"))
+        if text:
+            lines.append(text)
+        nested = plain_text(block.get("children"))
+        if nested:
+            lines.append(nested)
+    return "\n".join(lines)
+
+
+# ── Block operations ──────────────────────────────────────────────────
+
+class PatchError(ValueError):
+    """A block operation that cannot be applied; the message is safe to show clients."""
+
+
+UPDATABLE_KEYS = {"type", "props", "content", "children"}
+
+
+def _ids(blocks):
+    """Ids of the blocks and all their descendants."""
+    found = []
+    for block in blocks if isinstance(blocks, list) else []:
+        if isinstance(block, dict):
+            if isinstance(block.get("id"), str):
+                found.append(block["id"])
+            found.extend(_ids(block.get("children")))
+    return found
+
+
+def _index(blocks, index=None):
+    """{id: (block, list holding it)} over the whole tree."""
+    index = {} if index is None else index
+    for block in blocks:
+        if isinstance(block, dict) and isinstance(block.get("id"), str):
+            index[block["id"]] = (block, blocks)
+            if isinstance(block.get("children"), list):
+                _index(block["children"], index)
+    return index
+
+
+def _find(index, block_id):
+    if block_id not in index:
+        raise PatchError(f"Block {block_id} not found")
+    return index[block_id]
+
+
+def _touch_parent(index, siblings, touched):
+    """Record the block whose children list is `siblings`; nothing at the top level."""
+    for block_id, (block, _) in index.items():
+        if block.get("children") is siblings:
+            touched.add(block_id)
+            return
+
+
+def _place(blocks, index, block, parent_id, after_id, touched):
+    """Insert `block` into the parent's children (top level if None), after a sibling or first."""
+    if parent_id is None:
+        siblings = blocks
+    else:
+        parent = _find(index, parent_id)[0]
+        if not isinstance(parent.get("children"), list):
+            parent["children"] = []
+        siblings = parent["children"]
+        touched.add(parent_id)  # Its children changed, so a stale rewrite of them must conflict
+    if after_id is None:
+        siblings.insert(0, block)
+        return
+    for position, sibling in enumerate(siblings):
+        if isinstance(sibling, dict) and sibling.get("id") == after_id:
+            siblings.insert(position + 1, block)
+            return
+    raise PatchError(f"Block {after_id} is not a sibling at that position")
+
+
+def _apply(blocks, op, touched):
+    kind = op.get("op")
+    for key in ("id", "parent", "after"):
+        if op.get(key) is not None and not isinstance(op[key], str):
+            raise PatchError(f"{key} must be a block id")
+    index = _index(blocks)
+    if kind == "insert":
+        block = op.get("block")
+        if not isinstance(block, dict) or not block.get("id") or not isinstance(block["id"], str):
+            raise PatchError("insert needs a block with an id")
+        new_ids = set(_ids([block]))
+        if new_ids & index.keys():
+            raise PatchError(f"Block {block['id']} already exists")
+        _place(blocks, index, block, op.get("parent"), op.get("after"), touched)
+        touched.update(new_ids)
+    elif kind == "update":
+        block = _find(index, op.get("id"))[0]
+        changes = op.get("block")
+        if not isinstance(changes, dict) or not changes or set(changes) - UPDATABLE_KEYS:
+            raise PatchError(f"update may only set {', '.join(sorted(UPDATABLE_KEYS))}")
+        if "children" in changes:
+            new_ids = set(_ids(changes["children"]))
+            if new_ids & (index.keys() - set(_ids(block.get("children")))):
+                raise PatchError("update children may not reuse ids from elsewhere in the doc")
+            touched.update(_ids(block.get("children")), new_ids)
+        block.update(changes)
+        touched.add(block["id"])
+    elif kind == "delete":
+        block, siblings = _find(index, op.get("id"))
+        siblings.remove(block)
+        touched.update(_ids([block]))
+        _touch_parent(index, siblings, touched)
+    elif kind == "move":
+        block, siblings = _find(index, op.get("id"))
+        subtree = set(_ids([block]))
+        if op.get("parent") in subtree or op.get("after") in subtree:
+            raise PatchError("A block cannot be moved into itself")
+        _touch_parent(index, siblings, touched)
+        siblings.remove(block)
+        _place(blocks, _index(blocks), block, op.get("parent"), op.get("after"), touched)
+        touched.add(block["id"])
+    else:
+        raise PatchError(f"Unknown operation {kind!r}")
+
+
+def apply_ops(blocks, ops):
+    """
+    Apply block operations to `blocks` in place, in order, and return the
+    set of block ids they changed. Operations address blocks by id:
+      {"op": "insert", "block": {...}, "parent": id|null, "after": id|null}
+      {"op": "update", "id": ..., "block": {"props": ..., "content": ...}}
+      {"op": "delete", "id": ...}
+      {"op": "move", "id": ..., "parent": id|null, "after": id|null}
+    parent null means the top level; after null means first among siblings.
+    Raises PatchError; `blocks` may then be partly changed.
+    """
+    touched = set()
+    for number, op in enumerate(ops):
+        if not isinstance(op, dict):
+            raise PatchError(f"Operation {number} is not an object")
+        try:
+            _apply(blocks, op, touched)
+        except PatchError as exc:
+            raise PatchError(f"Operation {number}: {exc}") from None
+    return touched
+
+
+def referenced_ids(ops, blocks=None):
+    """
+    Ids of existing blocks the operations act on or position against. With
+    the current `blocks`, a delete or an update that sets children also
+    references every descendant of its target, since it would drop them.
+    """
+    index = _index(blocks) if isinstance(blocks, list) else {}
+    ids = set()
+    for op in ops:
+        if isinstance(op, dict):
+            ids.update(op[key] for key in ("id", "parent", "after") if isinstance(op.get(key), str))
+            replaces = op.get("op") == "delete" or (
+                op.get("op") == "update" and isinstance(op.get("block"), dict) and "children" in op["block"]
+            )
+            if replaces and op.get("id") in index:
+                ids.update(_ids(index[op["id"]][0].get("children")))
+    return ids
@@ -0,0 +1,79 @@
+"""Measure what CompressedJSONField costs and saves, on synthetic and stored payloads."""
+import json
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from utils import fields
+
+COLUMNS = [
+    ("docs.Doc", "content"),
+    ("crm.CRMRow", "values"),
+    ("onboarding.OnboardingTemplate", "blocks"),
+    ("onboarding.OnboardingInstance", "responses"),
+    ("portal.ClientInvite", "onboarding_form"),
+]
+
+
+def _doc(blocks):
+    """BlockNote content of `blocks` paragraphs and headings."""
+    return [
+        {
+            "id": f"block-{i:05d}",
+            "type": "heading" if i % 10 == 0 else "paragraph",
+            "props": {"textColor": "default", "backgroundColor": "default", "textAlignment": "left"},
+            "content": [{"type": "text", "text": f"Section {i}: notes on deliverable {i % 37} for the client review.", "styles": {}}],
+            "children": [],
+        }
+        for i in range(blocks)
+    ]
+
+
+def _timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) / repeat * 1e6
+
+
+class Command(BaseCommand):
+    help = "Benchmark compressed JSON columns: bytes stored and encode/decode time against plain JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=50)
+        parser.add_argument("--sample", type=int, default=500, help="Stored rows to measure per column (0 to skip).")
+
+    def handle(self, *args, **options):
+        repeat = options["repeat"]
+        self.stdout.write(
+            f"{'payload':<28}{'json B':>10}{'stored B':>10}{'saved':>8}"
+            f"{'dumps us':>10}{'pack us':>10}{'loads us':>10}{'unpack us':>10}"
+        )
+        payloads = [(f"doc, {n} blocks", _doc(n)) for n in (1, 10, 100, 1000, 5000)]
+        payloads.append(("crm row, 12 cells", {f"col-{i}": f"value {i}" for i in range(12)}))
+        for label, value in payloads:
+            text, dumps_us = _timed(lambda: json.dumps(value), repeat)
+            _, loads_us = _timed(lambda: json.loads(text), repeat)
+            packed, pack_us = _timed(lambda: fields.pack(value), repeat)
+            _, unpack_us = _timed(lambda: fields.unpack(packed), repeat)
+            self._row(label, len(text.encode()), len(packed), dumps_us, pack_us, loads_us, unpack_us)
+
+        if options["sample"]:
+            self.stdout.write("")
+            for label, field in COLUMNS:
+                values = list(apps.get_model(label).objects.values_list(field, flat=True)[:options["sample"]])
+                if not values:
+                    continue
+                plain = sum(len(json.dumps(v, separators=(",", ":"), ensure_ascii=False).encode()) for v in values)
+                stored, pack_us = _timed(lambda: sum(len(fields.pack(v)) for v in values), 1)
+                self._row(f"{label}.{field} x{len(values)}", plain, stored, None, pack_us, None, None)
+
+    def _row(self, label, plain, stored, dumps_us, pack_us, loads_us, unpack_us):
+        def us(value):
+            return f"{value:>10.1f}" if value is not None else f"{'-':>10}"
+
+        saved = f"{(1 - stored / plain) * 100:.0f}%" if plain else "-"
+        self.stdout.write(
+            f"{label:<28}{plain:>10}{stored:>10}{saved:>8}{us(dumps_us)}{us(pack_us)}{us(loads_us)}{us(unpack_us)}"
+        )
@@ -0,0 +1,57 @@
+"""
+Swap Doc.content to a CompressedJSONField: add the new column, copy rows
+into it in batches (filling search_text on the way), then drop the JSON
+column and take its name. A type change in place is not possible on
+PostgreSQL (jsonb cannot be cast to bytea).
+"""
+from django.db import migrations, models
+
+import utils.fields
+
+
+def compress_content(apps, schema_editor):
+    from docs.blocks import plain_text
+
+    utils.fields.copy_json_column(
+        apps, "docs", "Doc", "content", "content_packed",
+        extra=lambda content: {"search_text": plain_text(content)},
+    )
+
+
+def expand_content(apps, schema_editor):
+    utils.fields.copy_json_column(apps, "docs", "Doc", "content_packed", "content")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('docs', '0002_docaccess'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='doc',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='doc',
+            name='content_packed',
+            field=utils.fields.CompressedJSONField(null=True),
+        ),
+        migrations.RunPython(compress_content, expand_content),
+        migrations.RemoveField(
+            model_name='doc',
+            name='content',
+        ),
+        migrations.RenameField(
+            model_name='doc',
+            old_name='content_packed',
+            new_name='content',
+        ),
+        migrations.AlterField(
+            model_name='doc',
+            name='content',
+            field=utils.fields.CompressedJSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-19 01:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('docs', '0003_compress_content'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='doc',
+            name='revision',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='DocRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField()),
+                ('block_ids', models.JSONField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('doc', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='docs.doc')),
+            ],
+            options={
+                'ordering': ['number'],
+                'unique_together': {('doc', 'number')},
+            },
+        ),
+    ]
@@ -2,6 +2,9 @@ import uuid
 from django.db import models
 from django.conf import settings
 
+from utils.fields import CompressedJSONField
+from .blocks import plain_text
+
 
 class Doc(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -26,7 +29,9 @@ class Doc(models.Model):
     )
     title = models.CharField(max_length=500, default="Untitled")
     icon = models.CharField(max_length=10, blank=True)
-    content = models.JSONField(default=list, blank=True)
+    content = CompressedJSONField(default=list, blank=True)
+    search_text = models.TextField(blank=True, default="", editable=False)  # Plain text of content, for search
+    revision = models.PositiveIntegerField(default=0)  # Bumped on every content change, see docs.revisions
     order = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -37,6 +42,30 @@ class Doc(models.Model):
     def __str__(self):
         return self.title or "Untitled"
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if "content" in self.__dict__ and (update_fields is None or "content" in update_fields):
+            self.search_text = plain_text(self.content)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "search_text"}
+        super().save(*args, **kwargs)
+
+
+class DocRevision(models.Model):
+    """Which blocks one revision of a doc's content changed; block_ids is null when it replaced it whole."""
+
+    doc = models.ForeignKey(Doc, on_delete=models.CASCADE, related_name="revisions")
+    number = models.PositiveIntegerField()
+    block_ids = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ["doc", "number"]
+        ordering = ["number"]
+
+    def __str__(self):
+        return f"{self.doc} r{self.number}"
+
 
 class DocAccess(models.Model):
     ROLE_CHOICES = [
@@ -0,0 +1,40 @@
+"""
+Doc revisions — the counter that lets block patches be based on a known
+version of a doc's content.
+
+Every content change bumps Doc.revision and logs a DocRevision with the
+ids of the blocks it changed (None for a whole-content save). A block
+patch based on an older revision can still be applied when none of the
+blocks it refers to changed since (changed_since()); the last
+HISTORY revisions per doc are kept for that.
+"""
+from django.conf import settings
+
+from .models import DocRevision
+
+HISTORY = getattr(settings, "DOCS_REVISION_HISTORY", 200)
+
+
+def record(doc, block_ids=None):
+    """Bump `doc`'s revision (its row must be locked) and log the blocks changed; None means all."""
+    doc.revision += 1
+    DocRevision.objects.create(
+        doc=doc, number=doc.revision, block_ids=sorted(block_ids) if block_ids is not None else None,
+    )
+    DocRevision.objects.filter(doc=doc, number__lte=doc.revision - HISTORY).delete()
+    return doc.revision
+
+
+def changed_since(doc, base_revision):
+    """Ids of blocks changed after `base_revision`, or None if unknown or the content was replaced."""
+    rows = list(
+        DocRevision.objects.filter(doc=doc, number__gt=base_revision).values_list("block_ids", flat=True)
+    )
+    if len(rows) != doc.revision - base_revision:  # Older than the history kept
+        return None
+    changed = set()
+    for block_ids in rows:
+        if block_ids is None:
+            return None
+        changed.update(block_ids)
+    return changed
@@ -23,8 +23,8 @@ class DocDetailSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Doc
-        fields = ["id", "title", "icon", "content", "parent", "project", "order", "created_at", "updated_at", "user_role"]
-        read_only_fields = ["id", "created_at", "updated_at", "user_role"]
+        fields = ["id", "title", "icon", "content", "revision", "parent", "project", "order", "created_at", "updated_at", "user_role"]
+        read_only_fields = ["id", "revision", "created_at", "updated_at", "user_role"]
 
     def get_user_role(self, obj):
         request = self.context.get("request")
@@ -40,6 +40,14 @@ class DocDetailSerializer(serializers.ModelSerializer):
             return "viewer"
 
 
+class DocBlockPatchSerializer(serializers.Serializer):
+    """Block operations against a known revision; see docs.blocks.apply_ops."""
+    MAX_OPS = 500
+
+    base_revision = serializers.IntegerField(min_value=0)
+    ops = serializers.ListField(child=serializers.DictField(), min_length=1, max_length=MAX_OPS)
+
+
 class DocCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Doc
@@ -1,3 +1,212 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from account.models import User
+from docs.models import Doc
+
+
+def paragraphs(count, text="Quarterly plan for the launch campaign"):
+    return [
+        {
+            "id": f"b{i}",
+            "type": "paragraph",
+            "props": {"textAlignment": "left"},
+            "content": [{"type": "text", "text": f"{text} #{i}", "styles": {}}],
+            "children": [],
+        }
+        for i in range(count)
+    ]
+
+
+class CompressedContentTest(TestCase):
+    """Doc.content is stored compressed past the size threshold and stays searchable."""
+
+    def setUp(self):
+        self.api = APIClient()
+        self.owner = User.objects.create_user(
+            email="creator@test.com",
+            full_name="Test Creator",
+            password="testpass123",
+            role="creator",
+        )
+        self.api.force_authenticate(self.owner)
+
+    def stored(self, doc):
+        from django.db import connection
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT content FROM docs_doc WHERE id = %s", [Doc._meta.pk.get_db_prep_value(doc.id, connection)],
+            )
+            return bytes(cursor.fetchone()[0])
+
+    def test_small_payloads_stay_raw_and_large_ones_compress(self):
+        from utils import fields
+
+        small = Doc.objects.create(owner=self.owner, content=paragraphs(1))
+        large = Doc.objects.create(owner=self.owner, content=paragraphs(200))
+
+        self.assertEqual(self.stored(small)[0], fields.FORMAT_RAW)
+        self.assertEqual(self.stored(large)[0], fields.FORMAT_ZLIB)
+        self.assertLess(len(self.stored(large)), len(fields.pack(large.content, min_bytes=10 ** 9)) / 5)
+        self.assertEqual(Doc.objects.get(id=large.id).content, paragraphs(200))
+
+        response = self.api.get(f"/api/v8/docs/{large.id}/")
+        self.assertEqual(response.data["content"], paragraphs(200))
+
+        with self.assertRaises(ValueError):
+            fields.unpack(b"\x07{}")
+
+    def test_search_reads_plain_text(self):
+        doc = Doc.objects.create(owner=self.owner, title="Plan", content=paragraphs(3))
+        self.assertIn("launch campaign #2", doc.search_text)
+
+        def found(query):
+            response = self.api.get(f"/api/v8/search/?q={query}")
+            return [item["id"] for item in response.data["docs"]]
+
+        self.assertEqual(found("campaign"), [str(doc.id)])
+        self.assertEqual(found("paragraph"), [])  # Block structure is not content
+
+        doc.content = paragraphs(1, text="Renamed brief")
+        doc.save(update_fields=["content"])
+        self.assertEqual(found("renamed"), [str(doc.id)])
+        self.assertEqual(found("campaign"), [])
+
+    def test_benchmark_command(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        Doc.objects.create(owner=self.owner, content=paragraphs(50))
+        out = StringIO()
+        call_command("benchmark_json_compression", "--repeat", "1", stdout=out)
+        self.assertIn("doc, 1000 blocks", out.getvalue())
+        self.assertIn("docs.Doc.content x1", out.getvalue())
+
+
+class DocBlockPatchTest(TestCase):
+    """Block patches edit stored content by id against a base revision."""
+
+    def setUp(self):
+        self.api = APIClient()
+        self.owner = User.objects.create_user(
+            email="creator@test.com",
+            full_name="Test Creator",
+            password="testpass123",
+            role="creator",
+        )
+        self.doc = Doc.objects.create(owner=self.owner, title="Plan", content=paragraphs(4))
+        self.doc.content[1]["children"] = [paragraphs(1, text="Nested")[0] | {"id": "b1-child"}]
+        self.doc.save()
+        self.url = f"/api/v8/docs/{self.doc.id}/blocks/"
+        self.api.force_authenticate(self.owner)
+
+    def patch(self, base_revision, *ops):
+        return self.api.patch(self.url, {"base_revision": base_revision, "ops": list(ops)}, format="json")
+
+    def edit(self, block_id, text):
+        return {"op": "update", "id": block_id, "block": {"content": [{"type": "text", "text": text, "styles": {}}]}}
+
+    def ids(self):
+        self.doc.refresh_from_db()
+        return [block["id"] for block in self.doc.content]
+
+    def test_operations_apply_by_id(self):
+        new_block = paragraphs(1, text="Inserted")[0] | {"id": "new"}
+        response = self.patch(
+            0,
+            self.edit("b0", "Edited intro"),
+            {"op": "insert", "block": new_block, "after": "b0"},
+            {"op": "move", "id": "b3", "parent": None, "after": None},
+            {"op": "delete", "id": "b1"},
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data, {"revision": 1, "rebased": False})
+
+        self.assertEqual(self.ids(), ["b3", "b0", "new", "b2"])
+        self.assertEqual(self.doc.content[1]["content"][0]["text"], "Edited intro")
+        self.assertEqual(self.doc.revision, 1)
+        self.assertIn("Edited intro", self.doc.search_text)
+        self.assertNotIn("Nested", self.doc.search_text)
+
+        response = self.patch(1, {"op": "move", "id": "b2", "parent": "b0", "after": None})
+        self.assertEqual(response.status_code, 200)
+        self.doc.refresh_from_db()
+        self.assertEqual([child["id"] for child in self.doc.content[1]["children"]], ["b2"])
+
+    def test_small_autosave_payload(self):
+        import json
+
+        self.doc.content = paragraphs(500)
+        self.doc.save()
+        body = {"base_revision": 0, "ops": [self.edit("b250", "Quarterly plan for the launch campaigns #250")]}
+        self.assertLess(len(json.dumps(body)), 300)
+        self.assertGreater(len(json.dumps({"content": self.doc.content})), 50_000)
+        response = self.api.patch(self.url, body, format="json")
+        self.assertEqual(response.status_code, 200)
+
+    def test_stale_revisions_rebase_or_conflict(self):
+        self.assertEqual(self.patch(0, self.edit("b0", "First")).status_code, 200)
+
+        # Based on revision 0 but touching a block nobody changed since: rebased
+        response = self.patch(0, self.edit("b2", "Elsewhere"))
+        self.assertEqual(response.data, {"revision": 2, "rebased": True})
+
+        # Touching a block changed since its base: rejected with the current state
+        response = self.patch(0, self.edit("b0", "Stale"))
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data["revision"], 2)
+        self.assertEqual(response.data["content"][0]["content"][0]["text"], "First")
+
+        # Anchoring on a changed block conflicts too
+        self.assertEqual(self.patch(1, {"op": "move", "id": "b3", "after": "b2"}).status_code, 409)
+
+        # A whole-content save changes everything
+        response = self.api.patch(f"/api/v8/docs/{self.doc.id}/", {"content": paragraphs(2)}, format="json")
+        self.assertEqual(response.data["revision"], 3)
+        self.assertEqual(self.patch(2, self.edit("b3", "Gone")).status_code, 409)
+        self.assertEqual(self.patch(3, self.edit("b1", "Current")).status_code, 200)
+
+    def test_stale_rewrites_of_changed_children_conflict(self):
+        nested = paragraphs(1, text="Added")[0] | {"id": "new"}
+        insert = {"op": "insert", "block": nested, "parent": "b1", "after": None}
+        self.assertEqual(self.patch(0, insert).status_code, 200)
+        self.assertEqual(self.patch(1, {"op": "move", "id": "b3", "parent": "b2", "after": None}).status_code, 200)
+
+        # Replacing b1's children from before the nested insert would drop "new"
+        rewrite = {"op": "update", "id": "b1", "block": {"children": []}}
+        self.assertEqual(self.patch(0, rewrite).status_code, 409)
+        # Deleting b2 from before b3 moved under it would drop b3
+        self.assertEqual(self.patch(1, {"op": "delete", "id": "b2"}).status_code, 409)
+        # Deleting b0, whose subtree nobody changed, still rebases
+        self.assertEqual(self.patch(1, {"op": "delete", "id": "b0"}).data, {"revision": 3, "rebased": True})
+
+        self.assertEqual(self.ids(), ["b1", "b2"])
+        self.assertEqual([child["id"] for child in self.doc.content[0]["children"]], ["new", "b1-child"])
+        self.assertEqual([child["id"] for child in self.doc.content[1]["children"]], ["b3"])
+
+    def test_invalid_patches(self):
+        self.assertEqual(self.patch(0, {"op": "rename", "id": "b0"}).status_code, 400)
+        self.assertEqual(self.patch(0, self.edit("missing", "x")).status_code, 400)
+        self.assertEqual(self.patch(0, {"op": "insert", "block": {"id": "b2"}, "after": None}).status_code, 400)
+        self.assertEqual(self.patch(0, {"op": "move", "id": "b1", "parent": "b1-child"}).status_code, 400)
+        self.assertEqual(self.patch(0, {"op": "update", "id": "b0", "block": {"id": "x"}}).status_code, 400)
+        self.assertEqual(self.patch(5, self.edit("b0", "x")).status_code, 400)
+        self.assertEqual(self.ids(), ["b0", "b1", "b2", "b3"])
+        self.assertEqual(self.doc.revision, 0)
+
+    def test_only_owners_and_editors_patch(self):
+        from docs.models import DocAccess
+
+        talent = User.objects.create_user(
+            email="talent@test.com",
+            full_name="Test Talent",
+            password="testpass123",
+            role="talent",
+        )
+        access = DocAccess.objects.create(doc=self.doc, user=talent, role="viewer")
+        self.api.force_authenticate(talent)
+        self.assertEqual(self.patch(0, self.edit("b0", "x")).status_code, 403)
+        access.role = "editor"
+        access.save()
+        self.assertEqual(self.patch(0, self.edit("b0", "x")).status_code, 200)
@@ -4,6 +4,7 @@ from . import views
 urlpatterns = [
     path("docs/", views.DocListCreateView.as_view(), name="doc-list-create"),
     path("docs/<uuid:pk>/", views.DocDetailView.as_view(), name="doc-detail"),
+    path("docs/<uuid:pk>/blocks/", views.DocBlockPatchView.as_view(), name="doc-block-patch"),
     path("docs/<uuid:pk>/children/", views.DocChildrenView.as_view(), name="doc-children"),
     path("docs/<uuid:pk>/access/", views.DocAccessListView.as_view(), name="doc-access-list"),
     path("docs/<uuid:pk>/access/<uuid:access_id>/", views.DocAccessDetailView.as_view(), name="doc-access-detail"),
@@ -2,11 +2,15 @@ from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
+from django.db import transaction
 from django.db.models import Q
 from django.contrib.auth import get_user_model
 
 from .models import Doc, DocAccess
-from .serializers import DocListSerializer, DocDetailSerializer, DocCreateSerializer, DocAccessSerializer
+from . import blocks, revisions
+from .serializers import (
+    DocListSerializer, DocDetailSerializer, DocCreateSerializer, DocAccessSerializer, DocBlockPatchSerializer,
+)
 
 User = get_user_model()
 ALLOWED_ROLES = {"creator", "talent"}
@@ -28,7 +32,7 @@ class DocListCreateView(generics.ListCreateAPIView):
     def get_queryset(self):
         user = self.request.user
         shared_ids = DocAccess.objects.filter(user=user).values_list("doc_id", flat=True)
-        qs = Doc.objects.filter(Q(owner=user) | Q(id__in=shared_ids))
+        qs = Doc.objects.filter(Q(owner=user) | Q(id__in=shared_ids)).defer("content", "search_text")
         if not self.request.query_params.get("all"):
             qs = qs.filter(parent=None)
         return qs
@@ -68,13 +72,79 @@ class DocDetailView(generics.RetrieveUpdateDestroyAPIView):
         kwargs["partial"] = True
         return self.update(request, *args, **kwargs)
 
+    def perform_update(self, serializer):
+        if "content" not in serializer.validated_data:
+            serializer.save()
+            return
+        with transaction.atomic():
+            locked = Doc.objects.select_for_update().only("id", "revision").get(id=serializer.instance.id)
+            revisions.record(locked)  # Whole content: any block may have changed
+            serializer.save(revision=locked.revision)
+
+
+class DocBlockPatchView(APIView):
+    """
+    PATCH /api/v8/docs/<id>/blocks/
+    Apply block operations to a doc's content, so autosaves send only what
+    changed: {"base_revision": n, "ops": [...]} (see docs.blocks.apply_ops).
+    Returns {"revision", "rebased"}. A patch based on an older revision is
+    rebased onto the current content when none of the blocks it refers to
+    changed since; otherwise 409 with the current revision and content.
+    """
+    permission_classes = [IsDocUser]
+
+    def patch(self, request, pk):
+        serializer = DocBlockPatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        base_revision = serializer.validated_data["base_revision"]
+        ops = serializer.validated_data["ops"]
+
+        with transaction.atomic():
+            doc = Doc.objects.select_for_update().filter(id=pk).first()
+            if doc is None:
+                return Response({"error": "Doc not found"}, status=status.HTTP_404_NOT_FOUND)
+            if doc.owner_id != request.user.pk and not DocAccess.objects.filter(
+                doc=doc, user=request.user, role="editor",
+            ).exists():
+                return Response({"error": "You cannot edit this document."}, status=status.HTTP_403_FORBIDDEN)
+            if base_revision > doc.revision:
+                return Response({"error": "Unknown base revision"}, status=status.HTTP_400_BAD_REQUEST)
+
+            rebased = base_revision < doc.revision
+            if rebased:
+                changed = revisions.changed_since(doc, base_revision)
+                if changed is None or changed & blocks.referenced_ids(ops, doc.content):
+                    return self._conflict(doc)
+
+            content = doc.content if isinstance(doc.content, list) else []
+            try:
+                touched = blocks.apply_ops(content, ops)
+            except blocks.PatchError as exc:
+                if rebased:
+                    doc.refresh_from_db(fields=["content"])  # Drop what the failed rebase applied
+                    return self._conflict(doc)
+                return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+            doc.content = content
+            revisions.record(doc, touched)
+            doc.save(update_fields=["content", "revision", "updated_at"])
+
+        return Response({"revision": doc.revision, "rebased": rebased})
+
+    @staticmethod
+    def _conflict(doc):
+        return Response(
+            {"error": "The doc has changed since base_revision", "revision": doc.revision, "content": doc.content},
+            status=status.HTTP_409_CONFLICT,
+        )
+
 
 class DocChildrenView(APIView):
     permission_classes = [IsDocUser]
 
     def get(self, request, pk):
         parent = get_object_or_404(Doc, id=pk, owner=request.user)
-        children = parent.children.all()
+        children = parent.children.defer("content", "search_text")
         return Response(DocListSerializer(children, many=True).data)
 
 
@@ -202,8 +272,8 @@ class GlobalSearchView(APIView):
 
         # ── Docs ──────────────────────────────────────────────────────────────
         doc_qs = Doc.objects.filter(owner=user).filter(
-            Q(title__icontains=query) | Q(content__icontains=query)
-        )[:8]
+            Q(title__icontains=query) | Q(search_text__icontains=query)
+        ).defer("content", "search_text")[:8]
         docs = [
             {
                 "type": "doc",
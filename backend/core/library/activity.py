@@ -0,0 +1,293 @@
+"""
+Library activity logger — buffered, batched DocumentActivity writes.
+
+Views call log() instead of DocumentActivity.objects.create(). Once the
+surrounding transaction commits, the event is stamped with the time it
+happened and added to a per-process buffer, which is written with a
+single bulk_create when:
+  - it holds LIBRARY_ACTIVITY_FLUSH_SIZE events, or
+  - its oldest event is LIBRARY_ACTIVITY_FLUSH_INTERVAL seconds old — a
+    daemon timer started with the first buffered event fires then, so an
+    idle worker does not sit on its events, or
+  - the activity log is read in this process (flush() before listing), or
+  - the process exits normally (atexit; gunicorn workers exit this way
+    on SIGTERM and graceful reloads).
+
+Buffers are per process: a read flushes only its own worker's events, and
+events buffered by other workers appear within FLUSH_INTERVAL seconds.
+
+Repeated VIEWED events by the same actor on the same document within
+LIBRARY_ACTIVITY_VIEW_DEDUP_SECONDS are dropped (0 keeps every view).
+
+Each flush also adds its events to two rollup tables in the same
+transaction — counts per document, day and action, and per document,
+actor and action — so summary() answers analytics queries from rows
+bounded by the date range rather than by the size of the log.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import F, Max, Sum, Value
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+
+from .models import Document, DocumentActivity, DocumentActivityDaily, DocumentActorActivity
+
+logger = logging.getLogger(__name__)
+
+FLUSH_SIZE = getattr(settings, "LIBRARY_ACTIVITY_FLUSH_SIZE", 200)
+FLUSH_INTERVAL = getattr(settings, "LIBRARY_ACTIVITY_FLUSH_INTERVAL", 10)
+MAX_BUFFER = FLUSH_SIZE * 50  # Events held back while the database is unreachable
+
+_lock = threading.Lock()
+_buffer = []
+_oldest = None  # Monotonic time the oldest buffered event was added
+_timer = None  # Pending interval flush, while the buffer is non-empty
+_last_viewed = {}  # (document_id, actor_id) -> monotonic time of the last recorded VIEWED
+
+
+def log(document, actor, action):
+    """Record one activity event."""
+    log_many([document], actor, action)
+
+
+def log_many(documents, actor, action):
+    """Record the same action by one actor on several documents."""
+    events = [
+        DocumentActivity(
+            document_id=doc.id,
+            actor_id=actor.id,
+            actor_role=actor.role,
+            action=action,
+            timestamp=timezone.now(),
+        )
+        for doc in documents
+    ]
+    if events:
+        # Work that is rolled back should leave no trace in the log
+        transaction.on_commit(lambda: _enqueue(events))
+
+
+def _enqueue(events):
+    global _oldest
+    tick = time.monotonic()
+    window = getattr(settings, "LIBRARY_ACTIVITY_VIEW_DEDUP_SECONDS", 300)
+    with _lock:
+        for event in events:
+            if event.action == "VIEWED" and window:
+                key = (event.document_id, event.actor_id)
+                last = _last_viewed.get(key)
+                if last is not None and tick - last < window:
+                    continue
+                _last_viewed[key] = tick
+            _buffer.append(event)
+        if _buffer and _oldest is None:
+            _oldest = tick
+        due = len(_buffer) >= FLUSH_SIZE or (_oldest is not None and tick - _oldest >= FLUSH_INTERVAL)
+        if _buffer and not due:
+            _schedule()
+    if due:
+        flush()
+
+
+def _schedule():
+    """Start the interval timer unless one is pending. Call with _lock held."""
+    global _timer
+    if _timer is None:
+        _timer = threading.Timer(max(FLUSH_INTERVAL - (time.monotonic() - _oldest), 0), _timed_flush)
+        _timer.daemon = True
+        _timer.start()
+
+
+def _timed_flush():
+    global _timer
+    with _lock:
+        _timer = None
+    try:
+        flush()
+    finally:
+        connection.close()  # This thread's own connection
+
+
+def flush():
+    """Write every buffered event now. Returns the number written."""
+    global _oldest, _timer
+    with _lock:
+        events = _buffer[:]
+        _buffer.clear()
+        _oldest = None
+        if _timer is not None:  # Nothing left for it to do
+            _timer.cancel()
+            _timer = None
+        _prune_views()
+    if not events:
+        return 0
+
+    try:
+        # Skip documents permanently deleted since their events were logged
+        live = set(
+            Document.objects.filter(id__in={e.document_id for e in events}).values_list("id", flat=True)
+        )
+        events = [e for e in events if e.document_id in live]
+        with transaction.atomic():
+            DocumentActivity.objects.bulk_create(events, batch_size=500)
+            roll_up(events)
+    except Exception as exc:
+        logger.error("Writing %d document activity events failed: %s", len(events), exc, exc_info=True)
+        with _lock:
+            room = MAX_BUFFER - len(_buffer)
+            if room > 0:
+                _buffer[:0] = events[-room:]
+                _oldest = _oldest or time.monotonic()
+                _schedule()  # Try again after another interval
+        return 0
+    return len(events)
+
+
+def _prune_views():
+    window = getattr(settings, "LIBRARY_ACTIVITY_VIEW_DEDUP_SECONDS", 300)
+    cutoff = time.monotonic() - window
+    for key in [k for k, seen in _last_viewed.items() if seen < cutoff]:
+        del _last_viewed[key]
+
+
+# ── Rollups ───────────────────────────────────────────────────────────
+
+# Actions reported by summary(), and the keys they are reported under
+SUMMARY_ACTIONS = {"VIEWED": "views", "DOWNLOADED": "downloads", "EDITED": "edits"}
+
+
+def _increment(model, key, count, last_at=None):
+    """Add `count` to the rollup row for `key`, creating it if needed."""
+    changes = {"count": F("count") + count}
+    if last_at is not None:
+        changes["last_at"] = Greatest("last_at", Value(last_at, output_field=models.DateTimeField()))
+    if model.objects.filter(**key).update(**changes):
+        return
+    extra = {"last_at": last_at} if last_at is not None else {}
+    try:
+        with transaction.atomic():
+            model.objects.create(**key, count=count, **extra)
+    except IntegrityError:  # Another process created it first
+        model.objects.filter(**key).update(**changes)
+
+
+def roll_up(events):
+    """Add written events to the rollup tables (one upsert per distinct key)."""
+    daily = Counter()
+    by_actor = {}
+    for e in events:
+        daily[(e.document_id, timezone.localdate(e.timestamp), e.action)] += 1
+        count, last_at = by_actor.get((e.document_id, e.actor_id, e.action), (0, e.timestamp))
+        by_actor[(e.document_id, e.actor_id, e.action)] = (count + 1, max(last_at, e.timestamp))
+
+    for (document_id, day, action), count in daily.items():
+        _increment(DocumentActivityDaily, {"document_id": document_id, "day": day, "action": action}, count)
+    for (document_id, actor_id, action), (count, last_at) in by_actor.items():
+        _increment(
+            DocumentActorActivity,
+            {"document_id": document_id, "actor_id": actor_id, "action": action},
+            count,
+            last_at,
+        )
+
+
+def rebuild_rollups():
+    """Recompute both rollup tables from the raw activity log."""
+    flush()
+    with transaction.atomic():
+        DocumentActivityDaily.objects.all().delete()
+        DocumentActorActivity.objects.all().delete()
+        DocumentActivityDaily.objects.bulk_create(
+            (
+                DocumentActivityDaily(document_id=row["document"], day=row["day"], action=row["action"], count=row["n"])
+                for row in DocumentActivity.objects.order_by()
+                .annotate(day=TruncDate("timestamp"))
+                .values("document", "day", "action")
+                .annotate(n=models.Count("id"))
+                .iterator()
+            ),
+            batch_size=1000,
+        )
+        DocumentActorActivity.objects.bulk_create(
+            (
+                DocumentActorActivity(
+                    document_id=row["document"], actor_id=row["actor"], action=row["action"],
+                    count=row["n"], last_at=row["last_at"],
+                )
+                for row in DocumentActivity.objects.order_by()
+                .values("document", "actor", "action")
+                .annotate(n=models.Count("id"), last_at=Max("timestamp"))
+                .iterator()
+            ),
+            batch_size=1000,
+        )
+
+
+def summary(documents, start, end):
+    """
+    Views, downloads and edits on `documents` (a Q over Document): totals
+    and one entry per day between two dates inclusive, plus all-time
+    totals per actor.
+    """
+    flush()  # This process's buffered events; other workers' land within FLUSH_INTERVAL
+    scope = models.Q(document__in=Document.objects.filter(documents).values("id"))
+    actions = list(SUMMARY_ACTIONS)
+    empty = dict.fromkeys(SUMMARY_ACTIONS.values(), 0)
+
+    days = {start + timedelta(days=n): dict(empty) for n in range((end - start).days + 1)}
+    rows = (
+        DocumentActivityDaily.objects.filter(scope, day__range=(start, end), action__in=actions)
+        .values("day", "action")
+        .annotate(n=Sum("count"))
+        .order_by()
+    )
+    totals = dict(empty)
+    for row in rows:
+        key = SUMMARY_ACTIONS[row["action"]]
+        days[row["day"]][key] += row["n"]
+        totals[key] += row["n"]
+
+    actors = {}
+    rows = (
+        DocumentActorActivity.objects.filter(scope, action__in=actions)
+        .values("actor", "actor__full_name", "action")
+        .annotate(n=Sum("count"), last=Max("last_at"))
+        .order_by()
+    )
+    for row in rows:
+        entry = actors.setdefault(row["actor"], {
+            "actor": row["actor"], "actor_name": row["actor__full_name"], **empty, "last_activity": row["last"],
+        })
+        entry[SUMMARY_ACTIONS[row["action"]]] = row["n"]
+        entry["last_activity"] = max(entry["last_activity"], row["last"])
+
+    return {
+        "start": start,
+        "end": end,
+        "totals": totals,
+        "daily": [{"day": day, **counts} for day, counts in days.items()],
+        "actors": sorted(actors.values(), key=lambda a: a["last_activity"], reverse=True),
+    }
+
+
+def pending():
+    """Number of events waiting to be written."""
+    with _lock:
+        return len(_buffer)
+
+
+def _forget_timer():
+    global _timer
+    _timer = None  # Timer threads don't survive fork; the child starts its own
+
+
+atexit.register(flush)
+os.register_at_fork(after_in_child=_forget_timer)
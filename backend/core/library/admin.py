@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Folder, Document, DocumentVersion, DocumentActivity, DocumentShareLink
+from .models import Folder, Document, DocumentVersion, DocumentActivity, DocumentShareLink, TrashPurgeRun, Tag
 
 
 @admin.register(Folder)
@@ -18,7 +18,7 @@ class DocumentAdmin(admin.ModelAdmin):
 
 @admin.register(DocumentVersion)
 class DocumentVersionAdmin(admin.ModelAdmin):
-    list_display = ["document", "version_number", "uploaded_by", "created_at"]
+    list_display = ["document", "version_number", "size_kb", "stored_kb", "chain_length", "uploaded_by", "created_at"]
     list_filter = ["created_at"]
 
 
@@ -35,3 +35,15 @@ class DocumentShareLinkAdmin(admin.ModelAdmin):
     list_filter = ["permission", "created_at"]
     search_fields = ["slug", "document__name"]
     readonly_fields = ["slug"]
+
+
+@admin.register(TrashPurgeRun)
+class TrashPurgeRunAdmin(admin.ModelAdmin):
+    list_display = ["started_at", "documents", "versions", "bytes_freed", "files_deleted", "file_errors"]
+    list_filter = ["started_at"]
+
+
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ["name", "creator", "created_at"]
+    search_fields = ["name", "creator__email"]
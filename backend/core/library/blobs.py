@@ -0,0 +1,147 @@
+"""
+Library blobs — content-addressed, reference-counted file storage.
+
+Uploads are hashed chunk by chunk (never read into memory whole) and
+stored once per distinct SHA-256 as a StoredBlob. Documents and their
+archived versions point at a blob and bump its ref_count; re-uploading
+identical bytes just takes another reference, with no storage write.
+
+References are dropped when a Document or DocumentVersion row is deleted
+(see library.signals). Once a blob has no references left, the row and
+its stored file are removed after the transaction commits; the
+collect_library_blobs command sweeps anything left behind. Bulk deleters
+(library.trash) gather released blobs with deferred_collection() and
+collect them in one pass instead.
+"""
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, F, OuterRef
+
+from .models import Document, DocumentVersion, StoredBlob
+
+
+def sha256_of(uploaded_file):
+    """Return (hex digest, size in bytes), streaming the file's chunks."""
+    precomputed = getattr(uploaded_file, "sha256", None)  # Set on uploads.services.ChunkedUpload
+    if precomputed:
+        return precomputed, uploaded_file.size
+    hasher = hashlib.sha256()
+    size = 0
+    for chunk in uploaded_file.chunks():
+        hasher.update(chunk)
+        size += len(chunk)
+    uploaded_file.seek(0)
+    return hasher.hexdigest(), size
+
+
+def _take_reference(digest):
+    """Add a reference to an existing blob; returns None if there is none."""
+    if not StoredBlob.objects.filter(sha256=digest).update(ref_count=F("ref_count") + 1):
+        return None
+    return StoredBlob.objects.get(sha256=digest)
+
+
+def store_upload(uploaded_file):
+    """
+    Return a StoredBlob holding this file's bytes, with one new reference
+    already counted for the caller. Known content is never re-uploaded.
+    """
+    digest, size = sha256_of(uploaded_file)
+    blob = _take_reference(digest)
+    if blob is not None:
+        return blob
+
+    extension = os.path.splitext(uploaded_file.name or "")[1].lower()[:16]
+    blob = StoredBlob(sha256=digest, size=size, ref_count=1)
+    blob.file.save(f"{digest}{extension}", uploaded_file, save=False)
+    try:
+        with transaction.atomic():
+            blob.save()
+    except IntegrityError:
+        # An identical upload committed first — use its blob, drop our copy
+        blob.file.storage.delete(blob.file.name)
+        blob = _take_reference(digest)
+        if blob is None:
+            raise
+    return blob
+
+
+_deferred = threading.local()
+
+
+@contextmanager
+def deferred_collection():
+    """
+    Inside this block, release() adds blob ids to the yielded set instead
+    of scheduling their collection; the caller collects them afterwards.
+    """
+    released = set()
+    previous = getattr(_deferred, "released", None)
+    _deferred.released = released
+    try:
+        yield released
+    finally:
+        _deferred.released = previous
+
+
+def release(blob_id):
+    """Drop one reference; the blob is collected after commit if it was the last."""
+    if blob_id is None:
+        return
+    StoredBlob.objects.filter(id=blob_id).update(ref_count=F("ref_count") - 1)
+    released = getattr(_deferred, "released", None)
+    if released is not None:
+        released.add(blob_id)
+    else:
+        transaction.on_commit(lambda: collect_garbage([blob_id]))
+
+
+def _unreferenced():
+    return StoredBlob.objects.filter(ref_count__lte=0).exclude(
+        Exists(Document.objects.filter(blob=OuterRef("pk"))),
+    ).exclude(
+        Exists(DocumentVersion.objects.filter(blob=OuterRef("pk"))),
+    )
+
+
+def _delete_files(storage, names):
+    for name in names:
+        storage.delete(name)
+
+
+def collect_garbage(blob_ids=None, batch_size=500, delete_files=_delete_files):
+    """
+    Delete blobs with no references, and their stored files.
+    Limit to blob_ids if given; returns the number of blobs removed.
+    delete_files(storage, names) removes the stored files.
+    """
+    qs = _unreferenced()
+    if blob_ids is not None:
+        qs = qs.filter(id__in=blob_ids)
+
+    with transaction.atomic():
+        doomed = list(
+            qs.select_for_update(skip_locked=True).values_list("id", "file")[:batch_size]
+        )
+        StoredBlob.objects.filter(id__in=[blob_id for blob_id, _ in doomed]).delete()
+
+    # Rows are gone, so nothing can take a new reference to these files
+    storage = StoredBlob._meta.get_field("file").storage
+    delete_files(storage, [name for _, name in doomed if name])
+    return len(doomed)
+
+
+def recount_references():
+    """Recompute ref_counts from the rows that point at each blob; returns blobs fixed."""
+    drifted = StoredBlob.objects.annotate(
+        actual=Count("documents", distinct=True) + Count("versions", distinct=True),
+    ).exclude(ref_count=F("actual")).values_list("id", "actual")
+    fixed = 0
+    for blob_id, actual in list(drifted):
+        StoredBlob.objects.filter(id=blob_id).update(ref_count=actual)
+        fixed += 1
+    return fixed
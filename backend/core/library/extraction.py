@@ -0,0 +1,283 @@
+"""
+Library text extraction — pulls plain text out of uploaded files for search.
+
+Documents are queued as DocumentText rows (status PENDING) when their file
+changes (see library.signals). Extraction never runs on the request path:
+after commit a background thread drains the queue, and the
+extract_library_text command does the same from cron or a worker dyno.
+
+Each batch is claimed in a short transaction, files are read and parsed
+on a bounded thread pool (storage I/O + parsing only, no DB access), and
+results are written back from the calling thread. A file whose SHA-256
+matches the last extraction is not parsed again.
+
+Supported: PDF, DOCX, TXT/MD/CSV and JSON. PDFs use pypdf when it is
+installed and a best-effort stream scanner otherwise.
+"""
+import hashlib
+import io
+import json
+import logging
+import re
+import threading
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from xml.etree import ElementTree
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import DocumentText
+from . import search
+
+logger = logging.getLogger(__name__)
+
+MAX_TEXT_CHARS = getattr(settings, "LIBRARY_EXTRACTION_MAX_CHARS", 200_000)
+MAX_FILE_BYTES = getattr(settings, "LIBRARY_EXTRACTION_MAX_BYTES", 25 * 1024 * 1024)
+# Cap on a DOCX's decompressed document.xml; a zip bomb is tiny on disk
+MAX_XML_BYTES = getattr(settings, "LIBRARY_EXTRACTION_MAX_XML_BYTES", 64 * 1024 * 1024)
+BATCH_SIZE = getattr(settings, "LIBRARY_EXTRACTION_BATCH_SIZE", 20)
+MAX_WORKERS = getattr(settings, "LIBRARY_EXTRACTION_WORKERS", 4)
+STALE_CLAIM_AFTER = timedelta(minutes=15)
+
+TEXT_EXTENSIONS = {".txt", ".md", ".markdown", ".csv"}
+
+
+class UnsupportedFile(Exception):
+    """The file type has no extractor."""
+
+
+class FileTooLarge(Exception):
+    """The file, or what it decompresses to, is over the extraction limits."""
+
+
+# ── Extractors ────────────────────────────────────────────────────────
+
+def _decode(data):
+    for encoding in ("utf-8-sig", "utf-16"):
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return data.decode("latin-1")
+
+
+def _extract_json(data):
+    """Keys and scalar values, one per line, so onboarding answers are searchable."""
+    try:
+        payload = json.loads(_decode(data))
+    except ValueError:
+        return _decode(data)
+
+    lines = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                lines.append(str(key))
+                walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+        elif node is not None:
+            lines.append(str(node))
+
+    walk(payload)
+    return "\n".join(lines)
+
+
+_WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+def _extract_docx(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        if archive.getinfo("word/document.xml").file_size > MAX_XML_BYTES:
+            raise FileTooLarge()
+        # The header's size can lie, so bound the read itself too
+        with archive.open("word/document.xml") as member:
+            xml = member.read(MAX_XML_BYTES + 1)
+        if len(xml) > MAX_XML_BYTES:
+            raise FileTooLarge()
+        root = ElementTree.fromstring(xml)
+    paragraphs = []
+    for paragraph in root.iter(f"{_WORD_NS}p"):
+        text = "".join(node.text or "" for node in paragraph.iter(f"{_WORD_NS}t"))
+        if text:
+            paragraphs.append(text)
+    return "\n".join(paragraphs)
+
+
+_PDF_STREAM_RE = re.compile(rb"stream\r?\n(.*?)\r?\nendstream", re.S)
+_PDF_TEXT_RE = re.compile(rb"\((?:\\.|[^\\)])*\)\s*Tj|\[(?:[^\]])*\]\s*TJ", re.S)
+_PDF_STRING_RE = re.compile(rb"\(((?:\\.|[^\\)])*)\)", re.S)
+
+
+def _scan_pdf(data):
+    """Fallback: inflate content streams and collect Tj/TJ string operands."""
+    chunks = []
+    for raw in _PDF_STREAM_RE.findall(data):
+        try:
+            stream = zlib.decompress(raw)
+        except zlib.error:
+            stream = raw
+        for op in _PDF_TEXT_RE.findall(stream):
+            for string in _PDF_STRING_RE.findall(op):
+                chunks.append(re.sub(rb"\\(.)", rb"\1", string).decode("latin-1"))
+    return " ".join(chunks)
+
+
+def _extract_pdf(data):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return _scan_pdf(data)
+    reader = PdfReader(io.BytesIO(data))
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def extract_text(name, content_type, data):
+    """Return plain text for a file, or raise UnsupportedFile."""
+    lowered = name.lower()
+    extension = lowered[lowered.rfind("."):] if "." in lowered else ""
+    content_type = (content_type or "").lower()
+
+    if extension == ".pdf" or content_type == "application/pdf":
+        return _extract_pdf(data)
+    if extension == ".docx" or "wordprocessingml" in content_type:
+        return _extract_docx(data)
+    if extension == ".json" or content_type == "application/json":
+        return _extract_json(data)
+    if extension in TEXT_EXTENSIONS or content_type.startswith("text/"):
+        return _decode(data)
+    raise UnsupportedFile(extension or content_type or "unknown")
+
+
+# ── Queue ─────────────────────────────────────────────────────────────
+
+def queue_document(document):
+    """Mark a document's text for (re-)extraction if its file has changed."""
+    file_name = document.file.name or ""
+    updated = DocumentText.objects.filter(document=document).exclude(
+        source_file=file_name,
+    ).update(source_file=file_name, status="PENDING", error="")
+    if not updated:
+        DocumentText.objects.get_or_create(
+            document=document,
+            defaults={"source_file": file_name},
+        )
+    transaction.on_commit(schedule_extraction)
+
+
+def _claim_batch(batch_size):
+    """Claim up to batch_size pending rows in one short transaction."""
+    DocumentText.objects.filter(
+        status="PROCESSING",
+        updated_at__lt=timezone.now() - STALE_CLAIM_AFTER,
+    ).update(status="PENDING")
+
+    with transaction.atomic():
+        rows = list(
+            DocumentText.objects.select_for_update(skip_locked=True, of=("self",))
+            .filter(status="PENDING")
+            .select_related("document__blob")
+            .order_by("updated_at")[:batch_size]
+        )
+        DocumentText.objects.filter(id__in=[row.id for row in rows]).update(status="PROCESSING")
+    return rows
+
+
+def _work(row):
+    """Runs on a pool thread: read, hash and (if changed) parse one file."""
+    document = row.document
+    if document.blob and document.blob.sha256 == row.content_hash and row.extracted_at:
+        return {"status": "DONE", "content_hash": row.content_hash, "unchanged": True}
+    try:
+        if document.size_kb * 1024 > MAX_FILE_BYTES:
+            raise FileTooLarge()
+        with document.file.open("rb") as fh:
+            data = fh.read(MAX_FILE_BYTES + 1)
+        if len(data) > MAX_FILE_BYTES:
+            raise FileTooLarge()
+        content_hash = hashlib.sha256(data).hexdigest()
+        if content_hash == row.content_hash and row.extracted_at:
+            return {"status": "DONE", "content_hash": content_hash, "unchanged": True}
+        text = extract_text(document.name, document.file_type, data)
+    except UnsupportedFile as exc:
+        return {"status": "UNSUPPORTED", "error": f"No extractor for {exc}"}
+    except FileTooLarge:
+        return {"status": "UNSUPPORTED", "error": "File too large to extract"}
+    except Exception as exc:  # Corrupt or unreadable file; keep the worker alive
+        logger.warning("Text extraction failed for document %s: %s", document.id, exc)
+        return {"status": "FAILED", "error": str(exc)[:255]}
+
+    text = " ".join(text.split())
+    return {
+        "status": "DONE",
+        "content_hash": content_hash,
+        "text": text[:MAX_TEXT_CHARS],
+        "truncated": len(text) > MAX_TEXT_CHARS,
+    }
+
+
+def process_batch(batch_size=BATCH_SIZE, max_workers=MAX_WORKERS):
+    """Extract one batch; returns the number of rows handled (0 when idle)."""
+    rows = _claim_batch(batch_size)
+    if not rows:
+        return 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(_work, rows))
+
+    now = timezone.now()
+    for row, result in zip(rows, results):
+        fields = {"status": result["status"], "error": result.get("error", "")}
+        if result["status"] == "DONE":
+            fields.update(content_hash=result["content_hash"], extracted_at=now)
+            if not result.get("unchanged"):
+                fields.update(text=result["text"], truncated=result["truncated"])
+                row.text = result["text"]
+        # update() rather than save(): the document may have been deleted meanwhile.
+        # Only while still ours: a re-upload re-queues the row for its new file.
+        written = DocumentText.objects.filter(
+            id=row.id, status="PROCESSING", source_file=row.source_file,
+        ).update(updated_at=now, **fields)
+        if written and result["status"] == "DONE":
+            search.update_content(row.document_id, row.text)
+    return len(rows)
+
+
+def process_pending(batch_size=BATCH_SIZE, max_workers=MAX_WORKERS, max_batches=None):
+    """Drain the queue batch by batch; returns the total rows handled."""
+    handled = batches = 0
+    while max_batches is None or batches < max_batches:
+        count = process_batch(batch_size, max_workers)
+        if not count:
+            break
+        handled += count
+        batches += 1
+    return handled
+
+
+_drain_lock = threading.Lock()
+
+
+def _drain():
+    try:
+        process_pending()
+    except Exception as exc:
+        logger.error("Background text extraction stopped: %s", exc, exc_info=True)
+    finally:
+        connection.close()  # This thread's own connection
+        _drain_lock.release()
+
+
+def schedule_extraction():
+    """Start a background drain unless one is already running in this process."""
+    if not getattr(settings, "LIBRARY_EXTRACTION_IN_BACKGROUND", True):
+        return
+    if not _drain_lock.acquire(blocking=False):
+        return
+    threading.Thread(target=_drain, daemon=True).start()
@@ -0,0 +1,95 @@
+"""
+Document listing — the filters, sort orders and keyset pages behind
+GET /api/v6/documents/.
+
+Every sort is a (key, id) pair so rows with equal keys still have a
+stable order, and the cursor is the last row's pair: a page is read by
+seeking past it on the matching (creator, is_deleted, key, id) index
+instead of counting off an OFFSET, so page 500 costs what page 1 does.
+Only the columns the library grid shows are loaded (LIST_FIELDS).
+"""
+import uuid
+from datetime import datetime, time, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from utils.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+# ?sort= value -> model field; a leading "-" sorts descending
+SORTS = {"name": "name", "updated": "updated_at", "size": "size_kb"}
+DEFAULT_SORT = "-updated"
+
+LIST_FIELDS = (
+    "id", "client_id", "folder_id", "folder__name",
+    "name", "file", "file_type", "size_kb",
+    "tags", "color_label", "is_locked", "previews",
+    "version", "created_at", "updated_at",
+)
+
+_PARSE = {"name": str, "updated_at": parse_datetime, "size_kb": float}
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def apply_filters(qs, params):
+    """Narrow `qs` by validated DocumentListQuerySerializer data."""
+    if params.get("file_type"):
+        # Full MIME types match exactly; a bare family such as "image/" matches by prefix
+        match = Q()
+        for value in params["file_type"]:
+            match |= Q(file_type__startswith=value) if value.endswith("/") else Q(file_type=value)
+        qs = qs.filter(match)
+    if params.get("client_id"):
+        qs = qs.filter(client_id=params["client_id"])
+    if params.get("color_label"):
+        qs = qs.filter(color_label=params["color_label"])
+    if params.get("is_locked") is not None:
+        qs = qs.filter(is_locked=params["is_locked"])
+    # Whole days in the server's time zone, both ends inclusive
+    if params.get("updated_from"):
+        qs = qs.filter(updated_at__gte=_day_start(params["updated_from"]))
+    if params.get("updated_to"):
+        qs = qs.filter(updated_at__lt=_day_start(params["updated_to"] + timedelta(days=1)))
+    if params.get("min_size_kb") is not None:
+        qs = qs.filter(size_kb__gte=params["min_size_kb"])
+    if params.get("max_size_kb") is not None:
+        qs = qs.filter(size_kb__lte=params["max_size_kb"])
+    return qs
+
+
+def page(qs, sort=DEFAULT_SORT, cursor=None, limit=50):
+    """
+    (documents, next_cursor) for one page of `qs` in `sort` order, starting
+    after `cursor`. next_cursor is None on the last page. Raises
+    InvalidCursor for a token that was not issued for this sort.
+    """
+    descending = sort.startswith("-")
+    field = SORTS[sort.lstrip("-")]
+    direction = "-" if descending else ""
+    qs = qs.only(*LIST_FIELDS).select_related("folder").order_by(direction + field, direction + "id")
+
+    if cursor:
+        raw_value, last_id = decode_cursor(cursor, 2)
+        try:
+            value = _PARSE[field](raw_value)
+            last_id = uuid.UUID(last_id)
+        except (AttributeError, TypeError, ValueError):
+            value = None
+        if value is None:
+            raise InvalidCursor("Invalid cursor")
+        after = "lt" if descending else "gt"
+        qs = qs.filter(
+            Q(**{f"{field}__{after}": value})
+            | Q(**{field: value, f"id__{after}": last_id})
+        )
+
+    rows = list(qs[:limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, field), last.id)
@@ -0,0 +1,29 @@
+"""Delete unreferenced library blobs and their stored files."""
+from django.core.management.base import BaseCommand
+
+from library import blobs
+
+
+class Command(BaseCommand):
+    help = "Garbage-collect Document Library blobs that no document or version references."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--recount",
+            action="store_true",
+            help="Recompute reference counts from the database first (run when uploads are quiet).",
+        )
+
+    def handle(self, *args, **options):
+        if options["recount"]:
+            fixed = blobs.recount_references()
+            self.stdout.write(f"Corrected {fixed} reference count(s).")
+
+        removed = 0
+        while True:
+            count = blobs.collect_garbage(batch_size=options["batch_size"])
+            removed += count
+            if count < options["batch_size"]:
+                break
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} blob(s)."))
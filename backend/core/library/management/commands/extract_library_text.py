@@ -0,0 +1,21 @@
+"""Drain the document text-extraction queue (for cron or a worker process)."""
+from django.core.management.base import BaseCommand
+
+from library import extraction
+
+
+class Command(BaseCommand):
+    help = "Extract searchable text from queued Document Library files."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=extraction.BATCH_SIZE)
+        parser.add_argument("--workers", type=int, default=extraction.MAX_WORKERS)
+        parser.add_argument("--max-batches", type=int, default=None)
+
+    def handle(self, *args, **options):
+        handled = extraction.process_pending(
+            batch_size=options["batch_size"],
+            max_workers=options["workers"],
+            max_batches=options["max_batches"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Processed {handled} document(s)."))
@@ -0,0 +1,33 @@
+"""Permanently delete documents that have been in the trash past the retention period."""
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from library import trash
+from library.models import TRASH_RETENTION
+
+
+class Command(BaseCommand):
+    help = "Purge expired Document Library trash, including versions and stored files."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=trash.BATCH_SIZE)
+        parser.add_argument("--workers", type=int, default=trash.MAX_WORKERS, help="Threads deleting stored files.")
+        parser.add_argument("--max-batches", type=int, default=None)
+        parser.add_argument("--dry-run", action="store_true", help="Only count what would be purged.")
+
+    def handle(self, *args, **options):
+        if options["dry_run"]:
+            count = trash.expired(timezone.now() - TRASH_RETENTION).count()
+            self.stdout.write(f"{count} trashed document(s) are past retention.")
+            return
+
+        run = trash.purge(
+            batch_size=options["batch_size"],
+            max_workers=options["workers"],
+            max_batches=options["max_batches"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Purged {run.documents} document(s) and {run.versions} version(s) in {run.batches} batch(es): "
+            f"{run.bytes_freed} bytes freed, {run.blobs_removed} blob(s) and {run.files_deleted} file(s) removed, "
+            f"{run.file_errors} deletion error(s)."
+        ))
@@ -0,0 +1,16 @@
+"""Recompute the document activity rollup tables from the raw activity log."""
+from django.core.management.base import BaseCommand
+
+from library import activity
+from library.models import DocumentActivityDaily, DocumentActorActivity
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-day and per-actor document activity counts from DocumentActivity."
+
+    def handle(self, *args, **options):
+        activity.rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {DocumentActivityDaily.objects.count()} daily and "
+            f"{DocumentActorActivity.objects.count()} per-actor rollup row(s)."
+        ))
@@ -0,0 +1,16 @@
+"""Resync the normalized tag tables from every document's tags list."""
+from django.core.management.base import BaseCommand
+
+from library import tags
+from library.models import DocumentTag, Tag
+
+
+class Command(BaseCommand):
+    help = "Rebuild Tag and DocumentTag rows from Document.tags."
+
+    def handle(self, *args, **options):
+        count = tags.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Synced {count} document(s): {Tag.objects.count()} tag(s), "
+            f"{DocumentTag.objects.count()} document tag(s)."
+        ))
@@ -0,0 +1,33 @@
+"""Rebuild the document search index from scratch, in batches."""
+from django.core.management.base import BaseCommand
+
+from library.models import Document, DocumentSearchEntry
+from library import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the Document Library search index for every live document."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        # Drop entries for documents that are gone or in the trash
+        stale, _ = DocumentSearchEntry.objects.filter(document__is_deleted=True).delete()
+
+        indexed = 0
+        batch = []
+        documents = Document.objects.filter(is_deleted=False).select_related("folder")
+        for doc in documents.iterator(chunk_size=batch_size):
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                indexed += search.index_documents(batch)
+                batch = []
+        if batch:
+            indexed += search.index_documents(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {indexed} document(s); removed {stale} stale entr(ies)."
+        ))
@@ -0,0 +1,23 @@
+"""Report how much storage delta-encoded document versions save."""
+from django.core.management.base import BaseCommand
+
+from library import versions
+from library.models import DocumentVersion
+
+
+class Command(BaseCommand):
+    help = "Show bytes represented, stored and saved by Document Library versions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--creator", help="Limit the report to one creator's documents (user id).")
+
+    def handle(self, *args, **options):
+        qs = DocumentVersion.objects.all()
+        if options["creator"]:
+            qs = qs.filter(document__creator_id=options["creator"])
+        report = versions.storage_report(qs)
+        self.stdout.write(
+            f"{report['versions']} version(s), {report['delta_versions']} stored as deltas: "
+            f"{report['size_bytes']} bytes represented in {report['stored_bytes']} stored."
+        )
+        self.stdout.write(self.style.SUCCESS(f"Saved {report['saved_bytes']} byte(s)."))
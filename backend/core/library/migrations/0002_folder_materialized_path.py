@@ -0,0 +1,45 @@
+# Generated by Django 5.2.6 on 2026-10-18 23:54
+
+from django.db import migrations, models
+
+
+def backfill_folder_paths(apps, schema_editor):
+    """Walk existing trees breadth-first, one query per level, and fill path/depth."""
+    Folder = apps.get_model("library", "Folder")
+
+    level = list(Folder.objects.filter(parent_folder__isnull=True))
+    depth = 0
+    while level:
+        for folder in level:
+            parent_path = getattr(folder, "_parent_path", "/")
+            folder.path = f"{parent_path}{folder.id.hex}/"
+            folder.depth = depth
+        Folder.objects.bulk_update(level, ["path", "depth"], batch_size=500)
+
+        paths = {folder.id: folder.path for folder in level}
+        children = list(Folder.objects.filter(parent_folder_id__in=list(paths)))
+        for child in children:
+            child._parent_path = paths[child.parent_folder_id]
+        level = children
+        depth += 1
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='folder',
+            name='depth',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='folder',
+            name='path',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=2048),
+        ),
+        migrations.RunPython(backfill_folder_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,150 @@
+# Generated by Django 5.2.6 on 2026-10-18 23:56
+
+import re
+import uuid
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE library_documentsearchentry ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(tags, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(folder_path, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX library_document_search_gin ON library_documentsearchentry USING GIN (search_vector)",
+]
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS library_document_search_gin",
+    "ALTER TABLE library_documentsearchentry DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE library_document_fts USING fts5(
+        name, tags, folder_path,
+        content='library_documentsearchentry', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER library_document_fts_ai AFTER INSERT ON library_documentsearchentry BEGIN
+        INSERT INTO library_document_fts(rowid, name, tags, folder_path)
+        VALUES (new.id, new.name, new.tags, new.folder_path);
+    END
+    """,
+    """
+    CREATE TRIGGER library_document_fts_ad AFTER DELETE ON library_documentsearchentry BEGIN
+        INSERT INTO library_document_fts(library_document_fts, rowid, name, tags, folder_path)
+        VALUES ('delete', old.id, old.name, old.tags, old.folder_path);
+    END
+    """,
+    """
+    CREATE TRIGGER library_document_fts_au AFTER UPDATE ON library_documentsearchentry BEGIN
+        INSERT INTO library_document_fts(library_document_fts, rowid, name, tags, folder_path)
+        VALUES ('delete', old.id, old.name, old.tags, old.folder_path);
+        INSERT INTO library_document_fts(rowid, name, tags, folder_path)
+        VALUES (new.id, new.name, new.tags, new.folder_path);
+    END
+    """,
+]
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS library_document_fts_ai",
+    "DROP TRIGGER IF EXISTS library_document_fts_ad",
+    "DROP TRIGGER IF EXISTS library_document_fts_au",
+    "DROP TABLE IF EXISTS library_document_fts",
+]
+
+
+def _sqlite_has_fts5(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return any("FTS5" in row[0] for row in cursor.fetchall())
+
+
+def install_native_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        statements = POSTGRES_FORWARD
+    elif vendor == "sqlite" and _sqlite_has_fts5(schema_editor):
+        statements = SQLITE_FORWARD
+    else:
+        return  # library.search falls back to substring matching
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def remove_native_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        statements = POSTGRES_REVERSE
+    elif vendor == "sqlite":
+        statements = SQLITE_REVERSE
+    else:
+        return
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def _terms(*values):
+    return " ".join(re.findall(r"[^\W_]+", " ".join(values).lower()))
+
+
+def backfill_search_entries(apps, schema_editor):
+    """Index every live document, resolving folder names from materialized paths."""
+    Folder = apps.get_model("library", "Folder")
+    Document = apps.get_model("library", "Document")
+    DocumentSearchEntry = apps.get_model("library", "DocumentSearchEntry")
+
+    names = dict(Folder.objects.values_list("id", "name"))
+    paths = dict(Folder.objects.values_list("id", "path"))
+
+    def folder_path(folder_id):
+        parts = [part for part in paths.get(folder_id, "").split("/") if part]
+        return " ".join(names.get(uuid.UUID(part), "") for part in parts)
+
+    batch = []
+    for doc in Document.objects.filter(is_deleted=False).iterator(chunk_size=1000):
+        tags = doc.tags if isinstance(doc.tags, list) else []
+        batch.append(DocumentSearchEntry(
+            document_id=doc.id,
+            creator_id=doc.creator_id,
+            client_id=doc.client_id,
+            name=_terms(doc.name),
+            tags=_terms(*[str(t) for t in tags]),
+            folder_path=_terms(folder_path(doc.folder_id)),
+        ))
+        if len(batch) >= 1000:
+            DocumentSearchEntry.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        DocumentSearchEntry.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0002_folder_materialized_path'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentSearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.TextField(blank=True)),
+                ('tags', models.TextField(blank=True)),
+                ('folder_path', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('client', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('creator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('document', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='search_entry', to='library.document')),
+            ],
+        ),
+        migrations.RunPython(install_native_index, remove_native_index),
+        migrations.RunPython(backfill_search_entries, migrations.RunPython.noop),
+    ]
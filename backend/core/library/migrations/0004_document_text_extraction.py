@@ -0,0 +1,158 @@
+# Generated by Django 5.2.6 on 2026-10-18 23:58
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+# The native search index from 0003 is rebuilt to cover the new content
+# column: SQLite remakes the table on AddField (dropping its triggers), and
+# the PostgreSQL generated tsvector cannot be altered in place.
+
+POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS library_document_search_gin",
+    "ALTER TABLE library_documentsearchentry DROP COLUMN IF EXISTS search_vector",
+]
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS library_document_fts_ai",
+    "DROP TRIGGER IF EXISTS library_document_fts_ad",
+    "DROP TRIGGER IF EXISTS library_document_fts_au",
+    "DROP TABLE IF EXISTS library_document_fts",
+]
+
+
+def _postgres_create(columns):
+    weights = ["A", "B", "C", "D"]
+    vector = " ||\n        ".join(
+        f"setweight(to_tsvector('simple', coalesce({column}, '')), '{weight}')"
+        for column, weight in zip(columns, weights)
+    )
+    return [
+        f"""
+        ALTER TABLE library_documentsearchentry ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+        {vector}
+        ) STORED
+        """,
+        "CREATE INDEX library_document_search_gin ON library_documentsearchentry USING GIN (search_vector)",
+    ]
+
+
+def _sqlite_create(columns):
+    names = ", ".join(columns)
+    new_values = ", ".join(f"new.{c}" for c in columns)
+    old_values = ", ".join(f"old.{c}" for c in columns)
+    return [
+        f"""
+        CREATE VIRTUAL TABLE library_document_fts USING fts5(
+            {names},
+            content='library_documentsearchentry', content_rowid='id'
+        )
+        """,
+        f"""
+        CREATE TRIGGER library_document_fts_ai AFTER INSERT ON library_documentsearchentry BEGIN
+            INSERT INTO library_document_fts(rowid, {names}) VALUES (new.id, {new_values});
+        END
+        """,
+        f"""
+        CREATE TRIGGER library_document_fts_ad AFTER DELETE ON library_documentsearchentry BEGIN
+            INSERT INTO library_document_fts(library_document_fts, rowid, {names})
+            VALUES ('delete', old.id, {old_values});
+        END
+        """,
+        f"""
+        CREATE TRIGGER library_document_fts_au AFTER UPDATE ON library_documentsearchentry BEGIN
+            INSERT INTO library_document_fts(library_document_fts, rowid, {names})
+            VALUES ('delete', old.id, {old_values});
+            INSERT INTO library_document_fts(rowid, {names}) VALUES (new.id, {new_values});
+        END
+        """,
+        "INSERT INTO library_document_fts(library_document_fts) VALUES ('rebuild')",
+    ]
+
+
+OLD_COLUMNS = ["name", "tags", "folder_path"]
+NEW_COLUMNS = ["name", "tags", "folder_path", "content"]
+
+
+def _native_vendor(schema_editor):
+    """Same rule as 0003: PostgreSQL, or SQLite built with FTS5; else None."""
+    connection = schema_editor.connection
+    if connection.vendor == "postgresql":
+        return "postgresql"
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA compile_options")
+            if any("FTS5" in row[0] for row in cursor.fetchall()):
+                return "sqlite"
+    return None
+
+
+def _run(schema_editor, statements):
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def drop_native_index(apps, schema_editor):
+    vendor = _native_vendor(schema_editor)
+    if vendor == "postgresql":
+        _run(schema_editor, POSTGRES_DROP)
+    elif vendor == "sqlite":
+        _run(schema_editor, SQLITE_DROP)
+
+
+def create_native_index(columns):
+    def forward(apps, schema_editor):
+        vendor = _native_vendor(schema_editor)
+        if vendor == "postgresql":
+            _run(schema_editor, _postgres_create(columns))
+        elif vendor == "sqlite":
+            _run(schema_editor, _sqlite_create(columns))
+    return forward
+
+
+def queue_existing_documents(apps, schema_editor):
+    """Queue every live document for extraction by the background worker."""
+    Document = apps.get_model("library", "Document")
+    DocumentText = apps.get_model("library", "DocumentText")
+
+    batch = []
+    for doc_id, file_name in Document.objects.filter(is_deleted=False).values_list("id", "file").iterator(chunk_size=1000):
+        batch.append(DocumentText(document_id=doc_id, source_file=file_name or ""))
+        if len(batch) >= 1000:
+            DocumentText.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        DocumentText.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0003_document_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_native_index, create_native_index(OLD_COLUMNS)),
+        migrations.AddField(
+            model_name='documentsearchentry',
+            name='content',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.CreateModel(
+            name='DocumentText',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('source_file', models.CharField(blank=True, max_length=500)),
+                ('content_hash', models.CharField(blank=True, db_index=True, max_length=64)),
+                ('text', models.TextField(blank=True)),
+                ('truncated', models.BooleanField(default=False)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('PROCESSING', 'Processing'), ('DONE', 'Done'), ('UNSUPPORTED', 'Unsupported'), ('FAILED', 'Failed')], db_index=True, default='PENDING', max_length=12)),
+                ('error', models.CharField(blank=True, max_length=255)),
+                ('extracted_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('document', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='extracted_text', to='library.document')),
+            ],
+        ),
+        migrations.RunPython(create_native_index(NEW_COLUMNS), drop_native_index),
+        migrations.RunPython(queue_existing_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 00:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0005_stored_blobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='previews',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
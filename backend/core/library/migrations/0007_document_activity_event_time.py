@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-19 00:23
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0006_document_previews'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='documentactivity',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
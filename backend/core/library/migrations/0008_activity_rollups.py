@@ -0,0 +1,44 @@
+# Generated by Django 5.2.6 on 2026-10-19 00:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0007_document_activity_event_time'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentActivityDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('action', models.CharField(choices=[('VIEWED', 'Viewed'), ('DOWNLOADED', 'Downloaded'), ('EDITED', 'Edited'), ('SHARED', 'Shared'), ('UPLOADED', 'Uploaded'), ('DELETED', 'Deleted'), ('RESTORED', 'Restored')], max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_activity', to='library.document')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day', 'action'], name='library_doc_day_ccecd7_idx')],
+                'constraints': [models.UniqueConstraint(fields=('document', 'day', 'action'), name='unique_document_day_action')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DocumentActorActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(choices=[('VIEWED', 'Viewed'), ('DOWNLOADED', 'Downloaded'), ('EDITED', 'Edited'), ('SHARED', 'Shared'), ('UPLOADED', 'Uploaded'), ('DELETED', 'Deleted'), ('RESTORED', 'Restored')], max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('last_at', models.DateTimeField()),
+                ('actor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='document_activity_totals', to=settings.AUTH_USER_MODEL)),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='actor_activity', to='library.document')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('document', 'actor', 'action'), name='unique_document_actor_action')],
+            },
+        ),
+    ]
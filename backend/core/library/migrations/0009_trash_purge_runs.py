@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-19 00:35
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0008_activity_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrashPurgeRun',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField()),
+                ('cutoff', models.DateTimeField()),
+                ('batches', models.PositiveIntegerField(default=0)),
+                ('documents', models.PositiveIntegerField(default=0)),
+                ('versions', models.PositiveIntegerField(default=0)),
+                ('bytes_freed', models.BigIntegerField(default=0)),
+                ('blobs_removed', models.PositiveIntegerField(default=0)),
+                ('files_deleted', models.PositiveIntegerField(default=0)),
+                ('file_errors', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.6 on 2026-10-19 00:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_document_tags(apps, schema_editor):
+    """Create Tag/DocumentTag rows from every document's tags list, a batch at a time."""
+    from library.tags import clean, normalize
+
+    Document = apps.get_model("library", "Document")
+    Tag = apps.get_model("library", "Tag")
+    DocumentTag = apps.get_model("library", "DocumentTag")
+
+    tag_ids = {}  # (creator_id, key) → tag id
+    documents = Document.objects.exclude(tags=[]).only("id", "creator_id", "tags").order_by("id")
+    batch = []
+
+    def flush():
+        wanted = {}
+        for document in batch:
+            for name in clean(document.tags if isinstance(document.tags, list) else []):
+                key, name = normalize(name)
+                wanted.setdefault((document.creator_id, key), name)
+        new = [Tag(creator_id=creator_id, key=key, name=name)
+               for (creator_id, key), name in wanted.items() if (creator_id, key) not in tag_ids]
+        Tag.objects.bulk_create(new, ignore_conflicts=True)
+        for creator_id in {creator_id for creator_id, _ in wanted}:
+            for tag_id, key in Tag.objects.filter(creator_id=creator_id).values_list("id", "key"):
+                tag_ids[(creator_id, key)] = tag_id
+        links = [
+            DocumentTag(document_id=document.id, tag_id=tag_ids[(document.creator_id, normalize(name)[0])])
+            for document in batch
+            for name in clean(document.tags if isinstance(document.tags, list) else [])
+        ]
+        DocumentTag.objects.bulk_create(links, ignore_conflicts=True, batch_size=500)
+        batch.clear()
+
+    for document in documents.iterator(chunk_size=500):
+        batch.append(document)
+        if len(batch) >= 500:
+            flush()
+    flush()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0009_trash_purge_runs'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('key', models.CharField(max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('creator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='library_tags', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DocumentTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_links', to='library.document')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='document_links', to='library.tag')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='tag',
+            constraint=models.UniqueConstraint(fields=('creator', 'key'), name='unique_library_tag_key'),
+        ),
+        migrations.AddIndex(
+            model_name='documenttag',
+            index=models.Index(fields=['tag', 'document'], name='library_doc_tag_id_e14d06_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='documenttag',
+            constraint=models.UniqueConstraint(fields=('document', 'tag'), name='unique_document_tag'),
+        ),
+        migrations.RunPython(backfill_document_tags, migrations.RunPython.noop),
+    ]
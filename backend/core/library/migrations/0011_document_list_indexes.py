@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-19 01:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0010_document_tags'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['creator', 'is_deleted', 'updated_at', 'id'], name='library_doc_list_updated'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['creator', 'is_deleted', 'name', 'id'], name='library_doc_list_name'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['creator', 'is_deleted', 'size_kb', 'id'], name='library_doc_list_size'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['client', 'is_deleted', 'updated_at', 'id'], name='library_doc_client_updated'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.6 on 2026-10-19 01:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_stored_size(apps, schema_editor):
+    """Every existing version is a full copy: it stores what it represents."""
+    DocumentVersion = apps.get_model("library", "DocumentVersion")
+    DocumentVersion.objects.update(stored_kb=F("size_kb"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('library', '0011_document_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentversion',
+            name='base',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='dependents', to='library.documentversion'),
+        ),
+        migrations.AddField(
+            model_name='documentversion',
+            name='chain_length',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='documentversion',
+            name='delta',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='documentversion',
+            name='stored_kb',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='documentversion',
+            name='file',
+            field=models.FileField(blank=True, upload_to='library/versions/'),
+        ),
+        migrations.RunPython(fill_stored_size, migrations.RunPython.noop),
+    ]
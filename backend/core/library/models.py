@@ -3,10 +3,39 @@ Library models — Document Library with folders, versioning, sharing, and activ
 """
 import uuid
 import secrets
-from django.db import models
+from datetime import timedelta
+from django.db import models, transaction
+from django.db.models.functions import Coalesce, Concat, Substr
 from django.conf import settings
 from django.utils import timezone
 
+# How long a soft-deleted document stays recoverable before purge_library_trash removes it
+TRASH_RETENTION = timedelta(days=30)
+
+
+class FolderQuerySet(models.QuerySet):
+    def with_counts(self):
+        """
+        Annotate live document and direct subfolder counts in the same query.
+        Each is a correlated subquery over its own index, so a folder's
+        documents and subfolders are never joined against each other.
+        """
+        def count(queryset, field):
+            counted = queryset.filter(**{field: models.OuterRef("pk")}).order_by().values(field)
+            return Coalesce(
+                models.Subquery(counted.annotate(n=models.Count("pk")).values("n")),
+                0,
+            )
+
+        return self.annotate(
+            active_document_count=count(Document.objects.filter(is_deleted=False), "folder"),
+            direct_subfolder_count=count(Folder.objects.all(), "parent_folder"),
+        )
+
+    def subtree_of(self, folder):
+        """The folder itself plus every descendant, via a path prefix match."""
+        return self.filter(path__startswith=folder.path)
+
 
 class Folder(models.Model):
     """
@@ -43,14 +72,71 @@ class Folder(models.Model):
         blank=True,
         related_name="client_folders",
     )
+    # Materialized path of ancestor ids, root first: "/<root hex>/<child hex>/".
+    # Built from ids (not names), so renames never touch it; moves rewrite
+    # the moved subtree in one UPDATE (see save()).
+    path = models.CharField(max_length=2048, db_index=True, editable=False, default="")
+    depth = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = FolderQuerySet.as_manager()
+
     class Meta:
         ordering = ["name"]
 
     def __str__(self):
         return f"{self.name} ({self.folder_type})"
 
+    def _build_path(self):
+        if self.parent_folder_id is None:
+            return f"/{self.id.hex}/"
+        return f"{self.parent_folder.path}{self.id.hex}/"
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "parent_folder" not in update_fields:
+            return super().save(*args, **kwargs)
+
+        old_path, old_depth = self.path, self.depth
+        self.path = self._build_path()
+        self.depth = self.path.count("/") - 2
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "path", "depth"}
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if old_path and old_path != self.path:
+                # Re-root every descendant under the new prefix in one statement
+                Folder.objects.filter(path__startswith=old_path).exclude(id=self.id).update(
+                    path=Concat(
+                        models.Value(self.path),
+                        Substr("path", len(old_path) + 1),
+                        output_field=models.CharField(),
+                    ),
+                    depth=models.F("depth") + (self.depth - old_depth),
+                )
+
+    @property
+    def ancestor_ids(self):
+        """Ids of every ancestor, root first (excludes this folder)."""
+        return [uuid.UUID(part) for part in self.path.strip("/").split("/")[:-1]]
+
+    def is_descendant_of(self, other):
+        return self.id != other.id and self.path.startswith(other.path)
+
+    def breadcrumbs(self):
+        """Root-to-self chain of folders, resolved in a single query."""
+        ids = self.ancestor_ids
+        ancestors = list(Folder.objects.filter(id__in=ids).order_by("depth")) if ids else []
+        return ancestors + [self]
+
+    def move_to(self, new_parent):
+        """Re-parent this folder (None for root), carrying its whole subtree."""
+        if new_parent is not None and (new_parent.id == self.id or new_parent.is_descendant_of(self)):
+            raise ValueError("A folder cannot be moved into itself or its own subfolder.")
+        self.parent_folder = new_parent
+        self.save(update_fields=["parent_folder"])
+
     @classmethod
     def create_client_folder_structure(cls, creator, client_user):
         """
@@ -78,6 +164,25 @@ class Folder(models.Model):
         return root
 
 
+class StoredBlob(models.Model):
+    """
+    Content-addressed file in storage, shared by every Document and
+    DocumentVersion whose bytes hash to the same SHA-256.
+    ref_count is maintained by library.blobs; a blob with no references
+    left is garbage-collected (row and stored file).
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to="library/blobs/")
+    size = models.BigIntegerField(default=0)
+    ref_count = models.IntegerField(default=0, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ref_count} refs)"
+
+
 class Document(models.Model):
     """
     File record in the Document Library.
@@ -105,6 +210,13 @@ class Document(models.Model):
     )
     name = models.CharField(max_length=255)
     file = models.FileField(upload_to="library/")
+    blob = models.ForeignKey(
+        StoredBlob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="documents",
+    )
     file_type = models.CharField(max_length=100, blank=True)
     size_kb = models.FloatField(default=0)
     tags = models.JSONField(default=list, blank=True)
@@ -113,11 +225,19 @@ class Document(models.Model):
     is_deleted = models.BooleanField(default=False)
     deleted_at = models.DateTimeField(null=True, blank=True)
     version = models.IntegerField(default=1)
+    previews = models.JSONField(default=dict, blank=True)  # Thumbnail/preview paths, see uploads.derivatives
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-updated_at"]
+        indexes = [
+            # Document list sort orders, each seekable by (key, id) — see library.listing
+            models.Index(fields=["creator", "is_deleted", "updated_at", "id"], name="library_doc_list_updated"),
+            models.Index(fields=["creator", "is_deleted", "name", "id"], name="library_doc_list_name"),
+            models.Index(fields=["creator", "is_deleted", "size_kb", "id"], name="library_doc_list_size"),
+            models.Index(fields=["client", "is_deleted", "updated_at", "id"], name="library_doc_client_updated"),
+        ]
 
     def __str__(self):
         return f"{self.name} (v{self.version})"
@@ -135,11 +255,59 @@ class Document(models.Model):
         self.save(update_fields=["is_deleted", "deleted_at"])
 
 
+class Tag(models.Model):
+    """
+    A creator's library tag. `key` is the normalized form (whitespace
+    collapsed, casefolded) that matching and uniqueness go by; `name`
+    keeps the spelling the tag was first used with. Document.tags stays
+    the editable list; library.tags keeps DocumentTag rows in step with it.
+    """
+
+    creator = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="library_tags",
+    )
+    name = models.CharField(max_length=100)
+    key = models.CharField(max_length=100)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["name"]
+        constraints = [
+            models.UniqueConstraint(fields=["creator", "key"], name="unique_library_tag_key"),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class DocumentTag(models.Model):
+    """Join row: `document` carries `tag`. Maintained by library.tags; never edited directly."""
+
+    document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name="tag_links")
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name="document_links")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["document", "tag"], name="unique_document_tag"),
+        ]
+        indexes = [models.Index(fields=["tag", "document"])]  # Tag filters: tag → documents
+
+    def __str__(self):
+        return f"{self.document_id} #{self.tag_id}"
+
+
 class DocumentVersion(models.Model):
     """
     Tracks previous versions of a document when re-uploaded.
     The current version is always the Document record itself;
     this table stores prior versions.
+
+    A version is either a full copy (file/blob) or, for text-like files
+    with LIBRARY_DELTA_VERSIONS on, a compressed delta against its base
+    version (see library.versions). stored_kb is what it occupies in
+    storage; size_kb is always the size of the file it represents.
     """
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -149,9 +317,26 @@ class DocumentVersion(models.Model):
         related_name="versions",
     )
     version_number = models.IntegerField()
-    file = models.FileField(upload_to="library/versions/")
+    file = models.FileField(upload_to="library/versions/", blank=True)
+    blob = models.ForeignKey(
+        StoredBlob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="versions",
+    )
+    base = models.ForeignKey(
+        "self",
+        on_delete=models.RESTRICT,  # Only goes with the whole document
+        null=True,
+        blank=True,
+        related_name="dependents",
+    )
+    delta = models.BinaryField(null=True, blank=True, editable=False)
+    chain_length = models.PositiveSmallIntegerField(default=0)  # Deltas applied to reach this version
     file_type = models.CharField(max_length=100, blank=True)
     size_kb = models.FloatField(default=0)
+    stored_kb = models.FloatField(default=0)
     uploaded_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.SET_NULL,
@@ -166,6 +351,10 @@ class DocumentVersion(models.Model):
     def __str__(self):
         return f"{self.document.name} v{self.version_number}"
 
+    @property
+    def is_delta(self):
+        return self.base_id is not None
+
 
 class DocumentActivity(models.Model):
     """
@@ -195,7 +384,8 @@ class DocumentActivity(models.Model):
     )
     actor_role = models.CharField(max_length=10)
     action = models.CharField(max_length=20, choices=ACTION_CHOICES)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the event happens, not when the buffered row is written (see library.activity)
+    timestamp = models.DateTimeField(default=timezone.now)
 
     class Meta:
         ordering = ["-timestamp"]
@@ -204,6 +394,51 @@ class DocumentActivity(models.Model):
         return f"{self.actor.email} {self.action} {self.document.name}"
 
 
+class DocumentActivityDaily(models.Model):
+    """
+    Rollup: how many times each action happened to a document per day.
+    Maintained by library.activity as events are written.
+    """
+
+    document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name="daily_activity")
+    day = models.DateField()
+    action = models.CharField(max_length=20, choices=DocumentActivity.ACTION_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["document", "day", "action"], name="unique_document_day_action"),
+        ]
+        indexes = [models.Index(fields=["day", "action"])]
+
+    def __str__(self):
+        return f"{self.document_id} {self.day} {self.action}={self.count}"
+
+
+class DocumentActorActivity(models.Model):
+    """
+    Rollup: how many times each actor performed each action on a document.
+    Maintained by library.activity as events are written.
+    """
+
+    document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name="actor_activity")
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="document_activity_totals",
+    )
+    action = models.CharField(max_length=20, choices=DocumentActivity.ACTION_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+    last_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["document", "actor", "action"], name="unique_document_actor_action"),
+        ]
+
+    def __str__(self):
+        return f"{self.document_id} {self.actor_id} {self.action}={self.count}"
+
 class DocumentShareLink(models.Model):
     """
     Time-limited sharing links per document.
@@ -248,3 +483,96 @@ class DocumentShareLink(models.Model):
 
     def __str__(self):
         return f"Share: {self.document.name} ({self.permission}) - {self.slug}"
+
+
+class DocumentSearchEntry(models.Model):
+    """
+    Search index row for a live (non-deleted) document.
+    Holds normalized, space-separated terms for the name, tags, folder
+    path and extracted file text (see DocumentText); the database indexes them natively (tsvector + GIN on PostgreSQL,
+    an FTS5 table on SQLite — installed by migration 0003, see library.search).
+    Maintained by library.signals; never edited directly.
+    The integer primary key doubles as the FTS5 rowid, so it must stay stable.
+    """
+
+    document = models.OneToOneField(
+        Document,
+        on_delete=models.CASCADE,
+        related_name="search_entry",
+    )
+    creator = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    client = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    name = models.TextField(blank=True)
+    tags = models.TextField(blank=True)
+    folder_path = models.TextField(blank=True)
+    content = models.TextField(blank=True, default="")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Search entry: {self.name}"
+
+
+class DocumentText(models.Model):
+    """
+    Plain text extracted from a document's current file, for search.
+    Filled off the request path by library.extraction; content_hash lets
+    a re-upload of identical bytes skip extraction.
+    """
+
+    STATUS_CHOICES = (
+        ("PENDING", "Pending"),
+        ("PROCESSING", "Processing"),
+        ("DONE", "Done"),
+        ("UNSUPPORTED", "Unsupported"),
+        ("FAILED", "Failed"),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    document = models.OneToOneField(
+        Document,
+        on_delete=models.CASCADE,
+        related_name="extracted_text",
+    )
+    source_file = models.CharField(max_length=500, blank=True)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
+    text = models.TextField(blank=True)
+    truncated = models.BooleanField(default=False)
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default="PENDING", db_index=True)
+    error = models.CharField(max_length=255, blank=True)
+    extracted_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Text of {self.document.name} ({self.status})"
+
+
+class TrashPurgeRun(models.Model):
+    """Metrics for one run of the purge_library_trash command."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    cutoff = models.DateTimeField()  # Documents trashed before this were purged
+    batches = models.PositiveIntegerField(default=0)
+    documents = models.PositiveIntegerField(default=0)
+    versions = models.PositiveIntegerField(default=0)
+    bytes_freed = models.BigIntegerField(default=0)  # Logical size of the purged documents and versions
+    blobs_removed = models.PositiveIntegerField(default=0)
+    files_deleted = models.PositiveIntegerField(default=0)
+    file_errors = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-started_at"]
+
+    def __str__(self):
+        return f"Trash purge {self.started_at:%Y-%m-%d %H:%M}: {self.documents} document(s)"
@@ -0,0 +1,200 @@
+"""
+Library search — ranked full-text search over DocumentSearchEntry rows.
+
+The entry table is indexed natively (migrations 0003/0004):
+  - PostgreSQL: generated, weighted tsvector column
+                (name > tags > folder > file content) + GIN
+  - SQLite:     external-content FTS5 table kept in sync by triggers
+  - otherwise:  plain substring matching over the entry columns
+Entries are written here and kept current by library.signals; file
+content arrives later from library.extraction.
+"""
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from .models import Folder, Document, DocumentSearchEntry, DocumentText
+
+FTS_TABLE = "library_document_fts"
+MAX_QUERY_TERMS = 8
+MAX_CONTENT_CHARS = 100_000
+
+_TERM_RE = re.compile(r"[^\W_]+")
+_fts5_available = None
+
+
+def normalize_terms(*values):
+    """Lower-case word tokens joined by spaces; splits on punctuation and underscores."""
+    return " ".join(_TERM_RE.findall(" ".join(values).lower()))
+
+
+def search_backend():
+    """Which native index this database offers: 'postgres', 'fts5' or 'basic'."""
+    global _fts5_available
+    if connection.vendor == "postgresql":
+        return "postgres"
+    if connection.vendor == "sqlite":
+        if _fts5_available is None:
+            _fts5_available = FTS_TABLE in connection.introspection.table_names()
+        return "fts5" if _fts5_available else "basic"
+    return "basic"
+
+
+# ── Index maintenance ─────────────────────────────────────────────────
+
+def folder_display_paths(folders):
+    """Map folder id → space-joined names from root to folder, in one query."""
+    ancestor_ids = {ancestor_id for folder in folders for ancestor_id in folder.ancestor_ids}
+    names = dict(Folder.objects.filter(id__in=ancestor_ids).values_list("id", "name"))
+    names.update({folder.id: folder.name for folder in folders})
+    return {
+        folder.id: " ".join(names.get(fid, "") for fid in [*folder.ancestor_ids, folder.id])
+        for folder in folders
+    }
+
+
+def _entry_values(document, folder_path):
+    tags = document.tags if isinstance(document.tags, list) else []
+    return {
+        "creator_id": document.creator_id,
+        "client_id": document.client_id,
+        "name": normalize_terms(document.name),
+        "tags": normalize_terms(*[str(tag) for tag in tags]),
+        "folder_path": normalize_terms(folder_path),
+    }
+
+
+def index_document(document):
+    """Upsert the entry for a document, or drop it once the document is deleted."""
+    if document.is_deleted:
+        remove_document(document.id)
+        return
+    folder_path = folder_display_paths([document.folder])[document.folder_id]
+    DocumentSearchEntry.objects.update_or_create(
+        document_id=document.id,
+        defaults=_entry_values(document, folder_path),
+    )
+
+
+def remove_document(document_id):
+    DocumentSearchEntry.objects.filter(document_id=document_id).delete()
+
+
+def index_documents(documents):
+    """Bulk (re)index live documents; used for folder renames/moves and rebuilds."""
+    documents = [doc for doc in documents if not doc.is_deleted]
+    if not documents:
+        return 0
+
+    paths = folder_display_paths({doc.folder for doc in documents})
+    doc_ids = [doc.id for doc in documents]
+    existing = dict(
+        DocumentSearchEntry.objects.filter(document_id__in=doc_ids).values_list("document_id", "id")
+    )
+    texts = dict(
+        DocumentText.objects.filter(document_id__in=doc_ids, status="DONE").values_list("document_id", "text")
+    )
+
+    to_create, to_update = [], []
+    for doc in documents:
+        entry = DocumentSearchEntry(
+            document_id=doc.id,
+            content=content_terms(texts.get(doc.id, "")),
+            **_entry_values(doc, paths[doc.folder_id]),
+        )
+        if doc.id in existing:
+            entry.id = existing[doc.id]
+            to_update.append(entry)
+        else:
+            to_create.append(entry)
+
+    DocumentSearchEntry.objects.bulk_create(to_create, batch_size=500)
+    DocumentSearchEntry.objects.bulk_update(
+        to_update, ["creator_id", "client_id", "name", "tags", "folder_path", "content"], batch_size=500,
+    )
+    return len(documents)
+
+
+def content_terms(text):
+    return normalize_terms(text[:MAX_CONTENT_CHARS])
+
+
+def update_content(document_id, text):
+    """Feed extracted file text into an existing entry (see library.extraction)."""
+    DocumentSearchEntry.objects.filter(document_id=document_id).update(content=content_terms(text))
+
+
+def reindex_folder(folder):
+    """Refresh entries for every live document under a renamed or moved folder."""
+    documents = Document.objects.filter(
+        folder__path__startswith=folder.path,
+        is_deleted=False,
+    ).select_related("folder")
+    return index_documents(documents)
+
+
+# ── Querying ──────────────────────────────────────────────────────────
+
+def search_documents(query, *, creator=None, client=None, offset=0, limit=20):
+    """
+    Return (document_ids, has_more) for the best matches, best first.
+    Every query term is prefix-matched and all terms must match.
+    Scope with creator= or client=.
+    """
+    terms = normalize_terms(query).split()[:MAX_QUERY_TERMS]
+    if not terms:
+        return [], False
+
+    qs = DocumentSearchEntry.objects.all()
+    if creator is not None:
+        qs = qs.filter(creator=creator)
+    if client is not None:
+        qs = qs.filter(client=client)
+
+    backend = search_backend()
+    if backend == "postgres":
+        tsquery = " & ".join(f"{term}:*" for term in terms)
+        qs = qs.alias(
+            matched=RawSQL(
+                "library_documentsearchentry.search_vector @@ to_tsquery('simple', %s)",
+                (tsquery,),
+                output_field=BooleanField(),
+            ),
+        ).filter(matched=True).annotate(
+            rank=RawSQL(
+                "ts_rank(library_documentsearchentry.search_vector, to_tsquery('simple', %s))",
+                (tsquery,),
+                output_field=FloatField(),
+            ),
+        ).order_by("-rank", "-updated_at")
+    elif backend == "fts5":
+        match = " AND ".join(f'"{term}"*' for term in terms)
+        qs = qs.alias(
+            matched=RawSQL(
+                f"library_documentsearchentry.id IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)",
+                (match,),
+                output_field=BooleanField(),
+            ),
+        ).filter(matched=True).annotate(
+            # bm25() is lower-is-better; weights follow name > tags > folder > content
+            rank=RawSQL(
+                f"(SELECT bm25({FTS_TABLE}, 10.0, 5.0, 2.0, 1.0) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND rowid = library_documentsearchentry.id)",
+                (match,),
+                output_field=FloatField(),
+            ),
+        ).order_by("rank", "-updated_at")
+    else:
+        for term in terms:
+            qs = qs.filter(
+                Q(name__icontains=term)
+                | Q(tags__icontains=term)
+                | Q(folder_path__icontains=term)
+                | Q(content__icontains=term)
+            )
+        qs = qs.order_by("-updated_at")
+
+    ids = list(qs.values_list("document_id", flat=True)[offset:offset + limit + 1])
+    return ids[:limit], len(ids) > limit
@@ -1,8 +1,13 @@
 """
 Library serializers — request/response schemas for Document Library views.
 """
+from datetime import timedelta
+
+from django.utils import timezone
 from rest_framework import serializers
+from uploads.derivatives import derivative_url
 from .models import Folder, Document, DocumentVersion, DocumentActivity, DocumentShareLink
+from . import listing, tags
 
 
 # ── Folder Serializers ────────────────────────────────────────────────
@@ -18,17 +23,35 @@ class FolderSerializer(serializers.ModelSerializer):
             "id", "creator", "parent_folder", "name",
             "folder_type", "client",
             "document_count", "subfolder_count",
+            "path", "depth",
             "created_at",
         ]
-        read_only_fields = ["id", "creator", "created_at"]
+        read_only_fields = ["id", "creator", "path", "depth", "created_at"]
 
+    # Prefer the Folder.objects.with_counts() annotations; fall back to
+    # querying for folders that were just created or fetched without them.
     def get_document_count(self, obj):
+        if hasattr(obj, "active_document_count"):
+            return obj.active_document_count
         return obj.documents.filter(is_deleted=False).count()
 
     def get_subfolder_count(self, obj):
+        if hasattr(obj, "direct_subfolder_count"):
+            return obj.direct_subfolder_count
         return obj.subfolders.count()
 
 
+class FolderTreeSerializer(FolderSerializer):
+    """Folder node with its nested children, built by FolderTreeView."""
+    children = serializers.SerializerMethodField()
+
+    class Meta(FolderSerializer.Meta):
+        fields = FolderSerializer.Meta.fields + ["children"]
+
+    def get_children(self, obj):
+        return FolderTreeSerializer(obj.tree_children, many=True).data
+
+
 class FolderCreateSerializer(serializers.Serializer):
     """Input schema for creating a folder."""
     name = serializers.CharField(max_length=255)
@@ -45,17 +68,32 @@ class FolderRenameSerializer(serializers.Serializer):
     name = serializers.CharField(max_length=255)
 
 
+class FolderMoveSerializer(serializers.Serializer):
+    """Input schema for moving a folder (null parent moves it to the root)."""
+    parent_folder_id = serializers.UUIDField(allow_null=True)
+
+
+class FolderBreadcrumbSerializer(serializers.ModelSerializer):
+    """Minimal ancestor entry for breadcrumb trails."""
+
+    class Meta:
+        model = Folder
+        fields = ["id", "name", "depth"]
+
+
 # ── Document Serializers ──────────────────────────────────────────────
 
 class DocumentSerializer(serializers.ModelSerializer):
     """Full document representation."""
     folder_name = serializers.CharField(source="folder.name", read_only=True)
+    thumbnail_url = serializers.SerializerMethodField()
+    preview_url = serializers.SerializerMethodField()
 
     class Meta:
         model = Document
         fields = [
             "id", "creator", "client", "folder", "folder_name",
-            "name", "file", "file_type", "size_kb",
+            "name", "file", "thumbnail_url", "preview_url", "file_type", "size_kb",
             "tags", "color_label", "is_locked",
             "is_deleted", "deleted_at",
             "version", "created_at", "updated_at",
@@ -65,14 +103,74 @@ class DocumentSerializer(serializers.ModelSerializer):
             "version", "created_at", "updated_at",
         ]
 
+    def get_thumbnail_url(self, obj):
+        return derivative_url(obj, "thumbnail", self.context.get("request"))
+
+    def get_preview_url(self, obj):
+        return derivative_url(obj, "preview", self.context.get("request"))
+
+
+class DocumentListItemSerializer(DocumentSerializer):
+    """Grid row for the document list: DocumentSerializer without the fields the grid never shows."""
+
+    class Meta(DocumentSerializer.Meta):
+        fields = [
+            "id", "client", "folder", "folder_name",
+            "name", "file", "thumbnail_url", "file_type", "size_kb",
+            "tags", "color_label", "is_locked",
+            "version", "created_at", "updated_at",
+        ]
+
+
+class DocumentListQuerySerializer(serializers.Serializer):
+    """Query parameters for the document list; comma-separated file_type values match any."""
+    SORT_CHOICES = [key for name in listing.SORTS for key in (name, f"-{name}")]
+
+    folder_id = serializers.UUIDField(required=False)
+    client_id = serializers.UUIDField(required=False)
+    file_type = serializers.CharField(required=False)
+    color_label = serializers.CharField(max_length=50, required=False)
+    is_locked = serializers.BooleanField(required=False, allow_null=True, default=None)
+    updated_from = serializers.DateField(required=False)
+    updated_to = serializers.DateField(required=False)
+    min_size_kb = serializers.FloatField(required=False, min_value=0)
+    max_size_kb = serializers.FloatField(required=False, min_value=0)
+    sort = serializers.ChoiceField(choices=SORT_CHOICES, required=False, default=listing.DEFAULT_SORT)
+
+    def validate_file_type(self, value):
+        return [part.strip() for part in value.split(",") if part.strip()]
+
+    def validate(self, attrs):
+        if attrs.get("updated_from") and attrs.get("updated_to") and attrs["updated_from"] > attrs["updated_to"]:
+            raise serializers.ValidationError("updated_from must not be after updated_to.")
+        low, high = attrs.get("min_size_kb"), attrs.get("max_size_kb")
+        if low is not None and high is not None and low > high:
+            raise serializers.ValidationError("min_size_kb must not exceed max_size_kb.")
+        return attrs
+
+
+def _clean_tags(value):
+    if not isinstance(value, list) or not all(isinstance(tag, (str, int, float)) for tag in value):
+        raise serializers.ValidationError("Tags must be a list of strings.")
+    return tags.clean(value)
+
 
 class DocumentUploadSerializer(serializers.Serializer):
-    """Input schema for uploading a file."""
-    file = serializers.FileField()
+    """Input schema for uploading a file (multipart, or a completed chunked upload)."""
+    file = serializers.FileField(required=False)
+    upload_id = serializers.UUIDField(required=False)
     folder_id = serializers.UUIDField()
     tags = serializers.JSONField(required=False, default=list)
     color_label = serializers.CharField(max_length=50, required=False, allow_blank=True)
 
+    def validate_tags(self, value):
+        return _clean_tags(value)
+
+    def validate(self, attrs):
+        if not attrs.get("file") and not attrs.get("upload_id"):
+            raise serializers.ValidationError("Either a file or an upload_id is required.")
+        return attrs
+
 
 class DocumentUpdateSerializer(serializers.Serializer):
     """Input schema for updating document metadata."""
@@ -82,10 +180,24 @@ class DocumentUpdateSerializer(serializers.Serializer):
     is_locked = serializers.BooleanField(required=False)
     created_at = serializers.DateTimeField(required=False, help_text="Manually overridable date")
 
+    def validate_tags(self, value):
+        return _clean_tags(value)
 
-class DocumentReuploadSerializer(serializers.Serializer):
+
+class DocumentReuploadSerializer(DocumentUploadSerializer):
     """Input schema for re-uploading a new version of a file."""
-    file = serializers.FileField()
+    folder_id = None
+    tags = None
+    color_label = None
+
+
+class DocumentDownloadSerializer(serializers.Serializer):
+    """Input schema for downloading a selection of documents as a ZIP."""
+    document_ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        min_length=1,
+        max_length=1000,
+    )
 
 
 # ── Version Serializer ────────────────────────────────────────────────
@@ -98,7 +210,7 @@ class DocumentVersionSerializer(serializers.ModelSerializer):
         model = DocumentVersion
         fields = [
             "id", "document", "version_number",
-            "file", "file_type", "size_kb",
+            "file", "file_type", "size_kb", "stored_kb", "is_delta",
             "uploaded_by", "uploaded_by_name",
             "created_at",
         ]
@@ -118,6 +230,23 @@ class DocumentActivitySerializer(serializers.ModelSerializer):
         ]
 
 
+class ActivityRangeSerializer(serializers.Serializer):
+    """Query parameters for activity analytics; defaults to the last 30 days."""
+    MAX_DAYS = 366
+
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        end = attrs.get("end") or timezone.localdate()
+        start = attrs.get("start") or end - timedelta(days=29)
+        if start > end:
+            raise serializers.ValidationError("start must not be after end.")
+        if (end - start).days >= self.MAX_DAYS:
+            raise serializers.ValidationError(f"The range may span at most {self.MAX_DAYS} days.")
+        return {"start": start, "end": end}
+
+
 # ── Share Link Serializers ────────────────────────────────────────────
 
 class DocumentShareLinkSerializer(serializers.ModelSerializer):
@@ -159,3 +288,16 @@ class DocumentSearchSerializer(serializers.Serializer):
     tags = serializers.JSONField()
     color_label = serializers.CharField(allow_null=True)
     updated_at = serializers.DateTimeField()
+
+
+# ── Tag Serializers ───────────────────────────────────────────────────
+
+class TagFacetQuerySerializer(serializers.Serializer):
+    """Scope for tag facet counts: a folder subtree, a client, or the whole library."""
+    folder_id = serializers.UUIDField(required=False)
+    client_id = serializers.UUIDField(required=False)
+
+    def validate(self, attrs):
+        if attrs.get("folder_id") and attrs.get("client_id"):
+            raise serializers.ValidationError("Give either folder_id or client_id, not both.")
+        return attrs
@@ -0,0 +1,153 @@
+"""
+Public share links — cached lookups and signed download URLs.
+
+SharedDocumentPublicView answers from a cached entry per slug, so repeat
+visits to a link never touch the database. An entry lives until the
+link's expires_at (bounded by SHARE_CACHE_TIMEOUT) and is dropped when
+the link is revoked or changed, or its document is saved — a re-upload,
+rename or trash (see library.signals). A document save just replaces the
+document's generation token in the cache; entries cached under an older
+token are rebuilt on their next hit. Unknown slugs are cached briefly
+too, so a bad link cannot be used to hammer the database.
+
+Instead of the raw storage URL, the payload carries a signed URL for
+SharedDocumentDownloadView. The signature names the slug, the stored
+file and an expiry rounded up to the next SIGNED_URL_TTL boundary: the
+URL is valid for at least SIGNED_URL_TTL seconds, identical for every
+visitor within that window (so the payload and its ETag stay stable and
+cacheable), and useless after a re-upload or revocation.
+"""
+import hashlib
+import json
+import math
+import time
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.urls import reverse
+
+from .models import DocumentShareLink
+
+SHARE_CACHE_TIMEOUT = getattr(settings, "LIBRARY_SHARE_CACHE_TIMEOUT", 60 * 60 * 24)
+MISSING_CACHE_TIMEOUT = 60
+SIGNED_URL_TTL = getattr(settings, "LIBRARY_SHARE_URL_TTL", 300)
+_SALT = "library.share-download"
+
+
+def _key(slug):
+    return f"library:share:{slug}"
+
+
+def _generation_key(document_id):
+    return f"library:share-generation:{document_id}"
+
+
+def _build(slug):
+    link = DocumentShareLink.objects.select_related("document").filter(slug=slug).first()
+    if link is None:
+        return {"status": "missing"}
+    doc = link.document
+    return {
+        "status": "ok",
+        "document_id": str(doc.id),
+        "generation": cache.get(_generation_key(doc.id)),
+        "file": doc.file.name or "",
+        "expires_at": link.expires_at.timestamp(),
+        "data": json.loads(json.dumps({
+            "name": doc.name,
+            "file_type": doc.file_type,
+            "size_kb": doc.size_kb,
+            "permission": link.permission,
+            "expires_at": link.expires_at,
+        }, cls=DjangoJSONEncoder)),
+    }
+
+
+def get_link(slug):
+    """
+    The cached entry for a share link: {"status": "missing"}, or a dict
+    with status "ok", document_id, file, expires_at (epoch seconds) and
+    the public payload as "data". Expired links keep status "ok"; see
+    is_expired().
+    """
+    entry = cache.get(_key(slug))
+    if entry is not None and (
+        entry["status"] == "missing"
+        or entry["generation"] == cache.get(_generation_key(entry["document_id"]))
+    ):
+        return entry
+
+    entry = _build(slug)
+    if entry["status"] == "missing":
+        cache.set(_key(slug), entry, MISSING_CACHE_TIMEOUT)
+        return entry
+
+    remaining = entry["expires_at"] - time.time()
+    if remaining > 0:
+        cache.set(_key(slug), entry, min(math.ceil(remaining), SHARE_CACHE_TIMEOUT))
+    return entry
+
+
+def is_expired(entry):
+    return entry["expires_at"] <= time.time()
+
+
+def invalidate_link(slug):
+    cache.delete(_key(slug))
+
+
+def invalidate_document(document_id):
+    """Make every cached share link entry for a document stale, without looking them up."""
+    cache.set(_generation_key(document_id), uuid.uuid4().hex, None)
+
+
+# ── Signed download URLs ──────────────────────────────────────────────
+
+def _url_expiry(now=None):
+    """The end of the current SIGNED_URL_TTL window, plus one more window."""
+    now = now if now is not None else time.time()
+    return (math.floor(now / SIGNED_URL_TTL) + 2) * SIGNED_URL_TTL
+
+
+def sign_download(slug, entry, now=None):
+    """(token, expiry epoch seconds) for downloading the link's current file."""
+    expires = _url_expiry(now)
+    token = signing.dumps({"s": slug, "f": entry["file"], "e": expires}, salt=_SALT, compress=True)
+    return token, expires
+
+
+def check_download(slug, token, entry):
+    """Return None if `token` grants a download of the link's current file, else an error message."""
+    try:
+        claims = signing.loads(token, salt=_SALT)
+    except signing.BadSignature:
+        return "Invalid download link"
+    if claims.get("s") != slug:
+        return "Invalid download link"
+    if claims.get("e", 0) <= time.time():
+        return "This download link has expired"
+    if claims.get("f") != entry["file"]:
+        return "This download link is no longer valid"
+    return None
+
+
+def public_payload(slug, entry, request):
+    """
+    (etag, data, max_age) for the public view: the cached document info
+    plus a signed download URL, cacheable until the URL window rolls over
+    or the link expires, whichever is sooner.
+    """
+    now = time.time()
+    token, url_expires = sign_download(slug, entry, now)
+    url = reverse("library-shared-document-download", kwargs={"slug": slug})
+    data = {
+        **entry["data"],
+        "file": request.build_absolute_uri(f"{url}?token={token}") if entry["file"] else None,
+    }
+    # Stay inside the window in which this URL is still good for a full TTL
+    max_age = max(0, math.floor(min(url_expires - SIGNED_URL_TTL - now, entry["expires_at"] - now)))
+    etag = hashlib.md5(json.dumps(data, sort_keys=True).encode()).hexdigest()
+    return etag, data, max_age
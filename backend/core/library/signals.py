@@ -0,0 +1,94 @@
+"""
+Library signals — Keep the document search index in step with the library.
+Uploads, renames, tag edits, soft-deletes and restores all save the
+Document, so one post_save hook covers them; folder renames and moves
+refresh every document underneath. New files are also queued for
+background text extraction (library.extraction).
+
+Document files also get image thumbnails and previews (uploads.derivatives),
+and documents and archived versions count towards the creator's storage
+usage (uploads.quota).
+
+Deleting a Document or DocumentVersion — directly or by cascade from a
+folder — releases its reference on the stored blob (library.blobs).
+
+Cached public share link entries (library.sharing) are dropped when the
+link changes or is revoked, and made stale whenever its document is saved —
+after commit, so a concurrent visit can't re-cache the old file under the
+new generation.
+
+A document saved with a changed tags list has its normalized tag rows
+resynced (library.tags).
+"""
+import copy
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .models import Folder, Document, DocumentVersion, DocumentShareLink
+from uploads import derivatives, quota
+from . import blobs, extraction, search, sharing, tags
+
+derivatives.track(Document, "file", source_hash=lambda doc: doc.blob.sha256 if doc.blob_id else None)
+
+
+def _version_owner(version):
+    if DocumentVersion.document.is_cached(version):
+        return version.document.creator_id
+    return Document.objects.filter(id=version.document_id).values_list("creator_id", flat=True).first()
+
+
+quota.track(Document, "library", "size_kb", lambda doc: doc.creator_id, scale=1024)
+quota.track(DocumentVersion, "library", "stored_kb", _version_owner, scale=1024)  # Deltas count what they store
+
+
+@receiver(post_save, sender=Document)
+def index_document_on_save(sender, instance, **kwargs):
+    search.index_document(instance)
+    if not instance.is_deleted:
+        extraction.queue_document(instance)
+
+
+@receiver(post_save, sender=Folder)
+def reindex_folder_on_save(sender, instance, created, **kwargs):
+    if not created:
+        search.reindex_folder(instance)
+
+
+@receiver(post_delete, sender=Document)
+@receiver(post_delete, sender=DocumentVersion)
+def release_blob_on_delete(sender, instance, **kwargs):
+    blobs.release(instance.blob_id)
+
+
+@receiver(post_save, sender=Document)
+def refresh_share_links_on_save(sender, instance, **kwargs):
+    document_id = instance.id
+    transaction.on_commit(lambda: sharing.invalidate_document(document_id))
+
+
+@receiver(post_save, sender=DocumentShareLink)
+@receiver(post_delete, sender=DocumentShareLink)
+def invalidate_share_link(sender, instance, **kwargs):
+    slug = instance.slug
+    transaction.on_commit(lambda: sharing.invalidate_link(slug))
+
+
+@receiver(post_init, sender=Document)
+def remember_tags(sender, instance, **kwargs):
+    if "tags" in instance.__dict__:  # Not deferred
+        instance._synced_tags = copy.copy(instance.tags)
+
+
+@receiver(post_save, sender=Document)
+def sync_tags_on_save(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and "tags" not in update_fields:
+        return
+    if "tags" not in instance.__dict__:
+        return
+    if created and not instance.tags:
+        return
+    if created or instance.tags != getattr(instance, "_synced_tags", None):
+        tags.sync(instance)
+        instance._synced_tags = copy.copy(instance.tags)
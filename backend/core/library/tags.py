@@ -0,0 +1,103 @@
+"""
+Library tags — normalized Tag rows and the DocumentTag join behind
+Document.tags.
+
+Document.tags remains the list clients read and write. Whenever a
+document is saved with a changed list, sync() brings its DocumentTag
+rows in line (see library.signals), creating the creator's Tag rows on
+first use. Tags match by key — whitespace collapsed and casefolded — so
+"Contracts", "contracts " and "CONTRACTS" are one tag.
+
+Filtering (filter_documents) and facet counts (facets) run as indexed
+subqueries and one grouped query over the join, instead of scanning the
+JSON lists.
+"""
+from django.db.models import Count, Min
+
+from .models import Document, DocumentTag, Tag
+
+MAX_LENGTH = 100
+
+
+def normalize(tag):
+    """(key, display name) for one tag value."""
+    name = " ".join(str(tag).split())[:MAX_LENGTH]
+    # Casefolding can lengthen a name ("ß" -> "ss"), so the key is cut again
+    return name.casefold()[:MAX_LENGTH], name
+
+
+def clean(values):
+    """Tag names deduplicated by key, in first-seen order, without blanks."""
+    seen, names = set(), []
+    for value in values or []:
+        key, name = normalize(value)
+        if key and key not in seen:
+            seen.add(key)
+            names.append(name)
+    return names
+
+
+def keys(values):
+    return [key for key, _ in map(normalize, values) if key]
+
+
+def _tags_for(creator_id, names_by_key):
+    """The creator's Tag rows for these keys, creating those that don't exist yet."""
+    Tag.objects.bulk_create(
+        [Tag(creator_id=creator_id, key=key, name=name) for key, name in names_by_key.items()],
+        ignore_conflicts=True,
+    )
+    return Tag.objects.filter(creator_id=creator_id, key__in=list(names_by_key))
+
+
+def sync(document):
+    """Make the document's DocumentTag rows match its tags list."""
+    wanted = dict(map(normalize, clean(document.tags if isinstance(document.tags, list) else [])))
+    current = dict(
+        DocumentTag.objects.filter(document=document).values_list("tag__key", "id")
+    )
+    stale = [link_id for key, link_id in current.items() if key not in wanted]
+    if stale:
+        DocumentTag.objects.filter(id__in=stale).delete()
+    missing = {key: name for key, name in wanted.items() if key not in current}
+    if missing:
+        DocumentTag.objects.bulk_create(
+            [DocumentTag(document=document, tag=tag) for tag in _tags_for(document.creator_id, missing)],
+            ignore_conflicts=True,
+        )
+
+
+def rebuild(batch_size=500):
+    """Resync every document's tag rows; returns the number of documents processed."""
+    done = 0
+    for document in Document.objects.only("id", "creator_id", "tags").iterator(chunk_size=batch_size):
+        sync(document)
+        done += 1
+    return done
+
+
+def filter_documents(qs, any_of=(), all_of=()):
+    """Documents of `qs` carrying at least one tag of `any_of` and every tag of `all_of`."""
+    any_keys, all_keys = set(keys(any_of)), set(keys(all_of))
+    if any_keys:
+        qs = qs.filter(id__in=DocumentTag.objects.filter(tag__key__in=any_keys).values("document_id"))
+    if all_keys:
+        qs = qs.filter(
+            id__in=DocumentTag.objects.filter(tag__key__in=all_keys)
+            .values("document_id")
+            .annotate(matched=Count("tag__key", distinct=True))
+            .filter(matched=len(all_keys))
+            .values("document_id")
+        )
+    return qs
+
+
+def facets(documents):
+    """[{"name", "key", "count"}]: how many of `documents` carry each tag, most used first."""
+    rows = (
+        DocumentTag.objects.filter(document__in=documents.values("id"))
+        .values("tag__key")
+        .annotate(name=Min("tag__name"), count=Count("document_id", distinct=True))
+        .order_by("-count", "tag__key")
+    )
+    return [{"name": row["name"], "key": row["tag__key"], "count": row["count"]} for row in rows]
@@ -1,5 +1,6 @@
 """Library tests — Document Library operations."""
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.utils import timezone
 from rest_framework.test import APIClient
 from account.models import User
 from library.models import Folder, Document, DocumentVersion
@@ -99,3 +100,1308 @@ class DocumentLibraryTest(TestCase):
         """Unauthenticated requests are blocked."""
         response = self.api.get("/api/v6/folders/")
         self.assertEqual(response.status_code, 401)
+
+
+class FolderTreeTest(TestCase):
+    """Folder counts are annotated and the whole tree loads in one query."""
+
+    def setUp(self):
+        from django.core.files.base import ContentFile
+
+        self.api = APIClient()
+        self.creator = User.objects.create_user(
+            email="creator@test.com",
+            full_name="Test Creator",
+            password="testpass123",
+            role="creator",
+        )
+        self.root = Folder.objects.create(creator=self.creator, name="Root")
+        self.child = Folder.objects.create(creator=self.creator, name="Child", parent_folder=self.root)
+        Folder.objects.create(creator=self.creator, name="Grandchild", parent_folder=self.child)
+        for name, deleted in [("a.txt", False), ("b.txt", False), ("c.txt", True)]:
+            Document.objects.create(
+                creator=self.creator,
+                folder=self.root,
+                name=name,
+                file=ContentFile(b"x", name=name),
+                is_deleted=deleted,
+            )
+        self.api.force_authenticate(self.creator)
+
+    def test_folder_list_counts_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.api.get("/api/v6/folders/?parent_id=null")
+        self.assertEqual(response.data[0]["document_count"], 2)
+        self.assertEqual(response.data[0]["subfolder_count"], 1)
+
+    def test_tree_returns_nested_hierarchy(self):
+        with self.assertNumQueries(1):
+            response = self.api.get("/api/v6/folders/tree/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+        root = response.data[0]
+        self.assertEqual(root["name"], "Root")
+        self.assertEqual(root["document_count"], 2)
+        self.assertEqual(root["children"][0]["name"], "Child")
+        self.assertEqual(root["children"][0]["children"][0]["name"], "Grandchild")
+
+
+class FolderMaterializedPathTest(TestCase):
+    """Folder paths support single-query subtree, breadcrumb and move operations."""
+
+    def setUp(self):
+        from django.core.files.base import ContentFile
+
+        self.api = APIClient()
+        self.creator = User.objects.create_user(
+            email="creator@test.com",
+            full_name="Test Creator",
+            password="testpass123",
+            role="creator",
+        )
+        self.a = Folder.objects.create(creator=self.creator, name="A")
+        self.b = Folder.objects.create(creator=self.creator, name="B", parent_folder=self.a)
+        self.c = Folder.objects.create(creator=self.creator, name="C", parent_folder=self.b)
+        self.other = Folder.objects.create(creator=self.creator, name="Other")
+        Document.objects.create(
+            creator=self.creator,
+            folder=self.c,
+            name="deep.txt",
+            file=ContentFile(b"x", name="deep.txt"),
+        )
+        self.api.force_authenticate(self.creator)
+
+    def test_path_and_depth_assigned_on_create(self):
+        self.assertEqual(self.c.path, f"/{self.a.id.hex}/{self.b.id.hex}/{self.c.id.hex}/")
+        self.assertEqual(self.c.depth, 2)
+        self.assertEqual(self.c.ancestor_ids, [self.a.id, self.b.id])
+
+    def test_breadcrumbs_single_query(self):
+        with self.assertNumQueries(1):
+            names = [f.name for f in self.c.breadcrumbs()]
+        self.assertEqual(names, ["A", "B", "C"])
+
+    def test_move_rewrites_subtree(self):
+        self.b.move_to(self.other)
+        self.c.refresh_from_db()
+        self.assertEqual(self.c.path, f"/{self.other.id.hex}/{self.b.id.hex}/{self.c.id.hex}/")
+        self.assertEqual(self.c.depth, 2)
+
+        self.b.move_to(None)
+        self.c.refresh_from_db()
+        self.assertEqual(self.c.depth, 1)
+
+    def test_cannot_move_into_own_subtree(self):
+        response = self.api.post(
+            f"/api/v6/folders/{self.a.id}/move/",
+            {"parent_folder_id": str(self.c.id)},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_subtree_documents(self):
+        response = self.api.get(f"/api/v6/folders/{self.a.id}/documents/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["document_count"], 1)
+        self.assertEqual(response.data["descendant_folder_count"], 2)
+
+    def test_delete_removes_subtree(self):
+        response = self.api.delete(f"/api/v6/folders/{self.a.id}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(Folder.objects.values_list("name", flat=True)), ["Other"])
+        self.assertFalse(Document.objects.exists())
+
+
+class DocumentSearchIndexTest(TestCase):
+    """The search index is maintained on save and returns ranked results."""
+
+    def setUp(self):
+        from django.core.files.base import ContentFile
+
+        self.api = APIClient()
+        self.creator = User.objects.create_user(
+            email="creator@test.com",
+            full_name="Test Creator",
+            password="testpass123",
+            role="creator",
+        )
+        self.folder = Folder.objects.create(creator=self.creator, name="Contracts")
+        self.other_folder = Folder.objects.create(creator=self.creator, name="Briefs")
+
+        def make(name, folder, tags=()):
+            return Document.objects.create(
+                creator=self.creator,
+                folder=folder,
+                name=name,
+                file=ContentFile(b"x", name=name),
+                tags=list(tags),
+            )
+
+        self.by_name = make("retainer_agreement.pdf", self.other_folder)
+        self.by_tag = make("scan-0001.pdf", self.other_folder, tags=["retainer"])
+        self.by_folder = make("notes.txt", self.folder)
+        self.api.force_authenticate(self.creator)
+
+    def search(self, q):
+        response = self.api.get("/api/v6/search/", {"q": q})
+        self.assertEqual(response.status_code, 200)
+        return [r["name"] for r in response.data["results"]]
+
+    def test_name_matches_rank_above_tag_matches(self):
+        self.assertEqual(self.search("retainer"), ["retainer_agreement.pdf", "scan-0001.pdf"])
+
+    def test_prefix_and_folder_path_match(self):
+        self.assertEqual(self.search("contr"), ["notes.txt"])
+        self.assertEqual(self.search("agree"), ["retainer_agreement.pdf"])
+
+    def test_index_follows_rename_tags_and_delete(self):
+        self.by_folder.name = "invoice.txt"
+        self.by_folder.tags = ["urgent"]
+        self.by_folder.save()
+        self.assertEqual(self.search("invoice urgent"), ["invoice.txt"])
+
+        self.by_folder.soft_delete()
+        self.assertEqual(self.search("invoice"), [])
+
+        self.by_folder.restore()
+        self.assertEqual(self.search("invoice"), ["invoice.txt"])
+
+    def test_folder_rename_reindexes_documents(self):
+        self.folder.name = "Agreements"
+        self.folder.save(update_fields=["name"])
+        self.assertEqual(self.search("agreements"), ["notes.txt"])
+
+    def test_pagination(self):
+        response = self.api.get("/api/v6/search/", {"q": "pdf", "limit": 1})
+        self.assertEqual(response.data["count"], 1)
+        self.assertTrue(response.data["has_more"])
+        response = self.api.get("/api/v6/search/", {"q": "pdf", "limit": 1, "offset": 1})
+        self.assertFalse(response.data["has_more"])
+
+    def test_native_index_in_use(self):
+        from django.db import connection
+        from library.search import search_backend
+
+        if connection.vendor in ("sqlite", "postgresql"):
+            self.assertIn(search_backend(), ("fts5", "postgres"))
+
+
+class DocumentTextExtractionTest(TestCase):
+    """Uploaded files are queued, extracted in batches and fed into search."""
+
+    def setUp(self):
+        self.api = APIClient()
+        self.creator = User.objects.create_user(
+            email="creator@test.com",
+            full_name="Test Creator",
+            password="testpass123",
+            role="creator",
+        )
+        self.folder = Folder.objects.create(creator=self.creator, name="Inbox")
+        self.api.force_authenticate(self.creator)
+
+    def make(self, name, data):
+        from django.core.files.base import ContentFile
+
+        return Document.objects.create(
+            creator=self.creator,
+            folder=self.folder,
+            name=name,
+            file=ContentFile(data, name=name),
+        )
+
+    def docx_bytes(self, text):
+        import io
+        import zipfile
+
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr(
+                "word/document.xml",
+                '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                f"<w:body><w:p><w:r><w:t>{text}</w:t></w:r></w:p></w:body></w:document>",
+            )
+        return buffer.getvalue()
+
+    def search(self, q):
+        response = self.api.get("/api/v6/search/", {"q": q})
+        self.assertEqual(response.status_code, 200)
+        return [r["name"] for r in response.data["results"]]
+
+    def test_upload_is_queued_and_content_becomes_searchable(self):
+        from library import extraction
+
+        doc = self.make("brief.txt", b"Quarterly marmalade forecast")
+        self.assertEqual(doc.extracted_text.status, "PENDING")
+        self.assertEqual(self.search("marmalade"), [])
+
+        self.assertEqual(extraction.process_pending(), 1)
+        doc.extracted_text.refresh_from_db()
+        self.assertEqual(doc.extracted_text.status, "DONE")
+        self.assertEqual(self.search("marmalade"), ["brief.txt"])
+
+    def test_docx_json_and_unsupported_types(self):
+        from library import extraction
+
+        docx = self.make("proposal.docx", self.docx_bytes("Kumquat rollout"))
+        onboarding = self.make(
+            "Onboarding Responses.json",
+            b'{"company": "Zephyr Labs", "goals": ["rebrand", null]}',
+        )
+        image = self.make("logo.png", b"\x89PNG\r\n")
+        extraction.process_pending()
+
+        self.assertEqual(self.search("kumquat"), ["proposal.docx"])
+        self.assertEqual(self.search("zephyr"), ["Onboarding Responses.json"])
+        image.extracted_text.refresh_from_db()
+        self.assertEqual(image.extracted_text.status, "UNSUPPORTED")
+        onboarding.extracted_text.refresh_from_db()
+        self.assertIn("Zephyr Labs", onboarding.extracted_text.text)
+        docx.extracted_text.refresh_from_db()
+        self.assertEqual(len(docx.extracted_text.content_hash), 64)
+
+    def test_unchanged_file_is_not_parsed_again(self):
+        from unittest import mock
+        from django.core.files.base import ContentFile
+        from library import extraction
+
+        doc = self.make("notes.md", b"same bytes")
+        extraction.process_pending()
+
+        doc.file = ContentFile(b"same bytes", name="notes.md")
+        doc.save()
+        doc.extracted_text.refresh_from_db()
+        self.assertEqual(doc.extracted_text.status, "PENDING")
+
+        with mock.patch.object(extraction, "extract_text") as parse:
+            self.assertEqual(extraction.process_pending(), 1)
+        parse.assert_not_called()
+        doc.extracted_text.refresh_from_db()
+        self.assertEqual(doc.extracted_text.status, "DONE")
+
+    def test_rename_does_not_requeue(self):
+        from library import extraction
+
+        doc = self.make("a.txt", b"alpha")
+        extraction.process_pending()
+        doc.name = "b.txt"
+        doc.save()
+        self.assertEqual(extraction.process_pending(), 0)
+        self.assertEqual(self.search("alpha"), ["b.txt"])
+
+    def test_long_text_is_truncated(self):
+        from unittest import mock
+        from library import extraction
+
+        doc = self.make("big.txt", b"word " * 100)
+        with mock.patch.object(extraction, "MAX_TEXT_CHARS", 50):
+            extraction.process_pending()
+        doc.extracted_text.refresh_from_db()
+        self.assertTrue(doc.extracted_text.truncated)
+        self.assertEqual(len(doc.extracted_text.text), 50)
+
+    def test_reupload_during_extraction_is_not_overwritten(self):
+        from unittest import mock
+        from django.core.files.base import ContentFile
+        from library import extraction
+
+        doc = self.make("plan.txt", b"first draft")
+        claim = extraction._claim_batch
+
+        def claim_then_reupload(batch_size):
+            rows = claim(batch_size)
+            doc.file = ContentFile(b"second draft with pomegranate", name="plan.txt")
+            doc.save()
+            return rows
+
+        with mock.patch.object(extraction, "_claim_batch", claim_then_reupload):
+            extraction.process_batch()
+        doc.extracted_text.refresh_from_db()
+        self.assertEqual(doc.extracted_text.status, "PENDING")
+        self.assertEqual(self.search("first"), [])
+
+        extraction.process_pending()
+        self.assertEqual(self.search("pomegranate"), ["plan.txt"])
+
+    def test_docx_decompressed_size_is_capped(self):
+        from unittest import mock
+        from library import extraction
+
+        doc = self.make("bomb.docx", self.docx_bytes("x" * 5000))
+        with mock.patch.object(extraction, "MAX_XML_BYTES", 1000):
+            extraction.process_pending()
+        doc.extracted_text.refresh_from_db()
+        self.assertEqual(doc.extracted_text.status, "UNSUPPORTED")
+        self.assertEqual(doc.extracted_text.error, "File too large to extract")
+
+
+class DocumentBlobDedupTest(TestCase):
+    """Identical uploads share one stored blob, which is collected with its last reference."""
+
+    def setUp(self):
+        self.api = APIClient()
+        self.creator = User.objects.create_user(
+            email="creator@test.com",
+            full_name="Test Creator",
+            password="testpass123",
+            role="creator",
+        )
+        self.folder = Folder.objects.create(creator=self.creator, name="A")
+        self.other_folder = Folder.objects.create(creator=self.creator, name="B")
+        self.api.force_authenticate(self.creator)
+
+    def upload(self, folder, name, data):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        response = self.api.post(
+            "/api/v6/documents/upload/",
+            {"folder_id": str(folder.id), "file": SimpleUploadedFile(name, data, "text/plain")},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        return Document.objects.get(id=response.data["id"])
+
+    def test_identical_uploads_share_a_blob(self):
+        from unittest import mock
+        from library.models import StoredBlob
+
+        first = self.upload(self.folder, "a.txt", b"same bytes")
+        storage = StoredBlob._meta.get_field("file").storage
+        with mock.patch.object(storage, "save", wraps=storage.save) as save:
+            second = self.upload(self.other_folder, "b.txt", b"same bytes")
+        save.assert_not_called()
+
+        self.assertEqual(first.blob_id, second.blob_id)
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertEqual(StoredBlob.objects.get().ref_count, 2)
+        self.assertEqual(second.size_kb, len(b"same bytes") / 1024)
+
+    def test_reupload_archives_version_on_the_old_blob(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from library.models import StoredBlob
+
+        doc = self.upload(self.folder, "notes.txt", b"v1")
+        old_blob = doc.blob
+        response = self.api.post(
+            f"/api/v6/documents/{doc.id}/reupload/",
+            {"file": SimpleUploadedFile("notes.txt", b"v2", "text/plain")},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 200)
+
+        doc.refresh_from_db()
+        version = DocumentVersion.objects.get(document=doc)
+        self.assertEqual(version.blob_id, old_blob.id)
+        self.assertNotEqual(doc.blob_id, old_blob.id)
+        self.assertEqual(
+            dict(StoredBlob.objects.values_list("id", "ref_count")),
+            {old_blob.id: 1, doc.blob_id: 1},
+        )
+
+    def test_last_reference_removes_blob_and_file(self):
+        from library.models import StoredBlob
+
+        first = self.upload(self.folder, "a.txt", b"shared")
+        second = self.upload(self.other_folder, "a.txt", b"shared")
+        storage = first.blob.file.storage
+        name = first.blob.file.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(StoredBlob.objects.get().ref_count, 1)
+        self.assertTrue(storage.exists(name))
+
+        # Deleting the folder cascades to the document and its versions
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_folder.delete()
+        self.assertFalse(StoredBlob.objects.exists())
+        self.assertFalse(storage.exists(name))
+        self.assertFalse(Document.objects.filter(id=second.id).exists())
+
+    def test_collect_command_recounts_drifted_references(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from library.models import StoredBlob
+
+        doc = self.upload(self.folder, "a.txt", b"keep me")
+        StoredBlob.objects.update(ref_count=0)
+        call_command("collect_library_blobs", "--recount", stdout=StringIO())
+        self.assertEqual(StoredBlob.objects.get(id=doc.blob_id).ref_count, 1)
+
+
+class DocumentZipDownloadTest(TestCase):
+    """Folders and selections stream as ZIPs and log one DOWNLOADED per document."""
+
+    def setUp(self):
+        from django.core.files.base import ContentFile
+
+        self.api = APIClient()
+        self.creator = User.objects.create_user(
+            email="creator@test.com",
+            full_name="Test Creator",
+            password="testpass123",
+            role="creator",
+        )
+        self.root = Folder.objects.create(creator=self.creator, name="Acme")
+        self.child = Folder.objects.create(creator=self.creator, name="Brand/Assets", parent_folder=self.root)
+        self.outside = Folder.objects.create(creator=self.creator, name="Other")
+
+        def make(folder, name, data):
+            return Document.objects.create(
+                creator=self.creator, folder=folder, name=name, file=ContentFile(data, name=name),
+            )
+
+        self.brief = make(self.root, "brief.txt", b"brief")
+        self.logo = make(self.child, "logo.svg", b"<svg/>")
+        self.unrelated = make(self.outside, "brief.txt", b"other brief")
+        make(self.root, "old.txt", b"gone").soft_delete()
+        self.api.force_authenticate(self.creator)
+
+    def read_zip(self, response):
+        import io
+        import zipfile
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/zip")
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        return {name: archive.read(name) for name in archive.namelist()}
+
+    def test_folder_subtree_zip(self):
+        from library import activity
+        from library.models import DocumentActivity
+
+        with self.captureOnCommitCallbacks(execute=True):
+            files = self.read_zip(self.api.get(f"/api/v6/folders/{self.root.id}/download/"))
+        self.assertEqual(files, {"Acme/brief.txt": b"brief", "Acme/Brand_Assets/logo.svg": b"<svg/>"})
+        activity.flush()
+        self.assertEqual(
+            set(DocumentActivity.objects.filter(action="DOWNLOADED").values_list("document_id", flat=True)),
+            {self.brief.id, self.logo.id},
+        )
+
+    def test_selection_zip_dedupes_names(self):
+        response = self.api.post(
+            "/api/v6/documents/download/",
+            {"document_ids": [str(self.brief.id), str(self.unrelated.id)]},
+            format="json",
+        )
+        files = self.read_zip(response)
+        self.assertEqual(sorted(files), ["brief (2).txt", "brief.txt"])
+
+    def test_other_users_documents_are_excluded(self):
+        other = User.objects.create_user(
+            email="other@test.com", full_name="Other", password="testpass123", role="creator",
+        )
+        self.api.force_authenticate(other)
+        response = self.api.post(
+            "/api/v6/documents/download/", {"document_ids": [str(self.brief.id)]}, format="json",
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.api.get(f"/api/v6/folders/{self.root.id}/download/").status_code, 404)
+
+
+@override_settings(LIBRARY_EXTRACTION_IN_BACKGROUND=False, DERIVATIVES_IN_BACKGROUND=False)
+class DocumentActivityBufferTest(TestCase):
+    """Activity events are buffered per process and written in batches."""
+
+    def setUp(self):
+        from django.core.files.base import ContentFile
+        from library import activity
+
+        activity.flush()  # Start from an empty buffer
+        self.api = APIClient()
+        self.creator = User.objects.create_user(
+            email="creator@test.com",
+            full_name="Test Creator",
+            password="testpass123",
+            role="creator",
+        )
+        self.folder = Folder.objects.create(creator=self.creator, name="Briefs")
+        self.doc = Document.objects.create(
+            creator=self.creator, folder=self.folder, name="brief.txt", file=ContentFile(b"x", name="brief.txt"),
+        )
+        self.api.force_authenticate(self.creator)
+
+    def view(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.api.get(f"/api/v6/documents/{self.doc.id}/").status_code, 200)
+
+    def test_events_wait_for_flush_and_keep_their_time(self):
+        from library import activity
+        from library.models import DocumentActivity
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api.patch(f"/api/v6/documents/{self.doc.id}/", {"name": "brief-v2.txt"}, format="json")
+        self.assertEqual(activity.pending(), 1)
+        self.assertFalse(DocumentActivity.objects.exists())
+
+        response = self.api.get(f"/api/v6/documents/{self.doc.id}/activity/")  # Reading flushes
+        self.assertEqual([row["action"] for row in response.data], ["EDITED"])
+        self.assertEqual(activity.pending(), 0)
+        self.assertLess(DocumentActivity.objects.get().timestamp, timezone.now())
+
+    def test_size_threshold_writes_one_batch(self):
+        from unittest import mock
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from library import activity
+        from library.models import DocumentActivity
+
+        with mock.patch.object(activity, "FLUSH_SIZE", 3), CaptureQueriesContext(connection) as queries, \
+                self.captureOnCommitCallbacks(execute=True):
+            activity.log_many([self.doc] * 3, self.creator, "DOWNLOADED")
+        inserts = [q for q in queries if q["sql"].startswith('INSERT INTO "library_documentactivity"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(DocumentActivity.objects.filter(action="DOWNLOADED").count(), 3)
+
+    def test_interval_threshold(self):
+        from unittest import mock
+        from library import activity
+
+        with mock.patch.object(activity, "FLUSH_INTERVAL", 0), self.captureOnCommitCallbacks(execute=True):
+            activity.log(self.doc, self.creator, "SHARED")
+        self.assertEqual(activity.pending(), 0)
+        self.assertTrue(self.doc.activities.filter(action="SHARED").exists())
+
+    def test_idle_buffer_is_flushed_by_timer(self):
+        import threading
+        from unittest import mock
+        from library import activity
+
+        flushed = threading.Event()
+        with mock.patch.object(activity, "FLUSH_INTERVAL", 0.05), \
+                mock.patch.object(activity, "flush", side_effect=lambda: flushed.set()):
+            with self.captureOnCommitCallbacks(execute=True):
+                activity.log(self.doc, self.creator, "SHARED")
+            self.assertEqual(activity.pending(), 1)  # Not due yet; no further events arrive
+            self.assertTrue(flushed.wait(5))
+
+    @override_settings(LIBRARY_ACTIVITY_VIEW_DEDUP_SECONDS=300)
+    def test_repeated_views_are_deduplicated(self):
+        from library import activity
+
+        self.view()
+        self.view()
+        self.assertEqual(activity.pending(), 1)
+        with override_settings(LIBRARY_ACTIVITY_VIEW_DEDUP_SECONDS=0):
+            self.view()
+        self.assertEqual(activity.pending(), 2)
+
+    def test_rolled_back_and_deleted_documents_are_skipped(self):
+        from django.db import transaction
+        from library import activity
+        from library.models import DocumentActivity
+
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    activity.log(self.doc, self.creator, "EDITED")
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(activity.pending(), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            activity.log(self.doc, self.creator, "DOWNLOADED")
+        Document.objects.filter(id=self.doc.id).delete()
+        self.assertEqual(activity.flush(), 0)
+        self.assertFalse(DocumentActivity.objects.exists())
+
+
+@override_settings(LIBRARY_EXTRACTION_IN_BACKGROUND=False, DERIVATIVES_IN_BACKGROUND=False)
+class DocumentActivityRollupTest(TestCase):
+    """Activity rollups are maintained on flush and serve the analytics endpoints."""
+
+    def setUp(self):
+        from django.core.files.base import ContentFile
+        from library import activity
+
+        activity.flush()
+        self.api = APIClient()
+        self.creator = User.objects.create_user(
+            email="creator@test.com",
+            full_name="Test Creator",
+            password="testpass123",
+            role="creator",
+        )
+        self.client_user = User.objects.create_user(
+            email="client@test.com",
+            full_name="Client",
+            password="testpass123",
+            role="creator",
+        )
+        self.root = Folder.objects.create(creator=self.creator, name="Acme")
+        self.child = Folder.objects.create(creator=self.creator, name="Assets", parent_folder=self.root)
+
+        def make(folder, name):
+            return Document.objects.create(
+                creator=self.creator, folder=folder, name=name, file=ContentFile(b"x", name=name),
+            )
+
+        self.brief = make(self.root, "brief.txt")
+        self.logo = make(self.child, "logo.svg")
+        self.api.force_authenticate(self.creator)
+
+    def record(self, document, actor, action, count=1, days_ago=0):
+        from datetime import timedelta
+        from library import activity
+
+        with self.captureOnCommitCallbacks(execute=True):
+            activity.log_many([document] * count, actor, action)
+        if days_ago:
+            # Backdate this batch before it is rolled up
+            for event in activity._buffer:
+                event.timestamp -= timedelta(days=days_ago)
+        activity.flush()
+
+    def test_rollups_accumulate_across_flushes(self):
+        from library.models import DocumentActivityDaily, DocumentActorActivity
+
+        self.record(self.brief, self.creator, "DOWNLOADED", count=2)
+        self.record(self.brief, self.client_user, "DOWNLOADED")
+        self.record(self.brief, self.client_user, "DOWNLOADED", days_ago=3)
+
+        today = timezone.localdate()
+        self.assertEqual(DocumentActivityDaily.objects.get(document=self.brief, day=today).count, 3)
+        self.assertEqual(
+            DocumentActorActivity.objects.get(document=self.brief, actor=self.client_user).count, 2,
+        )
+
+    def test_document_analytics(self):
+        from datetime import timedelta
+
+        self.record(self.brief, self.creator, "EDITED")
+        self.record(self.brief, self.client_user, "DOWNLOADED", count=2, days_ago=1)
+        self.record(self.brief, self.client_user, "DOWNLOADED", days_ago=40)  # Outside the default range
+
+        with self.assertNumQueries(3):  # The document, then one read per rollup table
+            response = self.api.get(f"/api/v6/documents/{self.brief.id}/analytics/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["totals"], {"views": 0, "downloads": 2, "edits": 1})
+        self.assertEqual(len(response.data["daily"]), 30)
+        yesterday = timezone.localdate() - timedelta(days=1)
+        self.assertEqual(
+            [d["downloads"] for d in response.data["daily"] if d["day"] == yesterday], [2],
+        )
+        client_row = next(a for a in response.data["actors"] if a["actor"] == self.client_user.id)
+        self.assertEqual(client_row["downloads"], 3)  # Per-actor totals are all-time
+
+    def test_folder_analytics_covers_subtree(self):
+        self.record(self.brief, self.creator, "DOWNLOADED")
+        self.record(self.logo, self.creator, "DOWNLOADED", count=4)
+
+        response = self.api.get(f"/api/v6/folders/{self.root.id}/analytics/")
+        self.assertEqual(response.data["totals"]["downloads"], 5)
+        response = self.api.get(f"/api/v6/folders/{self.child.id}/analytics/")
+        self.assertEqual(response.data["totals"]["downloads"], 4)
+
+        self.logo.soft_delete()
+        response = self.api.get(f"/api/v6/folders/{self.root.id}/analytics/")
+        self.assertEqual(response.data["totals"]["downloads"], 1)
+
+    def test_range_validation(self):
+        url = f"/api/v6/documents/{self.brief.id}/analytics/"
+        self.assertEqual(self.api.get(url, {"start": "2026-02-01", "end": "2026-01-01"}).status_code, 400)
+        self.assertEqual(self.api.get(url, {"start": "2024-01-01", "end": "2026-01-01"}).status_code, 400)
+        response = self.api.get(url, {"start": "2026-01-01", "end": "2026-01-07"})
+        self.assertEqual(len(response.data["daily"]), 7)
+
+    def test_rebuild_matches_incremental(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from library.models import DocumentActivityDaily, DocumentActorActivity
+
+        self.record(self.brief, self.creator, "VIEWED")
+        self.record(self.brief, self.client_user, "DOWNLOADED", count=3, days_ago=2)
+        before = (
+            set(DocumentActivityDaily.objects.values_list("document", "day", "action", "count")),
+            set(DocumentActorActivity.objects.values_list("document", "actor", "action", "count")),
+        )
+        call_command("rebuild_activity_rollups", stdout=StringIO())
+        after = (
+            set(DocumentActivityDaily.objects.values_list("document", "day", "action", "count")),
+            set(DocumentActorActivity.objects.values_list("document", "actor", "action", "count")),
+        )
+        self.assertEqual(before, after)
+
+
+@override_settings(LIBRARY_EXTRACTION_IN_BACKGROUND=False, DERIVATIVES_IN_BACKGROUND=False)
+class TrashPurgeTest(TestCase):
+    """Expired trash is purged in batches, with its stored files."""
+
+    def setUp(self):
+        self.api = APIClient()
+        self.creator = User.objects.create_user(
+            email="creator@test.com",
+            full_name="Test Creator",
+            password="testpass123",
+            role="creator",
+        )
+        self.folder = Folder.objects.create(creator=self.creator, name="Briefs")
+        self.api.force_authenticate(self.creator)
+
+    def upload(self, name, data):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        response = self.api.post(
+            "/api/v6/documents/upload/",
+            {"folder_id": str(self.folder.id), "file": SimpleUploadedFile(name, data)},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 201)
+        return Document.objects.get(id=response.data["id"])
+
+    def trash(self, doc, days_ago):
+        from datetime import timedelta
+
+        doc.soft_delete()
+        Document.objects.filter(id=doc.id).update(deleted_at=timezone.now() - timedelta(days=days_ago))
+
+    def exists(self, name):
+        from django.core.files.storage import default_storage
+
+        return default_storage.exists(name)
+
+    def test_purges_expired_documents_versions_and_files(self):
+        from io import StringIO
+        from django.core.files.base import ContentFile
+        from django.core.management import call_command
+        from library.models import TrashPurgeRun
+
+        self.upload("brief.txt", b"first draft")
+        doc = self.upload("brief.txt", b"second draft")  # Archives the first as a version
+        old_files = [doc.file.name, doc.versions.get().file.name]
+        shared = self.upload("copy.txt", b"second draft")  # Same bytes as doc's current file
+        legacy = Document.objects.create(
+            creator=self.creator, folder=self.folder, name="old.txt",
+            file=ContentFile(b"legacy", name="old.txt"), size_kb=len(b"legacy") / 1024,
+        )
+        recent = self.upload("recent.txt", b"recent")
+        self.trash(doc, days_ago=31)
+        self.trash(legacy, days_ago=45)
+        self.trash(recent, days_ago=3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("purge_library_trash", "--batch-size", "1", stdout=StringIO())
+
+        self.assertEqual(
+            set(Document.objects.values_list("name", flat=True)), {"copy.txt", "recent.txt"},
+        )
+        self.assertFalse(self.exists(old_files[1]))  # Version's blob had no other reference
+        self.assertTrue(self.exists(old_files[0]))  # Still shared with copy.txt
+        self.assertEqual(shared.file.name, old_files[0])
+        self.assertFalse(self.exists(legacy.file.name))
+
+        run = TrashPurgeRun.objects.get()
+        self.assertEqual((run.documents, run.versions, run.batches), (2, 1, 2))
+        self.assertEqual(run.files_deleted, 2)
+        self.assertEqual(run.bytes_freed, len(b"first draft") + len(b"second draft") + len(b"legacy"))
+
+        usage = self.api.get("/api/v9/storage/usage/").data
+        self.assertEqual(usage["library_bytes"], len(b"second draft") + len(b"recent"))
+
+    def test_dry_run_changes_nothing(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        self.trash(self.upload("a.txt", b"a"), days_ago=40)
+        out = StringIO()
+        call_command("purge_library_trash", "--dry-run", stdout=out)
+        self.assertIn("1 trashed document(s)", out.getvalue())
+        self.assertEqual(Document.objects.count(), 1)
+
+
+@override_settings(LIBRARY_EXTRACTION_IN_BACKGROUND=False, DERIVATIVES_IN_BACKGROUND=False)
+class SharedDocumentDeliveryTest(TestCase):
+    """Public share links are served from cache with signed, short-lived download URLs."""
+
+    def setUp(self):
+        from datetime import timedelta
+        from django.core.cache import cache
+        from django.core.files.base import ContentFile
+        from library.models import DocumentShareLink
+
+        cache.clear()
+        self.api = APIClient()
+        self.creator = User.objects.create_user(
+            email="creator@test.com",
+            full_name="Test Creator",
+            password="testpass123",
+            role="creator",
+        )
+        folder = Folder.objects.create(creator=self.creator, name="Briefs")
+        self.doc = Document.objects.create(
+            creator=self.creator, folder=folder, name="brief.txt", file=ContentFile(b"v1", name="brief.txt"),
+        )
+        self.link = DocumentShareLink.objects.create(
+            document=self.doc,
+            expires_at=timezone.now() + timedelta(hours=2),
+            created_by=self.creator,
+        )
+        self.url = f"/api/v6/shared/{self.link.slug}/"
+
+    def download(self, file_url):
+        return self.client.get(file_url.replace("http://testserver", ""))
+
+    def test_repeat_hits_are_cached_with_headers(self):
+        from library import sharing
+
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        max_age = int(first["Cache-Control"].split("max-age=")[1])
+        self.assertTrue(first["Cache-Control"].startswith("public"))
+        self.assertLessEqual(max_age, sharing.SIGNED_URL_TTL)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+            not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(not_modified.status_code, 304)
+
+        response = self.download(first.json()["file"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"v1")
+
+    def test_max_age_follows_link_expiry(self):
+        from datetime import timedelta
+
+        self.link.expires_at = timezone.now() + timedelta(seconds=30)
+        self.link.save()
+        response = self.client.get(self.url)
+        self.assertLessEqual(int(response["Cache-Control"].split("max-age=")[1]), 30)
+
+    def test_signed_urls_expire_and_are_tamper_proof(self):
+        from unittest import mock
+        from library import sharing
+
+        file_url = self.client.get(self.url).json()["file"]
+        self.assertEqual(self.download(file_url + "x").status_code, 403)
+        with mock.patch("library.sharing.time.time", return_value=sharing.time.time() + 3 * sharing.SIGNED_URL_TTL):
+            self.assertEqual(self.download(file_url).status_code, 403)
+
+    def test_reupload_and_revoke_invalidate(self):
+        from django.core.files.base import ContentFile
+
+        file_url = self.client.get(self.url).json()["file"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.doc.file = ContentFile(b"v2", name="brief-v2.txt")
+            self.doc.save()
+            # Not before commit: a visit now must not cache v1 under the new generation
+            self.assertEqual(self.client.get(self.url).json()["file"], file_url)
+        self.assertEqual(self.download(file_url).status_code, 403)  # Old URL names the old file
+        new_url = self.client.get(self.url).json()["file"]
+        self.assertEqual(b"".join(self.download(new_url).streaming_content), b"v2")
+
+        self.api.force_authenticate(self.creator)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api.delete(f"/api/v6/documents/{self.doc.id}/shares/{self.link.id}/")
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.assertEqual(self.download(new_url).status_code, 404)
+
+    def test_expired_link(self):
+        from datetime import timedelta
+
+        self.link.expires_at = timezone.now() - timedelta(minutes=1)
+        self.link.save()
+        self.assertEqual(self.client.get(self.url).status_code, 410)
+
+
+@override_settings(LIBRARY_EXTRACTION_IN_BACKGROUND=False, DERIVATIVES_IN_BACKGROUND=False)
+class DocumentFileDeliveryTest(TestCase):
+    """Document files stream from LocalMediaStorage with Range support or are offloaded."""
+
+    def setUp(self):
+        from django.core.files.base import ContentFile
+        from library import activity
+
+        self.addCleanup(activity.flush)
+        self.api = APIClient()
+        self.creator = User.objects.create_user(
+            email="creator@test.com",
+            full_name="Test Creator",
+            password="testpass123",
+            role="creator",
+        )
+        self.client_user = User.objects.create_user(
+            email="client@test.com",
+            full_name="Test Client",
+            password="testpass123",
+            role="client",
+        )
+        folder = Folder.objects.create(creator=self.creator, name="Cuts")
+        self.doc = Document.objects.create(
+            creator=self.creator, folder=folder, client=self.client_user, name="cut.mp4",
+            file=ContentFile(b"0123456789", name="cut.mp4"),
+        )
+        self.url = f"/api/v6/documents/{self.doc.id}/file/"
+        self.api.force_authenticate(self.creator)
+
+    def test_whole_file(self):
+        response = self.api.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"0123456789")
+        self.assertEqual(response["Content-Length"], "10")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["Content-Type"], "video/mp4")
+        self.assertIn('filename="cut.mp4"', response["Content-Disposition"])
+
+    def test_ranges(self):
+        response = self.api.get(self.url, HTTP_RANGE="bytes=2-5")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 2-5/10")
+        self.assertEqual(b"".join(response.streaming_content), b"2345")
+
+        response = self.api.get(self.url, HTTP_RANGE="bytes=-3")
+        self.assertEqual(b"".join(response.streaming_content), b"789")
+        response = self.api.get(self.url, HTTP_RANGE="bytes=7-")
+        self.assertEqual(response["Content-Range"], "bytes 7-9/10")
+
+        response = self.api.get(self.url, HTTP_RANGE="bytes=10-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */10")
+
+    def test_stale_if_range_sends_whole_file(self):
+        etag = self.api.get(self.url)["ETag"]
+        response = self.api.get(self.url, HTTP_RANGE="bytes=2-5", HTTP_IF_RANGE=etag)
+        self.assertEqual(response.status_code, 206)
+        response = self.api.get(self.url, HTTP_RANGE="bytes=2-5", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"0123456789")
+
+    def test_offload_headers(self):
+        storage = self.doc.file.storage
+        self.addCleanup(setattr, storage, "offload", storage.offload)
+
+        storage.offload = "x-accel-redirect"
+        response = self.api.get(self.url)
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected-media/{self.doc.file.name}")
+        self.assertEqual(response.content, b"")
+
+        storage.offload = "x-sendfile"
+        response = self.api.get(self.url)
+        self.assertEqual(response["X-Sendfile"], storage.path(self.doc.file.name))
+
+    def test_access(self):
+        from library import activity
+        from library.models import DocumentActivity
+
+        self.api.force_authenticate(self.client_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.api.get(self.url).status_code, 200)
+            self.api.get(self.url, HTTP_RANGE="bytes=0-1")  # Seeks are not downloads
+        activity.flush()
+        self.assertEqual(DocumentActivity.objects.filter(document=self.doc, action="DOWNLOADED").count(), 1)
+
+        stranger = User.objects.create_user(
+            email="other@test.com", full_name="Other", password="testpass123", role="creator",
+        )
+        self.api.force_authenticate(stranger)
+        self.assertEqual(self.api.get(self.url).status_code, 404)
+
+
+@override_settings(LIBRARY_EXTRACTION_IN_BACKGROUND=False, DERIVATIVES_IN_BACKGROUND=False)
+class DocumentTagTest(TestCase):
+    """Tags are normalized into Tag/DocumentTag rows and drive filters and facets."""
+
+    def setUp(self):
+        self.api = APIClient()
+        self.creator = User.objects.create_user(
+            email="creator@test.com",
+            full_name="Test Creator",
+            password="testpass123",
+            role="creator",
+        )
+        self.client_user = User.objects.create_user(
+            email="client@test.com",
+            full_name="Test Client",
+            password="testpass123",
+            role="client",
+        )
+        self.root = Folder.objects.create(creator=self.creator, name="Acme")
+        self.child = Folder.objects.create(creator=self.creator, name="Legal", parent_folder=self.root)
+        self.other = Folder.objects.create(creator=self.creator, name="Other")
+
+        def make(name, folder, tags, client=None):
+            return Document.objects.create(
+                creator=self.creator, folder=folder, client=client, name=name, file="library/x.pdf", tags=tags,
+            )
+
+        self.nda = make("nda.pdf", self.child, ["Contracts", "Signed"], client=self.client_user)
+        self.sow = make("sow.pdf", self.root, ["contracts "])
+        self.logo = make("logo.png", self.root, ["Brand"])
+        self.misc = make("misc.pdf", self.other, ["CONTRACTS", "brand"])
+        self.api.force_authenticate(self.creator)
+
+    def test_tags_are_normalized_and_synced(self):
+        from library.models import DocumentTag, Tag
+
+        self.assertEqual(
+            sorted(Tag.objects.filter(creator=self.creator).values_list("key", flat=True)),
+            ["brand", "contracts", "signed"],
+        )
+        self.assertEqual(Tag.objects.get(key="contracts").name, "Contracts")  # First spelling wins
+
+        response = self.api.patch(
+            f"/api/v6/documents/{self.nda.id}/", {"tags": ["Signed", " signed", "Archive"]}, format="json",
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data["tags"], ["Signed", "Archive"])
+        self.assertEqual(
+            sorted(DocumentTag.objects.filter(document=self.nda).values_list("tag__key", flat=True)),
+            ["archive", "signed"],
+        )
+
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        doc = Document.objects.get(id=self.nda.id)
+        doc.is_locked = True
+        with CaptureQueriesContext(connection) as queries:  # Saves that leave tags alone do not resync them
+            doc.save()
+        self.assertFalse([q for q in queries.captured_queries if "library_documenttag" in q["sql"]])
+
+    def test_key_fits_after_casefolding(self):
+        from library.models import Tag
+
+        response = self.api.patch(f"/api/v6/documents/{self.logo.id}/", {"tags": ["ß" * 100]}, format="json")
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(Tag.objects.get(name="ß" * 100).key, "s" * 100)
+
+    def test_any_and_all_filters(self):
+        def names(query):
+            response = self.api.get(f"/api/v6/documents/?{query}")
+            self.assertEqual(response.status_code, 200)
+            return sorted(doc["name"] for doc in response.data["results"])
+
+        self.assertEqual(names("tags=contracts"), ["misc.pdf", "nda.pdf", "sow.pdf"])
+        self.assertEqual(names("tags=Contracts,brand"), ["misc.pdf"])
+        self.assertEqual(names("tags_any=signed,BRAND"), ["logo.png", "misc.pdf", "nda.pdf"])
+        self.assertEqual(names("tags=contracts&tags_any=signed,brand"), ["misc.pdf", "nda.pdf"])
+
+    def test_facets_per_folder_and_client(self):
+        def facets(query=""):
+            response = self.api.get(f"/api/v6/tags/facets/?{query}")
+            self.assertEqual(response.status_code, 200, response.data)
+            return [(row["name"], row["count"]) for row in response.data["tags"]]
+
+        self.assertEqual(facets(), [("Contracts", 3), ("Brand", 2), ("Signed", 1)])
+        self.assertEqual(facets(f"folder_id={self.root.id}"), [("Contracts", 2), ("Brand", 1), ("Signed", 1)])
+        self.assertEqual(facets(f"client_id={self.client_user.id}"), [("Contracts", 1), ("Signed", 1)])
+
+        self.sow.soft_delete()
+        self.assertEqual(facets(f"folder_id={self.root.id}"), [("Brand", 1), ("Contracts", 1), ("Signed", 1)])
+
+
+class DocumentListingTest(TestCase):
+    """The document list filters, sorts and pages on the server with a lean projection."""
+
+    def setUp(self):
+        from datetime import datetime
+
+        self.api = APIClient()
+        self.creator = User.objects.create_user(
+            email="creator@test.com",
+            full_name="Test Creator",
+            password="testpass123",
+            role="creator",
+        )
+        self.client_user = User.objects.create_user(
+            email="client@test.com",
+            full_name="Test Client",
+            password="testpass123",
+            role="client",
+        )
+        folder = Folder.objects.create(creator=self.creator, name="Work")
+
+        def make(name, file_type, size_kb, day, **extra):
+            doc = Document.objects.create(
+                creator=self.creator, folder=folder, name=name, file=f"library/{name}",
+                file_type=file_type, size_kb=size_kb, **extra,
+            )
+            updated = timezone.make_aware(datetime(2026, 3, day, 12))
+            Document.objects.filter(id=doc.id).update(updated_at=updated)
+            return doc
+
+        make("brief.pdf", "application/pdf", 120, 1, client=self.client_user, color_label="red")
+        make("cover.png", "image/png", 800, 2, is_locked=True)
+        make("draft.pdf", "application/pdf", 40, 3, color_label="red")
+        make("hero.jpg", "image/jpeg", 2400, 4, client=self.client_user)
+        make("notes.txt", "text/plain", 2, 5, is_deleted=True)
+        self.api.force_authenticate(self.creator)
+
+    def names(self, query=""):
+        response = self.api.get(f"/api/v6/documents/?{query}")
+        self.assertEqual(response.status_code, 200, response.data)
+        return [doc["name"] for doc in response.data["results"]]
+
+    def test_filters(self):
+        self.assertEqual(self.names("file_type=application/pdf"), ["draft.pdf", "brief.pdf"])
+        self.assertEqual(self.names("file_type=image/,text/plain"), ["hero.jpg", "cover.png"])
+        self.assertEqual(self.names(f"client_id={self.client_user.id}"), ["hero.jpg", "brief.pdf"])
+        self.assertEqual(self.names("color_label=red"), ["draft.pdf", "brief.pdf"])
+        self.assertEqual(self.names("is_locked=true"), ["cover.png"])
+        self.assertEqual(self.names("is_locked=false"), ["hero.jpg", "draft.pdf", "brief.pdf"])
+        self.assertEqual(self.names("updated_from=2026-03-02&updated_to=2026-03-03"), ["draft.pdf", "cover.png"])
+        self.assertEqual(self.names("min_size_kb=100&max_size_kb=800"), ["cover.png", "brief.pdf"])
+
+        response = self.api.get("/api/v6/documents/?min_size_kb=10&max_size_kb=1")
+        self.assertEqual(response.status_code, 400)
+
+    def test_sorts_and_lean_rows(self):
+        self.assertEqual(self.names("sort=name"), ["brief.pdf", "cover.png", "draft.pdf", "hero.jpg"])
+        self.assertEqual(self.names("sort=-size"), ["hero.jpg", "cover.png", "brief.pdf", "draft.pdf"])
+        self.assertEqual(self.names("sort=updated"), ["brief.pdf", "cover.png", "draft.pdf", "hero.jpg"])
+        self.assertEqual(self.api.get("/api/v6/documents/?sort=owner").status_code, 400)
+
+        with self.assertNumQueries(1):  # Folder names are joined in; nothing deferred is fetched per row
+            row = self.api.get("/api/v6/documents/").data["results"][0]
+        self.assertEqual(row["folder_name"], "Work")
+        for field in ("creator", "is_deleted", "deleted_at", "preview_url"):
+            self.assertNotIn(field, row)
+
+    def test_keyset_pages(self):
+        for sort in ("name", "-updated", "size"):
+            seen, cursor = [], None
+            while True:
+                query = f"sort={sort}&limit=3" + (f"&cursor={cursor}" if cursor else "")
+                data = self.api.get(f"/api/v6/documents/?{query}").data
+                seen += [doc["name"] for doc in data["results"]]
+                cursor = data["next_cursor"]
+                self.assertEqual(data["has_more"], cursor is not None)
+                if not cursor:
+                    break
+            self.assertEqual(seen, self.names(f"sort={sort}"))
+
+        # Rows with equal sort keys are ordered by id and never repeated across pages
+        Document.objects.update(size_kb=1)
+        first = self.api.get("/api/v6/documents/?sort=size&limit=2").data
+        rest = self.api.get(f"/api/v6/documents/?sort=size&limit=2&cursor={first['next_cursor']}").data
+        names = [doc["name"] for doc in first["results"] + rest["results"]]
+        self.assertEqual(sorted(names), ["brief.pdf", "cover.png", "draft.pdf", "hero.jpg"])
+
+        response = self.api.get("/api/v6/documents/?cursor=bogus")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {"error": "Invalid cursor"})
+
+    def test_clients_see_their_documents(self):
+        self.api.force_authenticate(self.client_user)
+        self.assertEqual(self.names("sort=name"), ["brief.pdf", "hero.jpg"])
+
+
+@override_settings(LIBRARY_EXTRACTION_IN_BACKGROUND=False, DERIVATIVES_IN_BACKGROUND=False)
+class DocumentVersionDeltaTest(TestCase):
+    """Opt-in delta storage keeps text versions as deltas between snapshots and rebuilds any of them."""
+
+    def setUp(self):
+        from unittest import mock
+        from library import activity, versions
+
+        self.addCleanup(activity.flush)
+        patcher = mock.patch.object(versions, "SNAPSHOT_EVERY", 3)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.api = APIClient()
+        self.creator = User.objects.create_user(
+            email="creator@test.com",
+            full_name="Test Creator",
+            password="testpass123",
+            role="creator",
+        )
+        self.folder = Folder.objects.create(creator=self.creator, name="Exports")
+        self.api.force_authenticate(self.creator)
+
+    @staticmethod
+    def revision(n):
+        rows = [f"{i},client-{i},{'paid' if i % 7 else 'due'},{i * 13}\n" for i in range(300)]
+        rows[n * 11] = f"{n * 11},client-{n * 11},edited in revision {n},0\n"
+        return ("id,name,status,amount\n" + "".join(rows)).encode()
+
+    def upload(self, name, data, content_type="text/csv"):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        response = self.api.post(
+            "/api/v6/documents/upload/",
+            {"folder_id": str(self.folder.id), "file": SimpleUploadedFile(name, data, content_type)},
+            format="multipart",
+        )
+        self.assertIn(response.status_code, (200, 201), response.data)
+        return Document.objects.get(id=response.data["id"])
+
+    @override_settings(LIBRARY_DELTA_VERSIONS=True)
+    def test_text_versions_are_deltas_between_snapshots(self):
+        from library import versions
+        from library.models import StoredBlob
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for n in range(7):
+                doc = self.upload("ledger.csv", self.revision(n))
+        self.assertEqual(doc.version, 7)
+
+        history = list(DocumentVersion.objects.filter(document=doc).order_by("version_number"))
+        self.assertEqual([v.chain_length for v in history], [0, 1, 2, 0, 1, 2])
+        self.assertEqual([v.is_delta for v in history], [False, True, True, False, True, True])
+        for n, version in enumerate(history):
+            self.assertEqual(versions.content(version), self.revision(n))
+            if version.is_delta:
+                self.assertFalse(version.file)
+                self.assertLess(version.stored_kb, version.size_kb / 10)
+
+        # Only the snapshots and the current file keep blobs
+        self.assertEqual(StoredBlob.objects.count(), 3)
+
+        report = versions.storage_report()
+        self.assertEqual(report["delta_versions"], 4)
+        self.assertGreater(report["saved_bytes"], 3 * len(self.revision(0)))
+
+        response = self.api.get(f"/api/v6/documents/{doc.id}/versions/")
+        self.assertEqual([v["is_delta"] for v in response.data], [True, True, False, True, True, False])
+
+        response = self.api.get(f"/api/v6/documents/{doc.id}/versions/{history[2].id}/file/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, self.revision(2))
+        self.assertIn('filename="ledger (v3).csv"', response["Content-Disposition"])
+
+        response = self.api.get(f"/api/v6/documents/{doc.id}/versions/{history[3].id}/file/")
+        self.assertEqual(b"".join(response.streaming_content), self.revision(3))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            doc.delete()  # Deltas go with the versions they are based on
+        self.assertFalse(DocumentVersion.objects.exists())
+        self.assertFalse(StoredBlob.objects.exists())
+
+    def test_full_copies_unless_enabled_and_text(self):
+        for n in range(3):
+            doc = self.upload("ledger.csv", self.revision(n))
+        self.assertFalse(DocumentVersion.objects.filter(document=doc, base__isnull=False).exists())
+
+        with override_settings(LIBRARY_DELTA_VERSIONS=True):
+            for n in range(3):
+                image = self.upload("scan.png", self.revision(n), "image/png")
+        self.assertFalse(DocumentVersion.objects.filter(document=image, base__isnull=False).exists())
+        self.assertEqual(
+            list(DocumentVersion.objects.filter(document=image).values_list("stored_kb", flat=True)),
+            list(DocumentVersion.objects.filter(document=image).values_list("size_kb", flat=True)),
+        )
+
+    def test_delta_round_trip_and_wrong_base(self):
+        from utils import delta
+
+        base, target = self.revision(1), self.revision(2)
+        packed = delta.diff(base, target)
+        self.assertEqual(delta.patch(base, packed), target)
+        self.assertEqual(delta.patch(b"", delta.diff(b"", b"no newline")), b"no newline")
+        with self.assertRaises(delta.DeltaError):
+            delta.patch(self.revision(3), packed)
+
+    @override_settings(LIBRARY_DELTA_VERSIONS=True)
+    def test_report_command(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        for n in range(3):
+            self.upload("ledger.csv", self.revision(n))
+        out = StringIO()
+        call_command("report_version_storage", stdout=out)
+        self.assertIn("2 version(s), 1 stored as deltas", out.getvalue())
+        self.assertNotIn("Saved 0 ", out.getvalue())
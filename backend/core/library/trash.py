@@ -0,0 +1,124 @@
+"""
+Trash purge — permanently removes documents left in the trash longer
+than TRASH_RETENTION, along with their versions and stored files.
+
+Work is done in batches. Each batch locks up to batch_size expired
+documents (skipping any a request is touching), deletes them — which
+cascades to versions, activity and search rows and releases their blob
+references — and commits straight away, so no lock is held while files
+are removed. The stored files that are no longer referenced (unshared
+blobs, plus any file kept outside the blob store by older uploads) are
+then deleted from storage by a pool of worker threads. Totals are
+recorded as a TrashPurgeRun.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import Document, DocumentVersion, TrashPurgeRun, TRASH_RETENTION
+from . import blobs
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = getattr(settings, "LIBRARY_TRASH_PURGE_BATCH_SIZE", 200)
+MAX_WORKERS = getattr(settings, "LIBRARY_TRASH_PURGE_WORKERS", 8)
+
+
+def expired(cutoff):
+    """Trashed documents deleted before `cutoff`."""
+    return Document.objects.filter(is_deleted=True, deleted_at__lt=cutoff)
+
+
+class _FileDeleter:
+    """Deletes stored files on a thread pool, counting successes and failures."""
+
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self.deleted = 0
+        self.errors = 0
+
+    def _delete(self, storage, name):
+        try:
+            storage.delete(name)
+            return True
+        except Exception as exc:  # Left behind; the next purge or a storage sweep can retry
+            logger.warning("Could not delete %s from storage: %s", name, exc)
+            return False
+
+    def __call__(self, storage, names):
+        if not names:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(names))) as pool:
+            results = list(pool.map(lambda name: self._delete(storage, name), names))
+        self.deleted += sum(results)
+        self.errors += len(results) - sum(results)
+
+
+def _unshared_files(names):
+    """Those of `names` that no remaining document or version points at."""
+    if not names:
+        return []
+    in_use = set(Document.objects.filter(file__in=names).values_list("file", flat=True))
+    in_use.update(DocumentVersion.objects.filter(file__in=names).values_list("file", flat=True))
+    return [name for name in names if name not in in_use]
+
+
+def purge_batch(cutoff, run, deleter, batch_size=BATCH_SIZE):
+    """Purge one batch into `run`'s totals; returns the number of documents removed."""
+    with transaction.atomic(), blobs.deferred_collection() as released:
+        ids = list(
+            expired(cutoff).select_for_update(skip_locked=True)
+            .order_by("deleted_at").values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0
+        versions = DocumentVersion.objects.filter(document_id__in=ids)
+        documents = Document.objects.filter(id__in=ids)
+
+        # Files from before blob storage belong to their row alone
+        loose_files = [
+            *documents.filter(blob__isnull=True).exclude(file="").values_list("file", flat=True),
+            *versions.filter(blob__isnull=True).exclude(file="").values_list("file", flat=True),
+        ]
+        size_kb = (documents.aggregate(kb=Sum("size_kb"))["kb"] or 0) + (versions.aggregate(kb=Sum("stored_kb"))["kb"] or 0)
+        run.versions += versions.count()
+
+        documents.delete()  # Cascades; releases blob references into `released`
+
+    # Committed: nothing can reach these rows or files any more
+    run.batches += 1
+    run.documents += len(ids)
+    run.bytes_freed += round(size_kb * 1024)
+    if released:
+        run.blobs_removed += blobs.collect_garbage(released, batch_size=len(released), delete_files=deleter)
+    storage = Document._meta.get_field("file").storage
+    deleter(storage, _unshared_files(sorted(set(loose_files))))
+    return len(ids)
+
+
+def purge(batch_size=BATCH_SIZE, max_workers=MAX_WORKERS, now=None, max_batches=None):
+    """Purge all expired trash, batch by batch; returns the saved TrashPurgeRun."""
+    started_at = timezone.now()
+    cutoff = (now or started_at) - TRASH_RETENTION
+    run = TrashPurgeRun(started_at=started_at, cutoff=cutoff)
+    deleter = _FileDeleter(max_workers)
+
+    while max_batches is None or run.batches < max_batches:
+        if purge_batch(cutoff, run, deleter, batch_size) < batch_size:
+            break
+
+    run.files_deleted = deleter.deleted
+    run.file_errors = deleter.errors
+    run.finished_at = timezone.now()
+    run.save()
+    logger.info(
+        "Purged %d trashed document(s) and %d version(s) in %d batch(es); "
+        "freed %d bytes, removed %d blob(s), deleted %d file(s), %d failed",
+        run.documents, run.versions, run.batches, run.bytes_freed,
+        run.blobs_removed, run.files_deleted, run.file_errors,
+    )
+    return run
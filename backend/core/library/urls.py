@@ -3,27 +3,40 @@ from django.urls import path
 from .views import (
     # Folders
     FolderListView,
+    FolderTreeView,
     FolderCreateView,
     FolderDetailView,
+    FolderMoveView,
+    FolderSubtreeDocumentsView,
+    FolderDownloadView,
+    FolderAnalyticsView,
     # Documents
     DocumentUploadView,
     DocumentListView,
     DocumentDetailView,
+    DocumentFileView,
     DocumentReuploadView,
+    DocumentDownloadView,
     # Trash
     DocumentTrashListView,
     DocumentRestoreView,
     DocumentPermanentDeleteView,
     # Versioning
     DocumentVersionListView,
+    DocumentVersionFileView,
     # Activity
     DocumentActivityListView,
+    DocumentAnalyticsView,
+    # Tags
+    TagFacetView,
     # Search
     DocumentSearchView,
     # Sharing
     DocumentShareLinkCreateView,
     DocumentShareLinkListView,
+    DocumentShareLinkRevokeView,
     SharedDocumentPublicView,
+    SharedDocumentDownloadView,
     # Lock
     DocumentLockToggleView,
 )
@@ -31,26 +44,40 @@ from .views import (
 urlpatterns = [
     # Folders
     path("folders/", FolderListView.as_view(), name="library-folder-list"),
+    path("folders/tree/", FolderTreeView.as_view(), name="library-folder-tree"),
     path("folders/create/", FolderCreateView.as_view(), name="library-folder-create"),
     path("folders/<uuid:pk>/", FolderDetailView.as_view(), name="library-folder-detail"),
+    path("folders/<uuid:pk>/move/", FolderMoveView.as_view(), name="library-folder-move"),
+    path("folders/<uuid:pk>/documents/", FolderSubtreeDocumentsView.as_view(), name="library-folder-documents"),
+    path("folders/<uuid:pk>/download/", FolderDownloadView.as_view(), name="library-folder-download"),
+    path("folders/<uuid:pk>/analytics/", FolderAnalyticsView.as_view(), name="library-folder-analytics"),
 
     # Documents
     path("documents/", DocumentListView.as_view(), name="library-document-list"),
     path("documents/upload/", DocumentUploadView.as_view(), name="library-document-upload"),
     path("documents/trash/", DocumentTrashListView.as_view(), name="library-trash"),
+    path("documents/download/", DocumentDownloadView.as_view(), name="library-document-download"),
     path("documents/<uuid:pk>/", DocumentDetailView.as_view(), name="library-document-detail"),
+    path("documents/<uuid:pk>/file/", DocumentFileView.as_view(), name="library-document-file"),
     path("documents/<uuid:pk>/reupload/", DocumentReuploadView.as_view(), name="library-document-reupload"),
     path("documents/<uuid:pk>/restore/", DocumentRestoreView.as_view(), name="library-document-restore"),
     path("documents/<uuid:pk>/permanent/", DocumentPermanentDeleteView.as_view(), name="library-document-permanent-delete"),
     path("documents/<uuid:pk>/versions/", DocumentVersionListView.as_view(), name="library-document-versions"),
+    path("documents/<uuid:pk>/versions/<uuid:version_id>/file/", DocumentVersionFileView.as_view(), name="library-document-version-file"),
     path("documents/<uuid:pk>/activity/", DocumentActivityListView.as_view(), name="library-document-activity"),
+    path("documents/<uuid:pk>/analytics/", DocumentAnalyticsView.as_view(), name="library-document-analytics"),
     path("documents/<uuid:pk>/share/", DocumentShareLinkCreateView.as_view(), name="library-document-share-create"),
     path("documents/<uuid:pk>/shares/", DocumentShareLinkListView.as_view(), name="library-document-share-list"),
+    path("documents/<uuid:pk>/shares/<uuid:link_id>/", DocumentShareLinkRevokeView.as_view(), name="library-document-share-revoke"),
     path("documents/<uuid:pk>/lock/", DocumentLockToggleView.as_view(), name="library-document-lock"),
 
+    # Tags
+    path("tags/facets/", TagFacetView.as_view(), name="library-tag-facets"),
+
     # Search
     path("search/", DocumentSearchView.as_view(), name="library-search"),
 
     # Public shared document
     path("shared/<str:slug>/", SharedDocumentPublicView.as_view(), name="library-shared-document"),
+    path("shared/<str:slug>/download/", SharedDocumentDownloadView.as_view(), name="library-shared-document-download"),
 ]
@@ -0,0 +1,149 @@
+"""
+Library versions — archiving a document's current file as a
+DocumentVersion, and reading any version back.
+
+archive() runs just before a document takes a new file. By default the
+version takes over the document's blob reference: a full copy,
+deduplicated by library.blobs. With LIBRARY_DELTA_VERSIONS on, a
+text-like file (see is_text_like) of at most DELTA_MAX_BYTES is instead
+stored as a compressed delta (utils.delta) against the version archived
+before it, and the blob reference is dropped. A run of deltas always
+starts from a full snapshot and a new snapshot is taken once it holds
+SNAPSHOT_EVERY - 1 deltas, so rebuilding a version never applies more
+than that many. A delta that would not save at least a quarter of the
+file is not worth keeping; the version is then stored in full.
+
+content() rebuilds any version's bytes; storage_report() totals what
+the deltas save.
+"""
+import os
+
+from django.conf import settings
+from django.db.models import Count, Q, Sum
+
+from utils import delta
+from . import blobs
+from .models import DocumentVersion
+
+SNAPSHOT_EVERY = getattr(settings, "LIBRARY_DELTA_SNAPSHOT_EVERY", 10)
+DELTA_MAX_BYTES = getattr(settings, "LIBRARY_DELTA_MAX_BYTES", 10 * 1024 * 1024)
+MAX_DELTA_RATIO = 0.75
+
+TEXT_TYPES = {
+    "application/json", "application/x-ndjson", "application/xml", "application/csv",
+    "application/yaml", "application/x-yaml", "application/javascript", "image/svg+xml",
+}
+TEXT_EXTENSIONS = {
+    ".txt", ".md", ".markdown", ".csv", ".tsv", ".json", ".ndjson",
+    ".xml", ".yaml", ".yml", ".html", ".htm", ".svg",
+}
+
+
+def is_text_like(name, file_type):
+    file_type = (file_type or "").split(";")[0].strip().lower()
+    return (
+        file_type.startswith("text/")
+        or file_type in TEXT_TYPES
+        or os.path.splitext(name or "")[1].lower() in TEXT_EXTENSIONS
+    )
+
+
+def _read(field_file):
+    with field_file.storage.open(field_file.name, "rb") as fh:
+        return fh.read()
+
+
+def _delta_base(document):
+    """The version to store `document`'s current file as a delta against, or None for a full copy."""
+    if not getattr(settings, "LIBRARY_DELTA_VERSIONS", False):
+        return None
+    if not document.blob_id or document.size_kb * 1024 > DELTA_MAX_BYTES:
+        return None
+    if not is_text_like(document.name, document.file_type):
+        return None
+    previous = DocumentVersion.objects.filter(document=document).order_by("-version_number").first()
+    if previous is None or previous.chain_length + 1 >= SNAPSHOT_EVERY:
+        return None
+    if previous.size_kb * 1024 > DELTA_MAX_BYTES:
+        return None
+    return previous
+
+
+def archive(document, uploaded_by=None):
+    """Record `document`'s current file as its version `document.version`; returns the version."""
+    version = DocumentVersion(
+        document=document,
+        version_number=document.version,
+        file_type=document.file_type,
+        size_kb=document.size_kb,
+        stored_kb=document.size_kb,
+        uploaded_by=uploaded_by,
+    )
+    base = _delta_base(document)
+    if base is not None:
+        try:
+            target = _read(document.file)
+            packed = delta.diff(content(base), target)
+        except (OSError, delta.DeltaError):  # Unreadable base or file: keep the full copy
+            packed, target = None, b""
+        if packed is not None and len(packed) <= len(target) * MAX_DELTA_RATIO:
+            version.base = base
+            version.delta = packed
+            version.chain_length = base.chain_length + 1
+            version.stored_kb = len(packed) / 1024
+            version.save()
+            blobs.release(document.blob_id)  # The delta replaces the document's reference
+            return version
+
+    # Full copy: the version takes over the document's blob reference
+    version.file = document.file.name
+    version.blob_id = document.blob_id
+    version.save()
+    return version
+
+
+def _chain(version):
+    """`version`'s full snapshot followed by each delta version up to and including it."""
+    nearby = {
+        v.id: v for v in DocumentVersion.objects.filter(
+            document_id=version.document_id,
+            version_number__range=(version.version_number - version.chain_length, version.version_number - 1),
+        )
+    }
+    chain = [version]
+    while chain[-1].base_id is not None:
+        base_id = chain[-1].base_id
+        chain.append(nearby.get(base_id) or DocumentVersion.objects.get(id=base_id))
+    chain.reverse()
+    return chain
+
+
+def content(version):
+    """The bytes of any version, applying at most SNAPSHOT_EVERY - 1 deltas to its snapshot."""
+    if not version.is_delta:
+        return _read(version.file)
+    snapshot, *deltas = _chain(version)
+    data = _read(snapshot.file)
+    for step in deltas:
+        data = delta.patch(data, bytes(step.delta))
+    return data
+
+
+def storage_report(versions=None):
+    """Version counts and bytes represented, stored and saved by deltas, over `versions` (default: all)."""
+    qs = versions if versions is not None else DocumentVersion.objects.all()
+    totals = qs.aggregate(
+        versions=Count("id"),
+        delta_versions=Count("id", filter=Q(base__isnull=False)),
+        size_kb=Sum("size_kb"),
+        stored_kb=Sum("stored_kb"),
+    )
+    size_bytes = round((totals["size_kb"] or 0) * 1024)
+    stored_bytes = round((totals["stored_kb"] or 0) * 1024)
+    return {
+        "versions": totals["versions"],
+        "delta_versions": totals["delta_versions"],
+        "size_bytes": size_bytes,
+        "stored_bytes": stored_bytes,
+        "saved_bytes": size_bytes - stored_bytes,
+    }
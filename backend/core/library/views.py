@@ -2,27 +2,47 @@
 Library views — Creator-only Document Library with full CRUD,
 versioning, sharing, tagging, and activity logging.
 """
+import os
+
 from rest_framework.views import APIView
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
-from django.utils import timezone
+from django.db import transaction
 from django.db.models import Q
-from datetime import timedelta
-
-from .models import Folder, Document, DocumentVersion, DocumentActivity, DocumentShareLink
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.http import content_disposition_header
+
+from uploads import quota
+from uploads.services import UploadError, incoming_file
+from utils.http import conditional_response
+from utils.delta import DeltaError
+from utils.pagination import InvalidCursor, parse_limit
+from utils.storage import serve_file
+from utils.zipstream import safe_name, unique_name, zip_response
+from .models import Folder, Document, DocumentVersion, DocumentActivity, DocumentShareLink, TRASH_RETENTION
+from . import activity, blobs, listing, search, sharing, tags, versions
 from .serializers import (
     FolderSerializer,
+    FolderTreeSerializer,
     FolderCreateSerializer,
     FolderRenameSerializer,
+    FolderMoveSerializer,
+    FolderBreadcrumbSerializer,
     DocumentSerializer,
+    DocumentListItemSerializer,
+    DocumentListQuerySerializer,
     DocumentUploadSerializer,
     DocumentUpdateSerializer,
     DocumentReuploadSerializer,
     DocumentVersionSerializer,
     DocumentActivitySerializer,
+    ActivityRangeSerializer,
+    TagFacetQuerySerializer,
     DocumentShareLinkSerializer,
     DocumentShareLinkCreateSerializer,
+    DocumentDownloadSerializer,
 )
 
 
@@ -44,7 +64,7 @@ class FolderListView(APIView):
     permission_classes = [permissions.IsAuthenticated, IsCreatorRole]
 
     def get(self, request):
-        qs = Folder.objects.filter(creator=request.user)
+        qs = Folder.objects.filter(creator=request.user).with_counts()
 
         parent_id = request.query_params.get("parent_id")
         if parent_id == "null" or parent_id == "":
@@ -59,6 +79,36 @@ class FolderListView(APIView):
         return Response(FolderSerializer(qs, many=True).data)
 
 
+class FolderTreeView(APIView):
+    """
+    GET /api/v6/folders/tree/
+    Returns the creator's whole folder hierarchy, nested via "children",
+    with document/subfolder counts. One query regardless of tree size.
+    Query params: ?type=<CLIENT|TEMPLATE|INTERNAL> (filters root folders)
+    """
+    permission_classes = [permissions.IsAuthenticated, IsCreatorRole]
+
+    def get(self, request):
+        folders = list(Folder.objects.filter(creator=request.user).with_counts())
+
+        by_id = {folder.id: folder for folder in folders}
+        roots = []
+        for folder in folders:
+            folder.tree_children = []
+        for folder in folders:
+            parent = by_id.get(folder.parent_folder_id)
+            if parent is not None:
+                parent.tree_children.append(folder)
+            else:
+                roots.append(folder)
+
+        folder_type = request.query_params.get("type")
+        if folder_type:
+            roots = [f for f in roots if f.folder_type == folder_type.upper()]
+
+        return Response(FolderTreeSerializer(roots, many=True).data)
+
+
 class FolderCreateView(APIView):
     """
     POST /api/v6/folders/
@@ -109,15 +159,18 @@ class FolderDetailView(APIView):
 
     def get(self, request, pk):
         try:
-            folder = Folder.objects.get(id=pk, creator=request.user)
+            folder = Folder.objects.with_counts().get(id=pk, creator=request.user)
         except Folder.DoesNotExist:
             return Response({"error": "Folder not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        subfolders = Folder.objects.filter(parent_folder=folder, creator=request.user)
-        documents = Document.objects.filter(folder=folder, creator=request.user, is_deleted=False)
+        subfolders = Folder.objects.filter(parent_folder=folder, creator=request.user).with_counts()
+        documents = Document.objects.filter(
+            folder=folder, creator=request.user, is_deleted=False,
+        ).select_related("folder")
 
         return Response({
             "folder": FolderSerializer(folder).data,
+            "breadcrumbs": FolderBreadcrumbSerializer(folder.breadcrumbs(), many=True).data,
             "subfolders": FolderSerializer(subfolders, many=True).data,
             "documents": DocumentSerializer(documents, many=True).data,
         })
@@ -142,10 +195,115 @@ class FolderDetailView(APIView):
         except Folder.DoesNotExist:
             return Response({"error": "Folder not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        folder.delete()
+        # Delete the whole subtree at once rather than cascading level by level
+        Folder.objects.filter(creator=request.user).subtree_of(folder).delete()
         return Response({"message": "Folder deleted"}, status=status.HTTP_200_OK)
 
 
+class FolderMoveView(APIView):
+    """
+    POST /api/v6/folders/<id>/move/
+    Move a folder (and its whole subtree) under a new parent, or to the root.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsCreatorRole]
+
+    def post(self, request, pk):
+        try:
+            folder = Folder.objects.get(id=pk, creator=request.user)
+        except Folder.DoesNotExist:
+            return Response({"error": "Folder not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        serializer = FolderMoveSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        parent = None
+        parent_id = serializer.validated_data["parent_folder_id"]
+        if parent_id:
+            try:
+                parent = Folder.objects.get(id=parent_id, creator=request.user)
+            except Folder.DoesNotExist:
+                return Response(
+                    {"error": "Parent folder not found"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+
+        try:
+            folder.move_to(parent)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(FolderSerializer(folder).data)
+
+
+class FolderSubtreeDocumentsView(APIView):
+    """
+    GET /api/v6/folders/<id>/documents/
+    Every live document anywhere under this folder, plus subtree totals.
+    A single path-prefix query, however deep the tree.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsCreatorRole]
+
+    def get(self, request, pk):
+        try:
+            folder = Folder.objects.get(id=pk, creator=request.user)
+        except Folder.DoesNotExist:
+            return Response({"error": "Folder not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        documents = Document.objects.filter(
+            creator=request.user,
+            folder__path__startswith=folder.path,
+            is_deleted=False,
+        ).select_related("folder")
+        descendant_count = Folder.objects.filter(
+            creator=request.user,
+        ).subtree_of(folder).exclude(id=folder.id).count()
+
+        documents_data = DocumentSerializer(documents, many=True).data
+        return Response({
+            "folder": FolderSerializer(folder).data,
+            "descendant_folder_count": descendant_count,
+            "document_count": len(documents_data),
+            "documents": documents_data,
+        })
+
+
+class FolderDownloadView(APIView):
+    """
+    GET /api/v6/folders/<id>/download/
+    Stream a ZIP of every live document under this folder, laid out by
+    subfolder. Logs a DOWNLOADED activity per document.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsCreatorRole]
+
+    def get(self, request, pk):
+        try:
+            folder = Folder.objects.get(id=pk, creator=request.user)
+        except Folder.DoesNotExist:
+            return Response({"error": "Folder not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        names = dict(
+            Folder.objects.filter(creator=request.user).subtree_of(folder).values_list("id", "name")
+        )
+        documents = list(
+            Document.objects.filter(
+                creator=request.user,
+                folder__path__startswith=folder.path,
+                is_deleted=False,
+            ).select_related("folder").order_by("folder__path", "name")
+        )
+
+        taken = set()
+        entries = []
+        for doc in documents:
+            # Folder chain from the downloaded folder down to the document's folder
+            chain = [*doc.folder.ancestor_ids, doc.folder_id][folder.depth:]
+            directory = "/".join(safe_name(names[fid], "folder") for fid in chain)
+            entries.append((unique_name(f"{directory}/{safe_name(doc.name)}", taken), doc.file, doc.updated_at))
+
+        activity.log_many(documents, request.user, "DOWNLOADED")
+        return zip_response(entries, f"{safe_name(folder.name, 'folder')}.zip")
+
+
 # ── Document CRUD ─────────────────────────────────────────────────────
 
 class DocumentUploadView(APIView):
@@ -153,10 +311,10 @@ class DocumentUploadView(APIView):
     POST /api/v6/documents/
     Upload a file to a folder. If a file with the same name exists in
     the folder, the old file is archived as a version and the new file
-    replaces it (version increment).
+    replaces it (version increment). Bytes already in storage are reused.
     """
     permission_classes = [permissions.IsAuthenticated, IsCreatorRole]
-    parser_classes = [MultiPartParser, FormParser]
+    parser_classes = [MultiPartParser, FormParser, JSONParser]
 
     def post(self, request):
         serializer = DocumentUploadSerializer(data=request.data)
@@ -172,62 +330,60 @@ class DocumentUploadView(APIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        uploaded_file = data["file"]
-        file_name = uploaded_file.name
-        file_type = uploaded_file.content_type or ""
-        size_kb = uploaded_file.size / 1024
-
-        # Check for existing file with same name → version it
-        existing = Document.objects.filter(
-            folder=folder,
-            creator=request.user,
-            name=file_name,
-            is_deleted=False,
-        ).first()
-
-        if existing:
-            # Archive current version
-            DocumentVersion.objects.create(
-                document=existing,
-                version_number=existing.version,
-                file=existing.file,
-                file_type=existing.file_type,
-                size_kb=existing.size_kb,
-                uploaded_by=request.user,
-            )
-
-            # Update document with new file
-            existing.file = uploaded_file
-            existing.file_type = file_type
-            existing.size_kb = size_kb
-            existing.version += 1
-            existing.tags = data.get("tags", existing.tags)
-            if data.get("color_label"):
-                existing.color_label = data["color_label"]
-            existing.save()
-
-            doc = existing
-        else:
-            # Create new document
-            doc = Document.objects.create(
-                creator=request.user,
-                folder=folder,
-                client=folder.client,
-                name=file_name,
-                file=uploaded_file,
-                file_type=file_type,
-                size_kb=size_kb,
-                tags=data.get("tags", []),
-                color_label=data.get("color_label", ""),
-            )
+        try:
+            with transaction.atomic():
+                # Either a multipart file or a completed chunked upload (uploads app)
+                with incoming_file(request.user, data.get("file"), data.get("upload_id")) as uploaded_file:
+                    quota.ensure_room(request.user.id, uploaded_file.size)
+                    # Identical bytes already in storage are reused, not re-uploaded
+                    blob = blobs.store_upload(uploaded_file)
+                file_name = uploaded_file.name
+                file_type = uploaded_file.content_type or ""
+                size_kb = blob.size / 1024
+
+                # Check for existing file with same name → version it
+                existing = Document.objects.filter(
+                    folder=folder,
+                    creator=request.user,
+                    name=file_name,
+                    is_deleted=False,
+                ).first()
+
+                if existing:
+                    # Archive current version (full copy or delta, see library.versions)
+                    versions.archive(existing, request.user)
+
+                    # Update document with new file
+                    existing.file = blob.file.name
+                    existing.blob = blob
+                    existing.file_type = file_type
+                    existing.size_kb = size_kb
+                    existing.version += 1
+                    existing.tags = data.get("tags", existing.tags)
+                    if data.get("color_label"):
+                        existing.color_label = data["color_label"]
+                    existing.save()
+
+                    doc = existing
+                else:
+                    # Create new document
+                    doc = Document.objects.create(
+                        creator=request.user,
+                        folder=folder,
+                        client=folder.client,
+                        name=file_name,
+                        file=blob.file.name,
+                        blob=blob,
+                        file_type=file_type,
+                        size_kb=size_kb,
+                        tags=data.get("tags", []),
+                        color_label=data.get("color_label", ""),
+                    )
+        except UploadError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
         # Log activity
-        DocumentActivity.objects.create(
-            document=doc,
-            actor=request.user,
-            actor_role=request.user.role,
-            action="UPLOADED",
-        )
+        activity.log(doc, request.user, "UPLOADED")
 
         return Response(
             DocumentSerializer(doc).data,
@@ -238,27 +394,111 @@ class DocumentUploadView(APIView):
 class DocumentListView(APIView):
     """
     GET /api/v6/documents/
-    List documents accessible to the authenticated user.
+    List documents accessible to the authenticated user, one page at a time.
     Creator: all their own documents. Client: documents in their client folder.
+    Query params: ?folder_id=, ?client_id= (creators)
+                  ?tags=a,b (all), ?tags_any=a,b (any)
+                  ?file_type=application/pdf,image/ (exact, or "family/" prefix)
+                  ?color_label=, ?is_locked=true|false
+                  ?updated_from=YYYY-MM-DD, ?updated_to=YYYY-MM-DD (inclusive)
+                  ?min_size_kb=, ?max_size_kb=
+                  ?sort=name|updated|size (prefix "-" for descending; default -updated)
+                  ?cursor=<next_cursor>&limit=50
+
+    Keyset-paginated on (sort key, id), see library.listing.
     """
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
+        params = DocumentListQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+
         user = request.user
         if user.role == "creator":
             qs = Document.objects.filter(creator=user, is_deleted=False)
+            if filters.get("folder_id"):
+                qs = qs.filter(folder_id=filters["folder_id"])
         elif user.role == "client":
             qs = Document.objects.filter(client=user, is_deleted=False)
+            filters.pop("client_id", None)
         else:
             qs = Document.objects.none()
 
-        qs = qs.select_related("folder")
+        qs = listing.apply_filters(qs, filters)
 
-        folder_id = request.query_params.get("folder_id")
-        if folder_id and user.role == "creator":
-            qs = qs.filter(folder_id=folder_id)
+        # ?tags=a,b matches documents with all of them; ?tags_any=a,b with any
+        for param, mode in (("tags", "all_of"), ("tags_any", "any_of")):
+            if request.query_params.get(param):
+                qs = tags.filter_documents(qs, **{mode: request.query_params[param].split(",")})
 
-        return Response(DocumentSerializer(qs, many=True).data)
+        try:
+            documents, next_cursor = listing.page(
+                qs,
+                sort=filters["sort"],
+                cursor=request.query_params.get("cursor"),
+                limit=parse_limit(request.query_params.get("limit")),
+            )
+        except InvalidCursor:
+            return Response({"error": "Invalid cursor"}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            "results": DocumentListItemSerializer(documents, many=True).data,
+            "has_more": next_cursor is not None,
+            "next_cursor": next_cursor,
+        })
+
+
+class DocumentDownloadView(APIView):
+    """
+    POST /api/v6/documents/download/
+    Stream a ZIP of the selected documents: {"document_ids": [...]}.
+    Logs a DOWNLOADED activity per document.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsCreatorRole]
+
+    def post(self, request):
+        serializer = DocumentDownloadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        documents = list(
+            Document.objects.filter(
+                id__in=serializer.validated_data["document_ids"],
+                creator=request.user,
+                is_deleted=False,
+            ).order_by("name")
+        )
+        if not documents:
+            return Response({"error": "No documents found"}, status=status.HTTP_404_NOT_FOUND)
+
+        taken = set()
+        entries = [(unique_name(safe_name(doc.name), taken), doc.file, doc.updated_at) for doc in documents]
+        activity.log_many(documents, request.user, "DOWNLOADED")
+        return zip_response(entries, "documents.zip")
+
+
+class DocumentFileView(APIView):
+    """
+    GET /api/v6/documents/<id>/file/
+    Stream the document's current file — to its creator, or to the client
+    it belongs to. Supports Range requests; see utils.storage.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        doc = Document.objects.filter(
+            Q(creator=request.user) | Q(client=request.user), id=pk, is_deleted=False,
+        ).first()
+        if doc is None:
+            return Response({"error": "Document not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        response = serve_file(request, doc.file.storage, doc.file.name, filename=doc.name)
+        if response is None:
+            return Response({"error": "File not found"}, status=status.HTTP_404_NOT_FOUND)
+        if "Content-Range" not in response:  # Only count whole downloads, not each seek
+            activity.log(doc, request.user, "DOWNLOADED")
+        response["Cache-Control"] = "private, no-cache"
+        return response
 
 
 class DocumentDetailView(APIView):
@@ -276,12 +516,7 @@ class DocumentDetailView(APIView):
             return Response({"error": "Document not found"}, status=status.HTTP_404_NOT_FOUND)
 
         # Log view activity
-        DocumentActivity.objects.create(
-            document=doc,
-            actor=request.user,
-            actor_role=request.user.role,
-            action="VIEWED",
-        )
+        activity.log(doc, request.user, "VIEWED")
 
         return Response(DocumentSerializer(doc).data)
 
@@ -312,12 +547,7 @@ class DocumentDetailView(APIView):
         doc.save()
 
         # Log edit activity
-        DocumentActivity.objects.create(
-            document=doc,
-            actor=request.user,
-            actor_role=request.user.role,
-            action="EDITED",
-        )
+        activity.log(doc, request.user, "EDITED")
 
         return Response(DocumentSerializer(doc).data)
 
@@ -330,12 +560,7 @@ class DocumentDetailView(APIView):
         doc.soft_delete()
 
         # Log deletion
-        DocumentActivity.objects.create(
-            document=doc,
-            actor=request.user,
-            actor_role=request.user.role,
-            action="DELETED",
-        )
+        activity.log(doc, request.user, "DELETED")
 
         return Response({"message": "Document moved to trash"})
 
@@ -346,7 +571,7 @@ class DocumentReuploadView(APIView):
     Upload a new version of an existing document.
     """
     permission_classes = [permissions.IsAuthenticated, IsCreatorRole]
-    parser_classes = [MultiPartParser, FormParser]
+    parser_classes = [MultiPartParser, FormParser, JSONParser]
 
     def post(self, request, pk):
         try:
@@ -362,33 +587,29 @@ class DocumentReuploadView(APIView):
 
         serializer = DocumentReuploadSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
 
-        uploaded_file = serializer.validated_data["file"]
-
-        # Archive current version
-        DocumentVersion.objects.create(
-            document=doc,
-            version_number=doc.version,
-            file=doc.file,
-            file_type=doc.file_type,
-            size_kb=doc.size_kb,
-            uploaded_by=request.user,
-        )
-
-        # Update document
-        doc.file = uploaded_file
-        doc.file_type = uploaded_file.content_type or ""
-        doc.size_kb = uploaded_file.size / 1024
-        doc.version += 1
-        doc.save()
+        try:
+            with transaction.atomic():
+                with incoming_file(request.user, data.get("file"), data.get("upload_id")) as uploaded_file:
+                    quota.ensure_room(request.user.id, uploaded_file.size)
+                    blob = blobs.store_upload(uploaded_file)
+
+                # Archive current version (full copy or delta, see library.versions)
+                versions.archive(doc, request.user)
+
+                # Update document
+                doc.file = blob.file.name
+                doc.blob = blob
+                doc.file_type = uploaded_file.content_type or ""
+                doc.size_kb = blob.size / 1024
+                doc.version += 1
+                doc.save()
+        except UploadError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
         # Log activity
-        DocumentActivity.objects.create(
-            document=doc,
-            actor=request.user,
-            actor_role=request.user.role,
-            action="UPLOADED",
-        )
+        activity.log(doc, request.user, "UPLOADED")
 
         return Response(DocumentSerializer(doc).data)
 
@@ -403,7 +624,7 @@ class DocumentTrashListView(APIView):
     permission_classes = [permissions.IsAuthenticated, IsCreatorRole]
 
     def get(self, request):
-        cutoff = timezone.now() - timedelta(days=30)
+        cutoff = timezone.now() - TRASH_RETENTION
         docs = Document.objects.filter(
             creator=request.user,
             is_deleted=True,
@@ -427,12 +648,7 @@ class DocumentRestoreView(APIView):
 
         doc.restore()
 
-        DocumentActivity.objects.create(
-            document=doc,
-            actor=request.user,
-            actor_role=request.user.role,
-            action="RESTORED",
-        )
+        activity.log(doc, request.user, "RESTORED")
 
         return Response(DocumentSerializer(doc).data)
 
@@ -469,8 +685,38 @@ class DocumentVersionListView(APIView):
         except Document.DoesNotExist:
             return Response({"error": "Document not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        versions = DocumentVersion.objects.filter(document=doc)
-        return Response(DocumentVersionSerializer(versions, many=True).data)
+        history = DocumentVersion.objects.filter(document=doc).defer("delta")
+        return Response(DocumentVersionSerializer(history, many=True).data)
+
+
+class DocumentVersionFileView(APIView):
+    """
+    GET /api/v6/documents/<id>/versions/<version_id>/file/
+    Download a previous version; delta-stored versions are rebuilt on the fly.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsCreatorRole]
+
+    def get(self, request, pk, version_id):
+        version = DocumentVersion.objects.select_related("document").filter(
+            id=version_id, document_id=pk, document__creator=request.user,
+        ).first()
+        if version is None:
+            return Response({"error": "Version not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        root, extension = os.path.splitext(version.document.name)
+        filename = f"{root} (v{version.version_number}){extension}"
+        if not version.is_delta:
+            response = serve_file(request, version.file.storage, version.file.name, filename=filename)
+        else:
+            try:
+                response = HttpResponse(versions.content(version), content_type=version.file_type or None)
+            except (OSError, DeltaError):
+                response = None
+            else:
+                response["Content-Disposition"] = content_disposition_header(True, filename)
+        if response is None:
+            return Response({"error": "File not found"}, status=status.HTTP_404_NOT_FOUND)
+        return response
 
 
 # ── Activity Log ──────────────────────────────────────────────────────
@@ -488,39 +734,119 @@ class DocumentActivityListView(APIView):
         except Document.DoesNotExist:
             return Response({"error": "Document not found"}, status=status.HTTP_404_NOT_FOUND)
 
+        activity.flush()  # Only this worker's buffer; other workers' events follow within FLUSH_INTERVAL
         activities = DocumentActivity.objects.filter(document=doc)
         return Response(DocumentActivitySerializer(activities, many=True).data)
 
 
+class DocumentAnalyticsView(APIView):
+    """
+    GET /api/v6/documents/<id>/analytics/?start=YYYY-MM-DD&end=YYYY-MM-DD
+    Views, downloads and edits per day, with totals and per-actor counts.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsCreatorRole]
+
+    def get(self, request, pk):
+        try:
+            doc = Document.objects.get(id=pk, creator=request.user)
+        except Document.DoesNotExist:
+            return Response({"error": "Document not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        params = ActivityRangeSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return Response(activity.summary(Q(id=doc.id), **params.validated_data))
+
+
+class FolderAnalyticsView(APIView):
+    """
+    GET /api/v6/folders/<id>/analytics/?start=YYYY-MM-DD&end=YYYY-MM-DD
+    Activity analytics summed over every live document in the folder's subtree.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsCreatorRole]
+
+    def get(self, request, pk):
+        try:
+            folder = Folder.objects.get(id=pk, creator=request.user)
+        except Folder.DoesNotExist:
+            return Response({"error": "Folder not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        params = ActivityRangeSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        documents = Q(creator=request.user, folder__path__startswith=folder.path, is_deleted=False)
+        return Response(activity.summary(documents, **params.validated_data))
+
+
+# ── Tags ──────────────────────────────────────────────────────────────
+
+class TagFacetView(APIView):
+    """
+    GET /api/v6/tags/facets/?folder_id=<id> | ?client_id=<id>
+    Tag counts over the creator's live documents — in a folder subtree,
+    for one client, or across the library — most used first.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsCreatorRole]
+
+    def get(self, request):
+        params = TagFacetQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        documents = Document.objects.filter(creator=request.user, is_deleted=False)
+
+        folder_id = params.validated_data.get("folder_id")
+        client_id = params.validated_data.get("client_id")
+        if folder_id:
+            folder = Folder.objects.filter(id=folder_id, creator=request.user).first()
+            if folder is None:
+                return Response({"error": "Folder not found"}, status=status.HTTP_404_NOT_FOUND)
+            documents = documents.filter(folder__path__startswith=folder.path)
+        elif client_id:
+            documents = documents.filter(client_id=client_id)
+
+        return Response({"tags": tags.facets(documents)})
+
+
 # ── Search ────────────────────────────────────────────────────────────
 
 class DocumentSearchView(APIView):
     """
     GET /api/v6/search/?q=<query>
-    Full-text search across file names and tags, scoped by role.
+    Ranked full-text search across file names, tags and folder paths,
+    scoped by role. Backed by the library search index (see library.search).
+    Query params: ?offset=0&limit=50
     """
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
         query = request.query_params.get("q", "").strip()
         if not query:
-            return Response({"results": []})
+            return Response({"results": [], "count": 0, "has_more": False})
 
         user = request.user
         if user.role == "creator":
-            base_qs = Document.objects.filter(creator=user, is_deleted=False)
+            scope = {"creator": user}
         elif user.role == "client":
-            base_qs = Document.objects.filter(client=user, is_deleted=False)
+            scope = {"client": user}
         else:
-            return Response({"results": [], "count": 0})
+            return Response({"results": [], "count": 0, "has_more": False})
 
-        results = base_qs.filter(
-            Q(name__icontains=query) | Q(tags__icontains=query)
-        ).select_related("folder")[:50]
+        limit = parse_limit(request.query_params.get("limit"))
+        try:
+            offset = max(0, int(request.query_params.get("offset", 0)))
+        except ValueError:
+            offset = 0
+
+        ids, has_more = search.search_documents(query, offset=offset, limit=limit, **scope)
+
+        # Fetch the page in one query, then restore rank order
+        by_id = Document.objects.filter(
+            id__in=ids, is_deleted=False,
+        ).select_related("folder").in_bulk()
+        results = [by_id[doc_id] for doc_id in ids if doc_id in by_id]
 
         return Response({
             "results": DocumentSerializer(results, many=True).data,
-            "count": results.count(),
+            "count": len(results),
+            "has_more": has_more,
+            "next_offset": offset + limit if has_more else None,
         })
 
 
@@ -550,12 +876,7 @@ class DocumentShareLinkCreateView(APIView):
         )
 
         # Log activity
-        DocumentActivity.objects.create(
-            document=doc,
-            actor=request.user,
-            actor_role=request.user.role,
-            action="SHARED",
-        )
+        activity.log(doc, request.user, "SHARED")
 
         return Response(
             DocumentShareLinkSerializer(link, context={"request": request}).data,
@@ -582,37 +903,76 @@ class DocumentShareLinkListView(APIView):
         )
 
 
+class DocumentShareLinkRevokeView(APIView):
+    """
+    DELETE /api/v6/documents/<id>/shares/<link_id>/
+    Revoke a share link; its public URL stops working immediately.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsCreatorRole]
+
+    def delete(self, request, pk, link_id):
+        deleted, _ = DocumentShareLink.objects.filter(
+            id=link_id, document_id=pk, document__creator=request.user,
+        ).delete()
+        if not deleted:
+            return Response({"error": "Share link not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def _shared_link_or_error(slug):
+    """The cached share link entry (library.sharing), or an error Response."""
+    entry = sharing.get_link(slug)
+    if entry["status"] == "missing":
+        return None, Response({"error": "Share link not found"}, status=status.HTTP_404_NOT_FOUND)
+    if sharing.is_expired(entry):
+        return None, Response({"error": "This share link has expired"}, status=status.HTTP_410_GONE)
+    return entry, None
+
+
 class SharedDocumentPublicView(APIView):
     """
     GET /api/v6/shared/<slug>/
-    Public endpoint — returns document info for a valid share link.
+    Public endpoint — returns document info for a valid share link, with a
+    short-lived signed download URL. Served from cache with ETag/304 support
+    and a public max-age that never outlives the link or the URL.
     """
     permission_classes = [permissions.AllowAny]
+    authentication_classes = []  # Anonymous, so shared caches may store it
 
     def get(self, request, slug):
-        try:
-            link = DocumentShareLink.objects.select_related("document").get(slug=slug)
-        except DocumentShareLink.DoesNotExist:
-            return Response(
-                {"error": "Share link not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+        entry, error = _shared_link_or_error(slug)
+        if error:
+            return error
+        etag, data, max_age = sharing.public_payload(slug, entry, request)
+        return conditional_response(request, etag, data, cache_control=f"public, max-age={max_age}")
 
-        if link.is_expired:
-            return Response(
-                {"error": "This share link has expired"},
-                status=status.HTTP_410_GONE,
-            )
 
-        doc = link.document
-        return Response({
-            "name": doc.name,
-            "file": doc.file.url if doc.file else None,
-            "file_type": doc.file_type,
-            "size_kb": doc.size_kb,
-            "permission": link.permission,
-            "expires_at": link.expires_at,
-        })
+class SharedDocumentDownloadView(APIView):
+    """
+    GET /api/v6/shared/<slug>/download/?token=...
+    Public endpoint — streams the shared file for a signed URL issued by
+    SharedDocumentPublicView. Rejected once the URL expires, the link is
+    revoked or expires, or the document is re-uploaded.
+    """
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+
+    def get(self, request, slug):
+        entry, error = _shared_link_or_error(slug)
+        if error:
+            return error
+        problem = sharing.check_download(slug, request.query_params.get("token", ""), entry)
+        if problem:
+            return Response({"error": problem}, status=status.HTTP_403_FORBIDDEN)
+        if not entry["file"]:
+            return Response({"error": "File not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        storage = Document._meta.get_field("file").storage
+        response = serve_file(request, storage, entry["file"], filename=entry["data"]["name"])
+        if response is None:
+            return Response({"error": "File not found"}, status=status.HTTP_404_NOT_FOUND)
+        response["Cache-Control"] = "private, no-store"
+        return response
 
 
 # ── Lock Toggle ───────────────────────────────────────────────────────
@@ -0,0 +1,67 @@
+"""
+Swap OnboardingTemplate.blocks and OnboardingInstance.responses to
+CompressedJSONFields through new columns copied in batches; see
+docs/migrations/0003_compress_content.py.
+"""
+from django.db import migrations
+
+import utils.fields
+
+
+def compress(apps, schema_editor):
+    utils.fields.copy_json_column(apps, "onboarding", "OnboardingTemplate", "blocks", "blocks_packed")
+    utils.fields.copy_json_column(apps, "onboarding", "OnboardingInstance", "responses", "responses_packed")
+
+
+def expand(apps, schema_editor):
+    utils.fields.copy_json_column(apps, "onboarding", "OnboardingTemplate", "blocks_packed", "blocks")
+    utils.fields.copy_json_column(apps, "onboarding", "OnboardingInstance", "responses_packed", "responses")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('onboarding', '0003_onboardingupload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='onboardingtemplate',
+            name='blocks_packed',
+            field=utils.fields.CompressedJSONField(null=True),
+        ),
+        migrations.AddField(
+            model_name='onboardinginstance',
+            name='responses_packed',
+            field=utils.fields.CompressedJSONField(null=True),
+        ),
+        migrations.RunPython(compress, expand),
+        migrations.RemoveField(
+            model_name='onboardingtemplate',
+            name='blocks',
+        ),
+        migrations.RemoveField(
+            model_name='onboardinginstance',
+            name='responses',
+        ),
+        migrations.RenameField(
+            model_name='onboardingtemplate',
+            old_name='blocks_packed',
+            new_name='blocks',
+        ),
+        migrations.RenameField(
+            model_name='onboardinginstance',
+            old_name='responses_packed',
+            new_name='responses',
+        ),
+        migrations.AlterField(
+            model_name='onboardingtemplate',
+            name='blocks',
+            field=utils.fields.CompressedJSONField(default=list, help_text='JSON array of typed form block objects'),
+        ),
+        migrations.AlterField(
+            model_name='onboardinginstance',
+            name='responses',
+            field=utils.fields.CompressedJSONField(blank=True, help_text='Client form responses', null=True),
+        ),
+    ]
@@ -6,6 +6,8 @@ import secrets
 from django.db import models
 from django.conf import settings
 
+from utils.fields import CompressedJSONField
+
 
 class OnboardingTemplate(models.Model):
     """
@@ -28,7 +30,7 @@ class OnboardingTemplate(models.Model):
         related_name="onboarding_templates",
     )
     title = models.CharField(max_length=255)
-    blocks = models.JSONField(default=list, help_text="JSON array of typed form block objects")
+    blocks = CompressedJSONField(default=list, help_text="JSON array of typed form block objects")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -87,7 +89,7 @@ class OnboardingInstance(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="SENT")
     expires_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
-    responses = models.JSONField(null=True, blank=True, help_text="Client form responses")
+    responses = CompressedJSONField(null=True, blank=True, help_text="Client form responses")
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
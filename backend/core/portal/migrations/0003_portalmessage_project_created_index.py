@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-18 23:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal', '0002_clientinvite'),
+        ('project', '0007_task_multi_assignees'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='portalmessage',
+            index=models.Index(fields=['project', 'created_at'], name='portal_msg_project_created'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-18 23:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal', '0003_portalmessage_project_created_index'),
+        ('project', '0007_task_multi_assignees'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='portalmessage',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['project', 'sender'], name='portal_msg_unread'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 00:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal', '0004_portalmessage_unread_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='portalmessage',
+            name='file_size',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
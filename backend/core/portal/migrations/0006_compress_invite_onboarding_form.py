@@ -0,0 +1,45 @@
+"""
+Swap ClientInvite.onboarding_form to a CompressedJSONField through a new
+column copied in batches; see docs/migrations/0003_compress_content.py.
+"""
+from django.db import migrations
+
+import utils.fields
+
+
+def compress_form(apps, schema_editor):
+    utils.fields.copy_json_column(apps, "portal", "ClientInvite", "onboarding_form", "onboarding_form_packed")
+
+
+def expand_form(apps, schema_editor):
+    utils.fields.copy_json_column(apps, "portal", "ClientInvite", "onboarding_form_packed", "onboarding_form")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portal', '0005_portalmessage_file_size'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clientinvite',
+            name='onboarding_form_packed',
+            field=utils.fields.CompressedJSONField(null=True),
+        ),
+        migrations.RunPython(compress_form, expand_form),
+        migrations.RemoveField(
+            model_name='clientinvite',
+            name='onboarding_form',
+        ),
+        migrations.RenameField(
+            model_name='clientinvite',
+            old_name='onboarding_form_packed',
+            new_name='onboarding_form',
+        ),
+        migrations.AlterField(
+            model_name='clientinvite',
+            name='onboarding_form',
+            field=utils.fields.CompressedJSONField(blank=True, default=dict),
+        ),
+    ]
@@ -10,6 +10,8 @@ from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta
 
+from utils.fields import CompressedJSONField
+
 
 def _generate_invite_token():
     """Generate a unique, URL-safe token for client invites."""
@@ -37,6 +39,7 @@ class PortalMessage(models.Model):
     content = models.TextField()
     file = models.FileField(upload_to="portal_attachments/", null=True, blank=True)
     file_name = models.CharField(max_length=255, blank=True)
+    file_size = models.BigIntegerField(default=0)  # Bytes; recorded for storage accounting
     is_read = models.BooleanField(default=False)
     read_at = models.DateTimeField(null=True, blank=True)
 
@@ -47,6 +50,21 @@ class PortalMessage(models.Model):
 
     class Meta:
         ordering = ["created_at"]
+        indexes = [
+            # Keyset pagination of a project's chat history
+            models.Index(fields=["project", "created_at"], name="portal_msg_project_created"),
+            # Unread counts only ever scan the (small) unread subset
+            models.Index(
+                fields=["project", "sender"],
+                condition=models.Q(is_read=False),
+                name="portal_msg_unread",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.file and not self.file_size:
+            self.file_size = self.file.size
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Portal msg in {self.project.name}: {self.content[:50]}"
@@ -80,7 +98,7 @@ class ClientInvite(models.Model):
     
     # Stores the customized onboarding questions as JSON
     # Format: {"questions": [{"id": 1, "type": "text", "label": "..."}, ...]}
-    onboarding_form = models.JSONField(default=dict, blank=True)
+    onboarding_form = CompressedJSONField(default=dict, blank=True)
     
     # Responses from the client (submitted answers)
     responses = models.JSONField(default=dict, blank=True)
@@ -57,18 +57,18 @@ class PortalProjectSerializer(serializers.ModelSerializer):
             "created_at",
         ]
 
+    # Counted from the prefetched tasks instead of issuing fresh queries
     def get_progress(self, obj):
-        total = obj.tasks.count()
+        total = self.get_total_tasks(obj)
         if total == 0:
             return 0
-        completed = obj.tasks.filter(status="completed").count()
-        return int((completed / total) * 100)
+        return int((self.get_completed_tasks(obj) / total) * 100)
 
     def get_total_tasks(self, obj):
-        return obj.tasks.count()
+        return len(obj.tasks.all())
 
     def get_completed_tasks(self, obj):
-        return obj.tasks.filter(status="completed").count()
+        return sum(1 for task in obj.tasks.all() if task.status == "completed")
 
 
 class PortalProjectListSerializer(serializers.ModelSerializer):
@@ -119,6 +119,7 @@ class PortalMessageCreateSerializer(serializers.Serializer):
     """Input schema for sending a portal message."""
     content = serializers.CharField(max_length=5000)
     file = serializers.FileField(required=False, allow_null=True)
+    upload_id = serializers.UUIDField(required=False, allow_null=True)
     file_name = serializers.CharField(max_length=255, required=False, allow_blank=True)
 
 
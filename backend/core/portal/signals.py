@@ -0,0 +1,76 @@
+"""
+Portal signals — Keep cached dashboard snapshots in step with their sources.
+Task, deliverable and file changes drop the project section; portal messages
+drop the messages section; renaming a user drops every section showing
+their name. Sections are dropped after commit. See portal.snapshots.
+Message attachments count towards the project creator's storage usage
+(uploads.quota).
+"""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from project.models import Project, Task, Deliverable, DeliverableFile
+from uploads import quota
+from .models import PortalMessage
+from .snapshots import invalidate_dashboard_on_commit
+
+quota.track(
+    PortalMessage, "attachment", "file_size",
+    lambda m: Project.objects.filter(id=m.project_id).values_list("creator_id", flat=True).first(),
+)
+
+
+@receiver([post_save, post_delete], sender=Project)
+def invalidate_dashboard_on_project_change(sender, instance, **kwargs):
+    invalidate_dashboard_on_commit(instance.id)
+
+
+@receiver([post_save, post_delete], sender=Task)
+def invalidate_dashboard_on_task_change(sender, instance, **kwargs):
+    invalidate_dashboard_on_commit(instance.project_id, "project")
+
+
+@receiver([post_save, post_delete], sender=Deliverable)
+def invalidate_dashboard_on_deliverable_change(sender, instance, **kwargs):
+    project_id = Task.objects.filter(
+        id=instance.task_id,
+    ).values_list("project_id", flat=True).first()
+    if project_id:
+        invalidate_dashboard_on_commit(project_id, "project")
+
+
+@receiver([post_save, post_delete], sender=DeliverableFile)
+def invalidate_dashboard_on_deliverable_file_change(sender, instance, **kwargs):
+    project_id = Task.objects.filter(
+        deliverables__id=instance.deliverable_id,
+    ).values_list("project_id", flat=True).first()
+    if project_id:
+        invalidate_dashboard_on_commit(project_id, "project")
+
+
+@receiver([post_save, post_delete], sender=PortalMessage)
+def invalidate_dashboard_on_message_change(sender, instance, **kwargs):
+    invalidate_dashboard_on_commit(instance.project_id, "messages")
+
+
+@receiver(pre_save, sender=get_user_model())
+def note_user_rename(sender, instance, update_fields=None, **kwargs):
+    instance._portal_renamed = False
+    if instance._state.adding or (update_fields is not None and "full_name" not in update_fields):
+        return
+    previous = sender.objects.filter(pk=instance.pk).values_list("full_name", flat=True).first()
+    instance._portal_renamed = previous != instance.full_name
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_dashboards_on_user_rename(sender, instance, **kwargs):
+    """Snapshots show creator, submitter and sender names, so a rename drops them."""
+    if not getattr(instance, "_portal_renamed", False):
+        return
+    for project_id in set(Project.objects.filter(creator=instance).values_list("id", flat=True)) | set(
+        Task.objects.filter(deliverables__submitted_by=instance).values_list("project_id", flat=True)
+    ):
+        invalidate_dashboard_on_commit(project_id, "project")
+    for project_id in set(PortalMessage.objects.filter(sender=instance).values_list("project_id", flat=True)):
+        invalidate_dashboard_on_commit(project_id, "messages")
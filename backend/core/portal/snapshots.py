@@ -0,0 +1,112 @@
+"""
+Portal dashboard snapshots — precomputed payloads for PortalProjectDetailView.
+
+A project's dashboard is cached as two independent sections:
+  - project:  project info, tasks, deliverables and files
+  - messages: the most recent portal messages
+Each section is dropped on its own when its source rows change (see
+portal.signals) and rebuilt on the next read, so a new chat message never
+forces the task tree to be re-serialized. Both sections are fetched with a
+single get_many() call, so an unchanged dashboard costs one cache read.
+
+Writers drop sections with invalidate_dashboard_on_commit(): dropping them
+inside the writer's transaction would let a concurrent read rebuild from
+the old rows and cache them until the timeout.
+"""
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Prefetch
+
+from project.models import Project, Deliverable
+from .models import PortalMessage
+
+SNAPSHOT_TIMEOUT = 60 * 60 * 24  # Sections are invalidated explicitly; this only bounds stale keys
+RECENT_MESSAGE_LIMIT = 50
+SECTIONS = ("project", "messages")
+
+
+def _cache_key(project_id, section):
+    return f"portal:dashboard:{project_id}:{section}"
+
+
+def _freeze(data):
+    """Round-trip through JSON so the cached value is plain data plus its fingerprint."""
+    encoded = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+    return {
+        "etag": hashlib.md5(encoded.encode()).hexdigest(),
+        "data": json.loads(encoded),
+    }
+
+
+def _build_project_section(project_id):
+    from .serializers import PortalProjectSerializer
+
+    try:
+        project = Project.objects.select_related("creator").prefetch_related(
+            "tasks",
+            Prefetch(
+                "tasks__deliverables",
+                queryset=Deliverable.objects.select_related("submitted_by"),
+            ),
+            "tasks__deliverables__files",
+        ).get(id=project_id)
+    except Project.DoesNotExist:
+        return None
+    return _freeze(PortalProjectSerializer(project).data)
+
+
+def _build_messages_section(project_id):
+    from .serializers import PortalMessageSerializer
+
+    messages = PortalMessage.objects.filter(
+        project_id=project_id,
+    ).select_related("sender").order_by("-created_at")[:RECENT_MESSAGE_LIMIT]
+    return _freeze(PortalMessageSerializer(reversed(list(messages)), many=True).data)
+
+
+_BUILDERS = {
+    "project": _build_project_section,
+    "messages": _build_messages_section,
+}
+
+
+def get_dashboard_snapshot(project_id):
+    """
+    Return {"etag": str, "data": {"project": ..., "messages": ...}} for a
+    project, rebuilding only the sections missing from the cache.
+    Returns None if the project does not exist.
+    """
+    keys = {section: _cache_key(project_id, section) for section in SECTIONS}
+    cached = cache.get_many(keys.values())
+
+    sections = {}
+    for section, key in keys.items():
+        value = cached.get(key)
+        if value is None:
+            value = _BUILDERS[section](project_id)
+            if value is None:
+                return None
+            cache.set(key, value, SNAPSHOT_TIMEOUT)
+        sections[section] = value
+
+    etag = hashlib.md5(
+        ":".join(sections[s]["etag"] for s in SECTIONS).encode()
+    ).hexdigest()
+    return {
+        "etag": etag,
+        "data": {section: value["data"] for section, value in sections.items()},
+    }
+
+
+def invalidate_dashboard(project_id, *sections):
+    """Drop the given sections (all of them by default) for a project."""
+    cache.delete_many([_cache_key(project_id, s) for s in (sections or SECTIONS)])
+
+
+def invalidate_dashboard_on_commit(project_id, *sections):
+    """invalidate_dashboard() once the current transaction commits (at once outside one)."""
+    transaction.on_commit(lambda: invalidate_dashboard(project_id, *sections))
@@ -104,3 +104,276 @@ class ClientScopeEnforcementTest(TestCase):
         """Unauthenticated requests are blocked."""
         response = self.api.get("/api/v5/projects/")
         self.assertEqual(response.status_code, 401)
+
+
+class ClientHistoryAggregateTest(TestCase):
+    """Client history is served from one grouped query with cursor pagination."""
+
+    def setUp(self):
+        from project.models import ProjectClientMembership
+
+        self.api = APIClient()
+        self.creator = User.objects.create_user(
+            email="creator@test.com",
+            full_name="Creator",
+            password="testpass123",
+            role="creator",
+        )
+        self.clients = [
+            User.objects.create_user(
+                email=f"client{i}@test.com",
+                full_name=f"Client {i}",
+                password="testpass123",
+                role="client",
+            )
+            for i in range(3)
+        ]
+        statuses = ["active", "completed", "on_hold"]
+        for i, client in enumerate(self.clients):
+            for j in range(i + 1):
+                project = Project.objects.create(creator=self.creator, name=f"P{i}-{j}")
+                ProjectClientMembership.objects.create(
+                    project=project, client=client, status=statuses[j],
+                )
+
+    def test_counts_are_aggregated_per_client(self):
+        self.api.force_authenticate(self.creator)
+        with self.assertNumQueries(1):
+            response = self.api.get("/api/v5/clients/history/")
+        self.assertEqual(response.status_code, 200)
+
+        by_email = {c["client_email"]: c for c in response.data["clients"]}
+        row = by_email["client2@test.com"]
+        self.assertEqual(row["total_projects"], 3)
+        self.assertEqual(row["active_projects"], 1)
+        self.assertEqual(row["completed_projects"], 1)
+        self.assertEqual(row["on_hold_projects"], 1)
+        self.assertEqual(by_email["client0@test.com"]["total_projects"], 1)
+
+    def test_most_recent_activity_first(self):
+        self.api.force_authenticate(self.creator)
+        response = self.api.get("/api/v5/clients/history/")
+        emails = [c["client_email"] for c in response.data["clients"]]
+        self.assertEqual(emails, ["client2@test.com", "client1@test.com", "client0@test.com"])
+
+    def test_cursor_pagination_walks_all_clients(self):
+        self.api.force_authenticate(self.creator)
+        seen = []
+        url = "/api/v5/clients/history/?limit=2"
+        response = self.api.get(url)
+        seen += [c["client_email"] for c in response.data["clients"]]
+        self.assertIsNotNone(response.data["next_cursor"])
+
+        response = self.api.get(f"{url}&cursor={response.data['next_cursor']}")
+        seen += [c["client_email"] for c in response.data["clients"]]
+        self.assertIsNone(response.data["next_cursor"])
+        self.assertEqual(len(seen), 3)
+        self.assertEqual(len(set(seen)), 3)
+
+    def test_invalid_cursor_rejected(self):
+        self.api.force_authenticate(self.creator)
+        response = self.api.get("/api/v5/clients/history/?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 400)
+
+        from django.utils import timezone
+        from utils.pagination import encode_cursor
+
+        cursor = encode_cursor(timezone.now(), "not-a-uuid")
+        response = self.api.get(f"/api/v5/clients/history/?cursor={cursor}")
+        self.assertEqual(response.status_code, 400)
+
+
+class PortalDashboardSnapshotTest(TestCase):
+    """Project dashboards are served from cached snapshots with ETag support."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        from project.models import ProjectClientMembership
+
+        cache.clear()
+        self.api = APIClient()
+        self.creator = User.objects.create_user(
+            email="creator@test.com",
+            full_name="Creator",
+            password="testpass123",
+            role="creator",
+        )
+        self.client_user = User.objects.create_user(
+            email="client@test.com",
+            full_name="Client",
+            password="testpass123",
+            role="client",
+        )
+        self.project = Project.objects.create(creator=self.creator, name="Dashboard")
+        ProjectClientMembership.objects.create(project=self.project, client=self.client_user)
+        self.url = f"/api/v5/projects/{self.project.id}/"
+        self.api.force_authenticate(self.client_user)
+
+    def test_repeat_load_served_from_cache(self):
+        from project.models import Task
+
+        Task.objects.create(project=self.project, name="T1")
+        Task.objects.create(project=self.project, name="T2", status="completed")
+        first = self.api.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.data["project"]["total_tasks"], 2)
+        self.assertEqual(first.data["project"]["progress"], 50)
+
+        # Only the access check touches the database on a warm load
+        with self.assertNumQueries(2):
+            second = self.api.get(self.url)
+        self.assertEqual(second.data, first.data)
+
+    def test_etag_returns_not_modified(self):
+        first = self.api.get(self.url)
+        etag = first["ETag"]
+        response = self.api.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_task_change_refreshes_snapshot(self):
+        from project.models import Task
+
+        first = self.api.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(project=self.project, name="New task")
+            # Not dropped before commit, so a concurrent read can't re-cache old rows
+            self.assertEqual(self.api.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+        response = self.api.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["project"]["total_tasks"], 1)
+
+    def test_new_message_refreshes_snapshot(self):
+        from portal.models import PortalMessage
+
+        self.api.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            PortalMessage.objects.create(project=self.project, sender=self.creator, content="Hello")
+        response = self.api.get(self.url)
+        self.assertEqual([m["content"] for m in response.data["messages"]], ["Hello"])
+
+    def test_rename_refreshes_snapshot(self):
+        from django.utils import timezone
+        from portal.models import PortalMessage
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PortalMessage.objects.create(project=self.project, sender=self.creator, content="Hello")
+        self.api.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.creator.last_login = timezone.now()
+            self.creator.save(update_fields=["last_login"])
+        self.assertEqual(callbacks, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.creator.full_name = "Renamed Creator"
+            self.creator.save()
+        response = self.api.get(self.url)
+        self.assertEqual(response.data["project"]["creator_name"], "Renamed Creator")
+        self.assertEqual(response.data["messages"][0]["sender_name"], "Renamed Creator")
+
+
+class PortalMessageKeysetTest(TestCase):
+    """Chat history pages by (created_at, id) cursor without counting."""
+
+    def setUp(self):
+        from portal.models import PortalMessage
+
+        self.api = APIClient()
+        self.creator = User.objects.create_user(
+            email="creator@test.com",
+            full_name="Creator",
+            password="testpass123",
+            role="creator",
+        )
+        self.project = Project.objects.create(creator=self.creator, name="Chat")
+        for i in range(5):
+            PortalMessage.objects.create(project=self.project, sender=self.creator, content=f"m{i}")
+        self.url = f"/api/v5/projects/{self.project.id}/messages/"
+        self.api.force_authenticate(self.creator)
+
+    def test_pages_walk_history_in_order(self):
+        first = self.api.get(f"{self.url}?limit=2")
+        self.assertEqual([m["content"] for m in first.data["messages"]], ["m3", "m4"])
+        self.assertTrue(first.data["has_more"])
+
+        second = self.api.get(f"{self.url}?limit=2&cursor={first.data['next_cursor']}")
+        self.assertEqual([m["content"] for m in second.data["messages"]], ["m1", "m2"])
+
+        third = self.api.get(f"{self.url}?limit=2&cursor={second.data['next_cursor']}")
+        self.assertEqual([m["content"] for m in third.data["messages"]], ["m0"])
+        self.assertFalse(third.data["has_more"])
+        self.assertIsNone(third.data["next_cursor"])
+
+    def test_page_does_not_count_history(self):
+        first = self.api.get(f"{self.url}?limit=2")
+        # Access check + one limit+1 page read; no COUNT(*)
+        with self.assertNumQueries(2) as ctx:
+            self.api.get(f"{self.url}?limit=2&cursor={first.data['next_cursor']}")
+        self.assertFalse(any("COUNT(" in q["sql"] for q in ctx.captured_queries))
+
+    def test_legacy_before_param(self):
+        first = self.api.get(f"{self.url}?limit=2")
+        oldest_id = first.data["messages"][0]["id"]
+        response = self.api.get(f"{self.url}?limit=2&before={oldest_id}")
+        self.assertEqual([m["content"] for m in response.data["messages"]], ["m1", "m2"])
+
+    def test_tampered_cursor_rejected(self):
+        from django.utils import timezone
+        from utils.pagination import encode_cursor
+
+        cursor = encode_cursor(timezone.now(), "not-a-uuid")
+        self.assertEqual(self.api.get(f"{self.url}?cursor={cursor}").status_code, 400)
+        self.assertEqual(self.api.get(f"{self.url}?cursor={encode_cursor(1, 2)}").status_code, 400)
+        self.assertEqual(self.api.get(f"{self.url}?before=not-a-uuid").status_code, 400)
+
+
+class PortalUnreadSummaryTest(TestCase):
+    """Unread counts for all visible projects come from one grouped query."""
+
+    def setUp(self):
+        from portal.models import PortalMessage
+        from project.models import ProjectClientMembership
+
+        self.api = APIClient()
+        self.creator = User.objects.create_user(
+            email="creator@test.com",
+            full_name="Creator",
+            password="testpass123",
+            role="creator",
+        )
+        self.client_user = User.objects.create_user(
+            email="client@test.com",
+            full_name="Client",
+            password="testpass123",
+            role="client",
+        )
+        self.project_a = Project.objects.create(creator=self.creator, name="A")
+        self.project_b = Project.objects.create(creator=self.creator, name="B")
+        self.hidden = Project.objects.create(creator=self.creator, name="Hidden")
+        for project in (self.project_a, self.project_b):
+            ProjectClientMembership.objects.create(project=project, client=self.client_user)
+
+        PortalMessage.objects.create(project=self.project_a, sender=self.creator, content="1")
+        PortalMessage.objects.create(project=self.project_a, sender=self.creator, content="2")
+        PortalMessage.objects.create(project=self.project_b, sender=self.creator, content="3", is_read=True)
+        PortalMessage.objects.create(project=self.hidden, sender=self.creator, content="4")
+        PortalMessage.objects.create(project=self.project_b, sender=self.client_user, content="5")
+
+    def test_client_counts(self):
+        self.api.force_authenticate(self.client_user)
+        response = self.api.get("/api/v5/messages/unread/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["unread_counts"], {str(self.project_a.id): 2})
+        self.assertEqual(response.data["total"], 2)
+
+    def test_creator_counts(self):
+        self.api.force_authenticate(self.creator)
+        with self.assertNumQueries(1):
+            response = self.api.get("/api/v5/messages/unread/")
+        self.assertEqual(response.data["unread_counts"], {str(self.project_b.id): 1})
+
+    def test_conditional_get(self):
+        self.api.force_authenticate(self.client_user)
+        first = self.api.get("/api/v5/messages/unread/")
+        response = self.api.get("/api/v5/messages/unread/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 304)
@@ -7,6 +7,7 @@ from .views import (
     PortalMessageCreateView,
     PortalMessageMarkReadView,
     PortalUnreadCountView,
+    PortalUnreadSummaryView,
     ClientInviteCreateView,
     ClientInviteDetailView,
     ClientInviteAcceptView,
@@ -25,6 +26,7 @@ urlpatterns = [
     path("projects/<uuid:project_id>/messages/send/", PortalMessageCreateView.as_view(), name="portal-message-send"),
     path("projects/<uuid:project_id>/messages/read/", PortalMessageMarkReadView.as_view(), name="portal-messages-read"),
     path("projects/<uuid:project_id>/messages/unread/", PortalUnreadCountView.as_view(), name="portal-messages-unread"),
+    path("messages/unread/", PortalUnreadSummaryView.as_view(), name="portal-messages-unread-summary"),
 
     # Invite endpoints
     path("projects/<uuid:project_id>/invites/", ClientInviteCreateView.as_view(), name="portal-invite-create"),
@@ -2,18 +2,29 @@
 Portal views — Client Portal endpoints.
 All endpoints enforce: authenticated + CLIENT role + resource ownership.
 """
+import hashlib
+import json
+import uuid
+
 from rest_framework.views import APIView
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Max, Q
 
 from project.models import Project, ProjectClientMembership
+from uploads import quota
+from uploads.services import UploadError, claim_upload
 from .models import PortalMessage, ClientInvite
 from .permissions import IsClientRole, IsProjectClient, IsCreatorOrProjectClient, get_client_project_ids
+from utils.http import conditional_response
+from utils.pagination import encode_cursor, decode_cursor, parse_limit, InvalidCursor
+from .snapshots import get_dashboard_snapshot, invalidate_dashboard_on_commit
 from .serializers import (
-    PortalProjectSerializer,
     PortalProjectListSerializer,
     PortalMessageSerializer,
     PortalMessageCreateSerializer,
@@ -31,6 +42,10 @@ class ClientHistoryView(APIView):
     GET /api/v5/clients/history/
     Returns all clients the creator has worked with (aggregated project data).
     Only accessible to creators.
+    Query params: ?cursor=<next_cursor>&limit=50
+
+    Computed in one grouped query over the creator's memberships and ordered
+    by most recent activity, so cost does not grow with per-client queries.
     """
     permission_classes = [permissions.IsAuthenticated]
 
@@ -41,59 +56,65 @@ class ClientHistoryView(APIView):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        # Get all clients this creator has worked with
-        clients = request.user.projects.values_list(
-            "client_memberships__client", flat=True
-        ).distinct()
-
-        # Aggregate data for each client
-        client_data = []
-        User = get_user_model()
-        
-        for client_id in clients:
+        limit = parse_limit(request.query_params.get("limit"))
+
+        rows = ProjectClientMembership.objects.filter(
+            project__creator=request.user,
+        ).values(
+            "client_id", "client__full_name", "client__email",
+        ).annotate(
+            total_projects=Count("id"),
+            active_projects=Count("id", filter=Q(status="active")),
+            completed_projects=Count("id", filter=Q(status="completed")),
+            on_hold_projects=Count("id", filter=Q(status="on_hold")),
+            last_activity=Max("added_at"),
+        ).order_by("-last_activity", "-client_id")
+
+        cursor = request.query_params.get("cursor")
+        if cursor:
             try:
-                client = User.objects.get(id=client_id)
-            except User.DoesNotExist:
-                continue
-
-            # Get memberships for this client
-            memberships = ProjectClientMembership.objects.filter(
-                client=client,
-                project__creator=request.user,
+                last_activity, client_id = decode_cursor(cursor, 2)
+                last_activity = parse_datetime(last_activity)
+                client_id = uuid.UUID(client_id)
+                if last_activity is None:
+                    raise InvalidCursor("Invalid cursor")
+            except (InvalidCursor, TypeError, ValueError):
+                return Response(
+                    {"error": "Invalid cursor"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            rows = rows.filter(
+                Q(last_activity__lt=last_activity)
+                | Q(last_activity=last_activity, client_id__lt=client_id)
             )
 
-            total_projects = memberships.count()
-            active_projects = memberships.filter(status="active").count()
-            completed_projects = memberships.filter(status="completed").count()
-            on_hold_projects = memberships.filter(status="on_hold").count()
+        page = list(rows[:limit + 1])
+        has_more = len(page) > limit
+        page = page[:limit]
 
-            # Get most recent activity
-            try:
-                latest_membership = memberships.latest("added_at")
-                last_activity = latest_membership.added_at
-            except ProjectClientMembership.DoesNotExist:
-                last_activity = None
-
-            client_data.append({
-                "id": str(client.id),
-                "client_name": client.full_name,
-                "client_email": client.email,
-                "total_projects": total_projects,
-                "active_projects": active_projects,
-                "completed_projects": completed_projects,
-                "on_hold_projects": on_hold_projects,
-                "last_activity": last_activity,
-            })
-
-        # Sort by last activity (most recent first)
-        client_data.sort(
-            key=lambda x: x["last_activity"] if x["last_activity"] else timezone.now(),
-            reverse=True
-        )
+        client_data = [
+            {
+                "id": str(row["client_id"]),
+                "client_name": row["client__full_name"],
+                "client_email": row["client__email"],
+                "total_projects": row["total_projects"],
+                "active_projects": row["active_projects"],
+                "completed_projects": row["completed_projects"],
+                "on_hold_projects": row["on_hold_projects"],
+                "last_activity": row["last_activity"],
+            }
+            for row in page
+        ]
+
+        next_cursor = None
+        if has_more:
+            last = page[-1]
+            next_cursor = encode_cursor(last["last_activity"], last["client_id"])
 
         return Response({
             "clients": client_data,
             "count": len(client_data),
+            "next_cursor": next_cursor,
         })
 
 
@@ -125,66 +146,91 @@ class PortalProjectDetailView(APIView):
     GET /api/v5/projects/<project_id>/
     Full project dashboard for the client: project info, milestones,
     deliverables, tasks, progress, and recent messages.
+    Served from a cached snapshot (see portal.snapshots) with ETag/304 support.
     """
     permission_classes = [permissions.IsAuthenticated, IsClientRole, IsProjectClient]
 
     def get(self, request, project_id):
-        try:
-            project = Project.objects.prefetch_related(
-                "tasks", "tasks__deliverables", "tasks__deliverables__files"
-            ).get(id=project_id)
-        except Project.DoesNotExist:
+        snapshot = get_dashboard_snapshot(project_id)
+        if snapshot is None:
             return Response(
                 {"error": "Project not found"},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        project_data = PortalProjectSerializer(project).data
-
-        # Include recent messages (last 50)
-        messages = PortalMessage.objects.filter(
-            project=project,
-        ).select_related("sender").order_by("-created_at")[:50]
-        messages_data = PortalMessageSerializer(
-            reversed(list(messages)), many=True
-        ).data
-
-        return Response({
-            "project": project_data,
-            "messages": messages_data,
-        })
+        return conditional_response(request, snapshot["etag"], snapshot["data"])
 
 
 # ── Messaging Endpoints ──────────────────────────────────────────────
 class PortalMessageListView(APIView):
     """
     GET /api/v5/projects/<project_id>/messages/
-    Returns paginated chat history for this project.
-    Query params: ?before=<message_id>&limit=50
+    Returns paginated chat history for this project, newest page first.
+    Query params: ?cursor=<next_cursor>&limit=50
+                  ?before=<message_id> (legacy; prefer cursor)
+
+    Keyset-paginated on (created_at, id): each page reads limit+1 rows off
+    the (project, created_at) index, so scroll-back never counts history.
     """
     permission_classes = [permissions.IsAuthenticated, IsCreatorOrProjectClient]
 
     def get(self, request, project_id):
-        limit = min(int(request.query_params.get("limit", 50)), 100)
+        limit = parse_limit(request.query_params.get("limit"))
 
         qs = PortalMessage.objects.filter(
             project_id=project_id,
-        ).select_related("sender").order_by("-created_at")
+        ).select_related("sender").order_by("-created_at", "-id")
 
+        cursor = request.query_params.get("cursor")
         before = request.query_params.get("before")
-        if before:
+        if cursor:
             try:
-                ref_msg = PortalMessage.objects.get(id=before)
-                qs = qs.filter(created_at__lt=ref_msg.created_at)
-            except PortalMessage.DoesNotExist:
-                pass
+                created_at, message_id = decode_cursor(cursor, 2)
+                created_at = parse_datetime(created_at)
+                message_id = uuid.UUID(message_id)
+                if created_at is None:
+                    raise InvalidCursor("Invalid cursor")
+            except (InvalidCursor, TypeError, ValueError):
+                return Response(
+                    {"error": "Invalid cursor"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            qs = qs.filter(
+                Q(created_at__lt=created_at)
+                | Q(created_at=created_at, id__lt=message_id)
+            )
+        elif before:
+            try:
+                before = uuid.UUID(before)
+            except ValueError:
+                return Response(
+                    {"error": "Invalid before"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            ref_msg = PortalMessage.objects.filter(
+                id=before, project_id=project_id,
+            ).values("created_at", "id").first()
+            if ref_msg:
+                qs = qs.filter(
+                    Q(created_at__lt=ref_msg["created_at"])
+                    | Q(created_at=ref_msg["created_at"], id__lt=ref_msg["id"])
+                )
+
+        messages = list(qs[:limit + 1])
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+
+        next_cursor = None
+        if has_more:
+            oldest = messages[-1]
+            next_cursor = encode_cursor(oldest.created_at, oldest.id)
 
-        messages = list(qs[:limit])
         messages.reverse()  # Oldest first
 
         return Response({
             "messages": PortalMessageSerializer(messages, many=True).data,
-            "has_more": qs.count() > limit,
+            "has_more": has_more,
+            "next_cursor": next_cursor,
         })
 
 
@@ -201,14 +247,37 @@ class PortalMessageCreateView(APIView):
         serializer.is_valid(raise_exception=True)
 
         data = serializer.validated_data
+        owner_id = Project.objects.filter(id=project_id).values_list("creator_id", flat=True).first()
 
-        message = PortalMessage.objects.create(
-            project_id=project_id,
-            sender=request.user,
-            content=data["content"],
-            file=data.get("file"),
-            file_name=data.get("file_name", ""),
-        )
+        if data.get("upload_id") and not data.get("file"):
+            # Attach a completed chunked upload (uploads app) instead of a multipart file
+            try:
+                with claim_upload(data["upload_id"], request.user) as upload:
+                    quota.ensure_room(owner_id, upload.size)
+                    message = PortalMessage.objects.create(
+                        project_id=project_id,
+                        sender=request.user,
+                        content=data["content"],
+                        file=upload,
+                        file_name=data.get("file_name") or upload.name,
+                    )
+            except UploadError as exc:
+                return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            # Quota check and save in one transaction, so the usage row lock covers both
+            with transaction.atomic():
+                if data.get("file"):
+                    try:
+                        quota.ensure_room(owner_id, data["file"].size)
+                    except UploadError as exc:
+                        return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+                message = PortalMessage.objects.create(
+                    project_id=project_id,
+                    sender=request.user,
+                    content=data["content"],
+                    file=data.get("file"),
+                    file_name=data.get("file_name", ""),
+                )
 
         # Create notification for the other party
         self._notify_recipient(request.user, project_id, message)
@@ -267,6 +336,10 @@ class PortalMessageMarkReadView(APIView):
             read_at=timezone.now(),
         )
 
+        # Bulk update bypasses post_save, so drop the cached messages explicitly
+        if updated:
+            invalidate_dashboard_on_commit(project_id, "messages")
+
         return Response({"marked_read": updated})
 
 
@@ -286,6 +359,42 @@ class PortalUnreadCountView(APIView):
         return Response({"unread_count": count})
 
 
+class PortalUnreadSummaryView(APIView):
+    """
+    GET /api/v5/messages/unread/
+    Unread portal message counts for every project the caller can see,
+    in one GROUP BY over the partial unread-message index.
+    Projects with nothing unread are omitted. Supports If-None-Match.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+        qs = PortalMessage.objects.filter(is_read=False)
+
+        if user.role == "creator":
+            qs = qs.filter(project__creator=user)
+        elif user.role == "client":
+            qs = qs.filter(project_id__in=get_client_project_ids(user))
+        else:
+            qs = qs.none()
+
+        rows = qs.exclude(sender=user).values("project_id").annotate(
+            unread=Count("id"),
+        ).order_by()
+
+        counts = {str(row["project_id"]): row["unread"] for row in rows}
+        data = {
+            "unread_counts": counts,
+            "total": sum(counts.values()),
+        }
+        etag = hashlib.md5(
+            json.dumps(counts, sort_keys=True).encode()
+        ).hexdigest()
+
+        return conditional_response(request, etag, data)
+
+
 # ── Invite Endpoints ─────────────────────────────────────────────────
 
 class ClientInviteCreateView(APIView):
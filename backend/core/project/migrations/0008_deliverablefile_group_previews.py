@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-19 00:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0007_task_multi_assignees'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deliverablefile',
+            name='previews',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='previews',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
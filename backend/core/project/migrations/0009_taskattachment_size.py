@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 00:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0008_deliverablefile_group_previews'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskattachment',
+            name='size',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
@@ -187,6 +187,7 @@ class DeliverableFile(models.Model):
     name = models.CharField(max_length=255)
     size = models.BigIntegerField(default=0)
     file_type = models.CharField(max_length=100, blank=True)
+    previews = models.JSONField(default=dict, blank=True)  # Thumbnail/preview paths, see uploads.derivatives
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -250,6 +251,7 @@ class Group(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True, null=True)
     avatar = models.ImageField(upload_to="group_avatars/", blank=True, null=True)
+    previews = models.JSONField(default=dict, blank=True)  # Avatar thumbnail paths, see uploads.derivatives
     creator = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -383,12 +385,18 @@ class TaskAttachment(models.Model):
     uploaded_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="task_attachments")
     name = models.CharField(max_length=255)
     file = models.FileField(upload_to="task_attachments/", null=True, blank=True)
+    size = models.BigIntegerField(default=0)  # Bytes; recorded for storage accounting
     url = models.URLField(max_length=2048, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["-created_at"]
 
+    def save(self, *args, **kwargs):
+        if self.file and not self.size:
+            self.size = self.file.size
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.name} on {self.task.name}"
 
@@ -5,6 +5,7 @@ from .models import ProjectSample, TeamMember, Group, GroupMembership, GroupMess
 from .models import GoogleCalendarToken, CalendarSyncedTask, ProjectClientMembership
 from .models import TaskComment, TaskAttachment, TaskChecklist, TaskChecklistItem
 from django.conf import settings
+from uploads.derivatives import derivative_url
 
 User = get_user_model()
 
@@ -333,10 +334,12 @@ class ProjectSampleSerializer(serializers.ModelSerializer):
 
 class DeliverableFileSerializer(serializers.ModelSerializer):
     url = serializers.SerializerMethodField()
+    thumbnail_url = serializers.SerializerMethodField()
+    preview_url = serializers.SerializerMethodField()
 
     class Meta:
         model = DeliverableFile
-        fields = ["id", "name", "url", "size", "file_type", "uploaded_at"]
+        fields = ["id", "name", "url", "thumbnail_url", "preview_url", "size", "file_type", "uploaded_at"]
 
     def get_url(self, obj):
         request = self.context.get("request")
@@ -344,6 +347,12 @@ class DeliverableFileSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.file.url)
         return None
 
+    def get_thumbnail_url(self, obj):
+        return derivative_url(obj, "thumbnail", self.context.get("request"))
+
+    def get_preview_url(self, obj):
+        return derivative_url(obj, "preview", self.context.get("request"))
+
 
 class DeliverableLinkSerializer(serializers.ModelSerializer):
     class Meta:
@@ -622,11 +631,12 @@ class GroupSerializer(serializers.ModelSerializer):
     unread_count = serializers.SerializerMethodField()
     is_admin = serializers.SerializerMethodField()
     avatar_url = serializers.SerializerMethodField()
+    avatar_thumbnail_url = serializers.SerializerMethodField()
 
     class Meta:
         model = Group
         fields = [
-            'id', 'name', 'description', 'avatar_url', 'creator',
+            'id', 'name', 'description', 'avatar_url', 'avatar_thumbnail_url', 'creator',
             'members', 'member_count', 'last_message', 'unread_count',
             'is_admin', 'created_at', 'updated_at'
         ]
@@ -674,6 +684,9 @@ class GroupSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.avatar.url)
         return None
 
+    def get_avatar_thumbnail_url(self, obj):
+        return derivative_url(obj, "thumbnail", self.context.get('request'))
+
 
 class GroupCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating a group"""
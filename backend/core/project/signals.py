@@ -1,11 +1,27 @@
 """
 Project signals — Handle project completion workflow.
 When all tasks are completed, update ProjectClientMembership status.
+Deliverable files and group avatars get thumbnails (uploads.derivatives).
+Deliverable files and task attachments count towards the project creator's
+storage usage (uploads.quota).
 """
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.db.models import Q
-from .models import Task, Project, ProjectClientMembership
+from uploads import derivatives, quota
+from .models import Task, Project, ProjectClientMembership, DeliverableFile, Group, TaskAttachment
+
+derivatives.track(DeliverableFile, "file")
+derivatives.track(Group, "avatar")
+
+quota.track(
+    DeliverableFile, "deliverable", "size",
+    lambda f: Project.objects.filter(tasks__deliverables__id=f.deliverable_id).values_list("creator_id", flat=True).first(),
+)
+quota.track(
+    TaskAttachment, "attachment", "size",
+    lambda a: Project.objects.filter(tasks__id=a.task_id).values_list("creator_id", flat=True).first(),
+)
 
 
 @receiver(post_save, sender=Task)
@@ -11,7 +11,7 @@ Covers:
   8. API recurrence (unchanged)
 """
 from datetime import date, timedelta
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
@@ -483,3 +483,142 @@ class TaskAPIRecurrenceTest(TestCase):
         }, format="json")
         self.assertEqual(resp.status_code, 201)
         self.assertEqual(Task.objects.get(name="Biweekly").recurrence_days, 14)
+
+
+# ── 7. Deliverable ZIP download ───────────────────────────────────────────────
+
+class DeliverableDownloadTest(TestCase):
+
+    def setUp(self):
+        from django.core.files.base import ContentFile
+        from .models import Deliverable, DeliverableFile
+
+        self.creator = make_creator()
+        self.talent = make_talent()
+        task = make_task(make_project(self.creator), assignees=[self.talent])
+        self.deliverable = Deliverable.objects.create(task=task, submitted_by=self.talent, title="Round 1")
+        for name, data in [("cut.mp4", b"video"), ("notes.txt", b"notes"), ("cut.mp4", b"video v2")]:
+            DeliverableFile.objects.create(
+                deliverable=self.deliverable, file=ContentFile(data, name=name), name=name, size=len(data),
+            )
+        self.client = APIClient()
+
+    def test_streams_all_files_as_zip(self):
+        import io
+        import zipfile
+
+        self.client.force_authenticate(self.creator)
+        resp = self.client.get(f"/api/v2/deliverables/{self.deliverable.id}/download/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.streaming)
+        self.assertIn('filename="Round 1.zip"', resp["Content-Disposition"])
+
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(resp.streaming_content)))
+        self.assertEqual(sorted(archive.namelist()), ["cut (2).mp4", "cut.mp4", "notes.txt"])
+        self.assertEqual(archive.read("notes.txt"), b"notes")
+
+    def test_other_creators_cannot_download(self):
+        self.client.force_authenticate(make_creator("other@test.com"))
+        resp = self.client.get(f"/api/v2/deliverables/{self.deliverable.id}/download/")
+        self.assertEqual(resp.status_code, 404)
+
+    def test_single_file_supports_ranges(self):
+        notes = self.deliverable.files.get(name="notes.txt")
+        url = f"/api/v2/deliverables/{self.deliverable.id}/files/{notes.id}/download/"
+
+        self.client.force_authenticate(self.talent)
+        resp = self.client.get(url, HTTP_RANGE="bytes=1-3")
+        self.assertEqual(resp.status_code, 206)
+        self.assertEqual(b"".join(resp.streaming_content), b"ote")
+
+        self.client.force_authenticate(make_creator("other@test.com"))
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_task_attachment_download(self):
+        from django.core.files.base import ContentFile
+        from .models import TaskAttachment
+
+        attachment = TaskAttachment.objects.create(
+            task=self.deliverable.task, uploaded_by=self.creator, name="brief.txt",
+            file=ContentFile(b"brief", name="brief.txt"),
+        )
+        self.client.force_authenticate(self.talent)
+        resp = self.client.get(f"/api/v2/tasks/{self.deliverable.task_id}/attachments/{attachment.id}/download/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(b"".join(resp.streaming_content), b"brief")
+
+
+@override_settings(DERIVATIVES_IN_BACKGROUND=False)
+class DeliverableSubmissionTest(TestCase):
+    """Multi-file submissions store files concurrently and write their rows all or nothing."""
+
+    def setUp(self):
+        self.creator = make_creator()
+        self.talent = make_talent()
+        self.task = make_task(make_project(self.creator), assignees=[self.talent])
+        self.client = APIClient()
+        self.client.force_authenticate(self.talent)
+
+    def submit(self, count=4):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        files = [SimpleUploadedFile(f"cut-{i}.mp4", b"x" * (i + 1), content_type="video/mp4") for i in range(count)]
+        return self.client.post("/api/v2/deliverables/", {
+            "task": str(self.task.id),
+            "title": "Round 1",
+            "files": files,
+            "urls": ["https://example.com/a", " ", "example.com/b "],
+        }, format="multipart")
+
+    def test_files_and_links_are_recorded_together(self):
+        from uploads import quota
+        from .models import Deliverable
+
+        with self.captureOnCommitCallbacks(execute=True):
+            resp = self.submit()
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED, resp.data)
+
+        deliverable = Deliverable.objects.get(task=self.task)
+        files = {f.name: f for f in deliverable.files.all()}
+        self.assertEqual(sorted(files), [f"cut-{i}.mp4" for i in range(4)])
+        with files["cut-2.mp4"].file.open("rb") as fh:
+            self.assertEqual(fh.read(), b"xxx")
+        self.assertEqual(files["cut-0.mp4"].file_type, "video/mp4")
+        self.assertEqual(files["cut-0.mp4"].previews, {"source": files["cut-0.mp4"].file.name})
+        self.assertEqual(deliverable.links.count(), 2)
+        self.assertEqual(quota.usage_for(self.creator.id).deliverable_bytes, 1 + 2 + 3 + 4)
+
+    def test_dashboard_snapshot_is_dropped_after_commit(self):
+        from unittest import mock
+        from portal import snapshots
+
+        with mock.patch.object(snapshots, "invalidate_dashboard") as invalidate:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.submit()
+                invalidate.assert_not_called()  # Not while files are still being stored
+        invalidate.assert_any_call(self.task.project_id, "project")
+        snapshot = snapshots.get_dashboard_snapshot(self.task.project_id)
+        files = snapshot["data"]["project"]["tasks"][0]["deliverables"][0]["files"]
+        self.assertEqual(len(files), 4)
+
+    def test_one_failed_write_stores_nothing(self):
+        from unittest import mock
+        from django.core.files.storage import default_storage
+        from .models import Deliverable, DeliverableFile
+
+        original_save = default_storage.save
+        saved = []
+
+        def flaky_save(name, content, max_length=None):
+            if content.name == "cut-2.mp4":
+                raise OSError("storage unavailable")
+            saved.append(original_save(name, content, max_length=max_length))
+            return saved[-1]
+
+        with mock.patch.object(DeliverableFile._meta.get_field("file").storage, "save", side_effect=flaky_save):
+            resp = self.submit()
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("cut-2.mp4", str(resp.data["files"]))
+        self.assertFalse(Deliverable.objects.exists())
+        self.assertEqual(len(saved), 3)
+        self.assertFalse(any(default_storage.exists(name) for name in saved))
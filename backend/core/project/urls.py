@@ -10,6 +10,7 @@ from .views import (
     TaskCommentDeleteView,
     TaskAttachmentListCreateView,
     TaskAttachmentDeleteView,
+    TaskAttachmentDownloadView,
     TaskChecklistListCreateView,
     TaskChecklistDetailView,
     TaskChecklistItemListCreateView,
@@ -20,6 +21,8 @@ from .views import (
     DeliverableListCreateView,
     DeliverableDetailView,
     DeliverableReviewView,
+    DeliverableDownloadView,
+    DeliverableFileDownloadView,
     ConversationListView,
     ConversationCreateView,
     MessageListView,
@@ -66,6 +69,7 @@ urlpatterns = [
     # Task Attachments
     path("tasks/<uuid:task_id>/attachments/", TaskAttachmentListCreateView.as_view(), name="task-attachment-list"),
     path("tasks/<uuid:task_id>/attachments/<uuid:attachment_id>/", TaskAttachmentDeleteView.as_view(), name="task-attachment-delete"),
+    path("tasks/<uuid:task_id>/attachments/<uuid:attachment_id>/download/", TaskAttachmentDownloadView.as_view(), name="task-attachment-download"),
 
     # Task Checklists
     path("tasks/<uuid:task_id>/checklists/", TaskChecklistListCreateView.as_view(), name="task-checklist-list"),
@@ -77,6 +81,8 @@ urlpatterns = [
     path("deliverables/", DeliverableListCreateView.as_view(), name="deliverable-list-create"),
     path("deliverables/<uuid:pk>/", DeliverableDetailView.as_view(), name="deliverable-detail"),
     path("deliverables/<uuid:pk>/review/", DeliverableReviewView.as_view(), name="deliverable-review"),
+    path("deliverables/<uuid:pk>/download/", DeliverableDownloadView.as_view(), name="deliverable-download"),
+    path("deliverables/<uuid:pk>/files/<uuid:file_id>/download/", DeliverableFileDownloadView.as_view(), name="deliverable-file-download"),
 
     # Conversations & Messages (1-on-1)
     path("conversations/", ConversationListView.as_view(), name="conversation-list"),
@@ -288,18 +288,39 @@ class TaskAttachmentListCreateView(generics.ListCreateAPIView):
 
     def perform_create(self, serializer):
         from rest_framework.exceptions import ValidationError
+        from django.db import transaction
+        from uploads import quota
+        from uploads.services import UploadError, claim_upload
         task = self._task()
         uploaded_file = self.request.FILES.get("file")
+        upload_id = self.request.data.get("upload_id")
         url = self.request.data.get("url", "").strip()
         name = self.request.data.get("name", "").strip()
-        if not uploaded_file and not url:
+        if not uploaded_file and not upload_id and not url:
             raise ValidationError("Either a file or a URL is required.")
         if url and not url.startswith(("http://", "https://")):
             url = "https://" + url
+        if upload_id and not uploaded_file:
+            # A completed chunked upload (uploads app) stands in for the file
+            try:
+                with claim_upload(upload_id, self.request.user) as upload:
+                    quota.ensure_room(task.project.creator_id, upload.size)
+                    serializer.save(task=task, uploaded_by=self.request.user,
+                                    name=name or upload.name, file=upload, url=url or None)
+            except UploadError as exc:
+                raise ValidationError({"upload_id": [str(exc)]})
+            return
         if not name:
             name = uploaded_file.name if uploaded_file else url
-        serializer.save(task=task, uploaded_by=self.request.user, name=name,
-                        file=uploaded_file or None, url=url or None)
+        # Quota check and save in one transaction, so the usage row lock covers both
+        with transaction.atomic():
+            if uploaded_file:
+                try:
+                    quota.ensure_room(task.project.creator_id, uploaded_file.size)
+                except UploadError as exc:
+                    raise ValidationError({"file": [str(exc)]})
+            serializer.save(task=task, uploaded_by=self.request.user, name=name,
+                            file=uploaded_file or None, url=url or None)
 
 
 class TaskAttachmentDeleteView(generics.DestroyAPIView):
@@ -318,6 +339,24 @@ class TaskAttachmentDeleteView(generics.DestroyAPIView):
         return attachment
 
 
+class TaskAttachmentDownloadView(APIView):
+    """Stream a task attachment's file to anyone with access to the task."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, task_id, attachment_id):
+        from utils.storage import serve_file
+
+        task = _get_task_for_user(request.user, task_id)
+        attachment = TaskAttachment.objects.filter(id=attachment_id, task=task).first()
+        if attachment is None or not attachment.file:
+            return Response({"error": "Attachment not found"}, status=status.HTTP_404_NOT_FOUND)
+        response = serve_file(request, attachment.file.storage, attachment.file.name, filename=attachment.name)
+        if response is None:
+            return Response({"error": "File not found"}, status=status.HTTP_404_NOT_FOUND)
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+
 class TaskChecklistListCreateView(generics.ListCreateAPIView):
     serializer_class = TaskChecklistSerializer
     permission_classes = [IsAuthenticated]
@@ -448,21 +487,59 @@ class DeliverableListCreateView(generics.ListCreateAPIView):
             ).prefetch_related('files', 'links')
 
     def perform_create(self, serializer):
+        from contextlib import ExitStack
+        from rest_framework.exceptions import ValidationError
+        from django.db import transaction
+        from portal.snapshots import invalidate_dashboard_on_commit
+        from uploads import derivatives, quota
+        from uploads.services import UploadError, claim_upload, discard_stored, store_concurrently
         from .models import DeliverableFile, DeliverableLink
-        deliverable = serializer.save()
-
-        for f in self.request.FILES.getlist('files', []):
-            DeliverableFile.objects.create(
-                deliverable=deliverable,
-                file=f,
-                name=f.name,
-                size=f.size,
-                file_type=f.content_type,
-            )
 
-        for url in self.request.data.getlist('urls', []):
-            if url and url.strip():
-                DeliverableLink.objects.create(deliverable=deliverable, url=url.strip())
+        files = self.request.FILES.getlist('files', [])
+        urls = [url.strip() for url in self.request.data.getlist('urls', []) if url and url.strip()]
+        storage = DeliverableFile._meta.get_field("file").storage
+        stored = []
+        try:
+            with transaction.atomic(), ExitStack() as claims:
+                deliverable = serializer.save()
+                owner_id = deliverable.task.project.creator_id
+
+                # Completed chunked or direct uploads (uploads app), attached by id
+                incoming = list(files)
+                try:
+                    for upload_id in self.request.data.getlist('upload_ids', []):
+                        incoming.append(claims.enter_context(claim_upload(upload_id, self.request.user)))
+                except UploadError as exc:
+                    raise ValidationError({"upload_ids": [str(exc)]})
+
+                rows = [
+                    DeliverableFile(
+                        deliverable=deliverable,
+                        name=f.name,
+                        size=f.size,
+                        file_type=f.content_type or "",
+                    )
+                    for f in incoming
+                ]
+                try:
+                    quota.ensure_room(owner_id, sum(row.size for row in rows))
+                    # Every file goes to storage at once; rows are written only if all succeed
+                    stored = store_concurrently([(row.file, f) for row, f in zip(rows, incoming)])
+                except UploadError as exc:
+                    raise ValidationError({"files": [str(exc)]})
+
+                # bulk_create sends no post_save: do the previews, quota and
+                # dashboard snapshot hooks' work here
+                derivatives.track_bulk(DeliverableFile, rows)
+                DeliverableFile.objects.bulk_create(rows)
+                quota.adjust(owner_id, "deliverable", sum(row.size for row in rows))
+                invalidate_dashboard_on_commit(deliverable.task.project_id, "project")
+                DeliverableLink.objects.bulk_create(
+                    [DeliverableLink(deliverable=deliverable, url=url) for url in urls]
+                )
+        except Exception:
+            discard_stored(storage, stored)  # Nothing references them now
+            raise
 
         creator = deliverable.task.project.creator
         submitter = self.request.user
@@ -491,6 +568,55 @@ class DeliverableDetailView(generics.RetrieveDestroyAPIView):
             ).prefetch_related('files', 'links')
 
 
+def _deliverables_for(user):
+    if user.role == "creator":
+        return Deliverable.objects.filter(task__project__creator=user)
+    return Deliverable.objects.filter(submitted_by=user)
+
+
+class DeliverableDownloadView(APIView):
+    """Stream every file of a deliverable as one ZIP archive."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        from utils.zipstream import safe_name, unique_name, zip_response
+
+        try:
+            deliverable = _deliverables_for(request.user).get(pk=pk)
+        except Deliverable.DoesNotExist:
+            return Response({"error": "Deliverable not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        taken = set()
+        entries = [
+            (unique_name(safe_name(f.name), taken), f.file, f.uploaded_at)
+            for f in deliverable.files.order_by("uploaded_at")
+        ]
+        return zip_response(entries, f"{safe_name(deliverable.title, 'deliverable')}.zip")
+
+
+class DeliverableFileDownloadView(APIView):
+    """Stream a single file of a deliverable; supports Range requests (see utils.storage)."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk, file_id):
+        from utils.storage import serve_file
+        from .models import DeliverableFile
+
+        deliverable_file = DeliverableFile.objects.filter(
+            id=file_id, deliverable__in=_deliverables_for(request.user).filter(pk=pk),
+        ).first()
+        if deliverable_file is None:
+            return Response({"error": "File not found"}, status=status.HTTP_404_NOT_FOUND)
+        response = serve_file(
+            request, deliverable_file.file.storage, deliverable_file.file.name,
+            filename=deliverable_file.name, content_type=deliverable_file.file_type or None,
+        )
+        if response is None:
+            return Response({"error": "File not found"}, status=status.HTTP_404_NOT_FOUND)
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+
 class DeliverableReviewView(generics.UpdateAPIView):
     """Creator can approve or request revision on deliverables"""
     serializer_class = DeliverableReviewSerializer
@@ -0,0 +1,223 @@
+"""
+Image derivatives — thumbnails and previews rendered off the request path.
+
+Derivatives are JPEGs stored at derivatives/<hash[:2]>/<hash>-<px>.jpg,
+keyed by the SHA-256 of the source bytes, so a file that many rows point
+at is rendered once and any later row reuses the stored copies.
+
+A model opts in by having a `previews` JSONField and calling track() for
+its file field (see library.signals, project.signals). When the file
+changes, the row's previews are cleared and a background thread renders
+new ones, recording {"source", "hash", "thumbnail", "preview"} with a
+queryset update. Multi-frame and multi-page images (GIF, TIFF, ICO...)
+are rendered from their first frame; formats Pillow cannot read are
+marked {"unsupported": true}. The generate_previews command backfills
+rows the background thread never reached.
+"""
+import functools
+import hashlib
+import io
+import logging
+import os
+import queue
+import threading
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+SIZES = {"thumbnail": 256, "preview": 1024}
+JPEG_QUALITY = 82
+IDLE_TIMEOUT = 30  # Seconds the worker waits for more work before exiting
+
+_tracked = {}  # model label -> (file field name, callable returning a known source hash or None)
+
+
+@functools.lru_cache(maxsize=1)
+def _readable_extensions():
+    Image.init()
+    return {ext for ext, fmt in Image.registered_extensions().items() if fmt in Image.OPEN}
+
+
+def is_candidate(name):
+    """Whether Pillow can open files with this name's extension."""
+    return os.path.splitext(name or "")[1].lower() in _readable_extensions()
+
+
+def derivative_url(instance, kind="thumbnail", request=None):
+    """URL of a rendered derivative, or None while pending or unsupported."""
+    path = (getattr(instance, "previews", None) or {}).get(kind)
+    if not path:
+        return None
+    url = default_storage.url(path)
+    return request.build_absolute_uri(url) if request else url
+
+
+# ── Rendering ─────────────────────────────────────────────────────────
+
+def _sha256(field_file):
+    hasher = hashlib.sha256()
+    for chunk in field_file.chunks():
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _flatten(image):
+    """RGB image; transparent areas become white since JPEG has no alpha."""
+    if image.mode in ("RGB", "L"):
+        return image
+    rgba = image.convert("RGBA")
+    background = Image.new("RGB", rgba.size, "white")
+    background.paste(rgba, mask=rgba.getchannel("A"))
+    return background
+
+
+def render(field_file, source_hash=None):
+    """Return the previews dict for a stored file, rendering only what is not cached."""
+    if not is_candidate(field_file.name):
+        return {"unsupported": True}
+
+    field_file.open("rb")
+    try:
+        source_hash = source_hash or _sha256(field_file)
+        paths = {
+            kind: f"derivatives/{source_hash[:2]}/{source_hash}-{px}.jpg"
+            for kind, px in SIZES.items()
+        }
+        missing = [kind for kind, path in paths.items() if not default_storage.exists(path)]
+        if missing:
+            field_file.seek(0)
+            with Image.open(field_file) as image:
+                image.draft("RGB", (max(SIZES.values()),) * 2)  # JPEG: decode at reduced scale
+                image = _flatten(ImageOps.exif_transpose(image))
+                # Largest first, so each smaller size shrinks the previous result
+                for kind in sorted(missing, key=lambda k: -SIZES[k]):
+                    image.thumbnail((SIZES[kind], SIZES[kind]), Image.LANCZOS)
+                    buffer = io.BytesIO()
+                    image.save(buffer, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+                    paths[kind] = default_storage.save(paths[kind], ContentFile(buffer.getvalue()))
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError) as exc:
+        logger.info("No preview for %s: %s", field_file.name, exc)
+        return {"unsupported": True}
+    finally:
+        field_file.close()
+    return {"hash": source_hash, **paths}
+
+
+def generate(model_label, pk):
+    """Render and record previews for one row; a no-op if its file changed meanwhile."""
+    model = apps.get_model(model_label)
+    field_name, hash_of = _tracked[model_label]
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return
+    field_file = getattr(instance, field_name)
+    if not field_file:
+        return
+    previews = render(field_file, hash_of(instance) if hash_of else None)
+    previews["source"] = field_file.name
+    model.objects.filter(pk=pk, **{field_name: field_file.name}).update(previews=previews)
+
+
+# ── Background worker ─────────────────────────────────────────────────
+
+_queue = queue.Queue()
+_worker_lock = threading.Lock()
+_worker = None
+
+
+def _run():
+    global _worker
+    try:
+        while True:
+            try:
+                model_label, pk = _queue.get(timeout=IDLE_TIMEOUT)
+            except queue.Empty:
+                with _worker_lock:
+                    if _queue.empty():
+                        _worker = None
+                        return
+                continue
+            try:
+                generate(model_label, pk)
+            except Exception as exc:
+                logger.error("Preview generation failed for %s %s: %s", model_label, pk, exc, exc_info=True)
+    finally:
+        connection.close()  # This thread's own connection
+
+
+def schedule(model_label, pk):
+    """Queue a row for rendering on this process's background worker."""
+    if not getattr(settings, "DERIVATIVES_IN_BACKGROUND", True):
+        return
+    global _worker
+    _queue.put((model_label, pk))
+    with _worker_lock:
+        if _worker is None:
+            _worker = threading.Thread(target=_run, daemon=True)
+            _worker.start()
+
+
+# ── Model hook ────────────────────────────────────────────────────────
+
+def track(model, field_name="file", source_hash=None):
+    """
+    Keep `model.previews` in step with `model.<field_name>`.
+    source_hash(instance) may return a known SHA-256 to skip hashing the file.
+    """
+    label = model._meta.label
+    _tracked[label] = (field_name, source_hash)
+
+    def on_save(sender, instance, **kwargs):
+        field_file = getattr(instance, field_name)
+        name = field_file.name or ""
+        if (instance.previews or {}).get("source") == name:
+            return
+        # Recording the new source marks the row pending until the worker fills it in
+        instance.previews = {"source": name}
+        model.objects.filter(pk=instance.pk).update(previews=instance.previews)
+        if name:
+            pk = instance.pk
+            transaction.on_commit(lambda: schedule(label, pk))
+
+    post_save.connect(on_save, sender=model, weak=False, dispatch_uid=f"derivatives:{label}")
+
+
+def track_bulk(model, instances):
+    """
+    The save hook for rows about to be bulk_create()d, which sends no
+    post_save: mark each pending on its source, and render after commit.
+    """
+    label = model._meta.label
+    field_name, _ = _tracked[label]
+    pks = []
+    for instance in instances:
+        name = getattr(instance, field_name).name or ""
+        instance.previews = {"source": name}
+        if name:
+            pks.append(instance.pk)
+
+    def schedule_all():
+        for pk in pks:
+            schedule(label, pk)
+
+    if pks:
+        transaction.on_commit(schedule_all)
+
+
+def pending(model):
+    """Rows of a tracked model with a file but no rendered or rejected previews."""
+    field_name, _ = _tracked[model._meta.label]
+    return model.objects.exclude(**{field_name: ""}).exclude(
+        **{f"{field_name}__isnull": True},
+    ).exclude(previews__has_key="hash").exclude(previews__has_key="unsupported")
+
+
+def tracked_models():
+    return [apps.get_model(label) for label in _tracked]
@@ -0,0 +1,119 @@
+"""
+Direct uploads — files sent from the client straight to media storage.
+
+create() opens an UploadSession for the file and asks the storage
+backend for a signed upload target (its presign_upload(), see
+utils.storage) valid for DIRECT_UPLOAD_TTL seconds. The client sends the
+bytes there and then completes the session as for a chunked upload.
+Targets are single-use: storage never lets one replace a file that is
+already there, so once completed (and adopted in place) the bytes can't
+be swapped by whoever holds the signed target.
+
+Completing never reads the object back through the app: it checks the
+size the storage reports. A SHA-256 declared when the upload starts is
+signed into the target, and backends that enforce it
+(verifies_upload_sha256) refuse any other bytes, so it becomes the
+session's digest. Elsewhere the digest is left blank rather than taken
+on the client's word, because library blobs are deduplicated by it; the
+library then hashes the file itself (library.blobs.sha256_of).
+
+The session id is then passed as upload_id to the
+same flows as a chunked upload. claim_upload() hands those flows a
+StoredUpload, which storage adopts in place, so the bytes are never
+copied; an object no flow kept (a library upload matching an existing
+blob) is deleted once the claim commits.
+"""
+from django.conf import settings
+from django.core.files.base import File
+from django.core.files.storage import default_storage
+from django.utils.functional import cached_property
+from django.utils import timezone
+
+from .models import UploadSession
+from .services import UploadError, create_session
+
+DIRECT_UPLOAD_TTL = getattr(settings, "UPLOAD_DIRECT_TTL_SECONDS", 15 * 60)
+
+
+def supported(storage=default_storage):
+    return hasattr(storage, "presign_upload")
+
+
+def create(owner, file_name, total_size, content_type="", sha256=""):
+    """Open a direct upload; returns (session, target) — see presign_upload()."""
+    if not supported():
+        raise UploadError("Direct uploads are not available; use a chunked upload")
+    session = create_session(owner, file_name, total_size, content_type, chunk_size=total_size)
+    name = f"uploads/direct/{session.id}/{default_storage.get_valid_name(file_name)}"
+    sha256 = sha256.lower()
+    target = default_storage.presign_upload(name, content_type, total_size, DIRECT_UPLOAD_TTL, sha256=sha256)
+    session.storage_name = target.pop("name")
+    session.sha256 = sha256  # Declared; only kept on completion if storage enforced it
+    session.save(update_fields=["storage_name", "sha256"])
+    return session, target
+
+
+def complete(session, expected_sha256=""):
+    """
+    Check the object is in storage with the declared size, from storage
+    metadata only (see the module docstring for the digest). Claimed with
+    a conditional UPDATE like complete_session(), so the row is not held
+    locked while storage is asked. Returns the session.
+    """
+    if session.status != "UPLOADING":
+        return session
+    if not UploadSession.objects.filter(id=session.id, status="UPLOADING").update(status="ASSEMBLING"):
+        session.refresh_from_db()
+        return session
+
+    declared = session.sha256
+    try:
+        if expected_sha256 and expected_sha256.lower() != declared:
+            raise UploadError(
+                "Checksum does not match the one declared when the upload started"
+                if declared else "Declare sha256 when starting a direct upload to have it verified"
+            )
+        if not default_storage.exists(session.storage_name):
+            raise UploadError("The file has not been uploaded yet")
+        size = default_storage.size(session.storage_name)
+        if size != session.total_size:
+            raise UploadError(f"Uploaded {size} bytes but {session.total_size} were declared")
+    except (UploadError, OSError):
+        UploadSession.objects.filter(id=session.id).update(status="UPLOADING")
+        raise
+
+    session.status = "COMPLETE"
+    session.sha256 = declared if getattr(default_storage, "verifies_upload_sha256", False) else ""
+    session.completed_at = timezone.now()
+    session.save(update_fields=["status", "sha256", "completed_at"])
+    return session
+
+
+def discard(session):
+    """Delete a direct upload's object unless a flow has taken it over."""
+    if session.is_direct and session.status != "CONSUMED":
+        default_storage.delete(session.storage_name)
+
+
+class StoredUpload(File):
+    """
+    A completed direct upload, usable anywhere a request.FILES value is.
+    Saving it to a FileField adopts stored_name (DirectUploadMixin) and
+    sets adopted; its bytes are only read if something asks for them.
+    """
+
+    def __init__(self, session):
+        self.name = session.file_name
+        self.stored_name = session.storage_name
+        self.content_type = session.content_type or "application/octet-stream"
+        self.size = session.total_size
+        self.sha256 = session.sha256
+        self.adopted = False
+
+    @cached_property
+    def file(self):
+        return default_storage.open(self.stored_name, "rb")
+
+    def close(self):
+        if "file" in self.__dict__:
+            self.file.close()
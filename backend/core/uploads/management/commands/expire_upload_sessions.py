@@ -0,0 +1,15 @@
+"""Remove expired upload sessions and their spooled chunks."""
+from django.core.management.base import BaseCommand
+
+from uploads import services
+
+
+class Command(BaseCommand):
+    help = "Delete upload sessions past their expiry, along with their spooled bytes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        removed = services.expire_sessions(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} expired upload session(s)."))
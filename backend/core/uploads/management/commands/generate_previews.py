@@ -0,0 +1,24 @@
+"""Render thumbnails and previews for rows the background worker never reached."""
+from django.core.management.base import BaseCommand
+
+from uploads import derivatives
+
+
+class Command(BaseCommand):
+    help = "Generate missing image thumbnails and previews for every tracked model."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=None, help="Stop after this many rows per model.")
+
+    def handle(self, *args, **options):
+        for model in derivatives.tracked_models():
+            label = model._meta.label
+            pks = derivatives.pending(model).values_list("pk", flat=True)
+            if options["limit"]:
+                pks = pks[:options["limit"]]
+            done = 0
+            for pk in list(pks):
+                derivatives.generate(label, pk)
+                done += 1
+            self.stdout.write(f"{label}: {done} row(s) processed.")
+        self.stdout.write(self.style.SUCCESS("Done."))
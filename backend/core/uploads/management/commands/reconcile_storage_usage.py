@@ -0,0 +1,24 @@
+"""Recompute per-creator storage usage from the stored file tables."""
+from django.core.management.base import BaseCommand
+
+from uploads import quota
+
+
+class Command(BaseCommand):
+    help = "Compare each creator's storage usage ledger with the files they store, and correct drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report drift without correcting it.")
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        if not dry_run:
+            measured = quota.measure_missing_sizes()
+            if measured:
+                self.stdout.write(f"Recorded sizes for {measured} older attachment(s).")
+
+        drifted = quota.reconcile(dry_run=dry_run)
+        for owner_id, recorded, actual in drifted:
+            self.stdout.write(f"{owner_id}: recorded {recorded}, actual {actual}")
+        verb = "Found" if dry_run else "Corrected"
+        self.stdout.write(self.style.SUCCESS(f"{verb} drift for {len(drifted)} creator(s)."))
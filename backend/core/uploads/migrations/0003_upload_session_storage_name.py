@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 00:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uploads', '0002_storage_usage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadsession',
+            name='storage_name',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 01:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uploads', '0003_upload_session_storage_name'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='uploadsession',
+            name='chunk_size',
+            field=models.BigIntegerField(),
+        ),
+    ]
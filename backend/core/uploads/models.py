@@ -0,0 +1,111 @@
+"""
+Uploads models — resumable, chunked upload sessions.
+
+A client creates an UploadSession for one file, PUTs its chunks (in any
+order, retrying any that fail), then completes it. The assembled file is
+claimed once by whichever upload flow needs it — a library document, a
+deliverable, a task or portal attachment — via uploads.services.
+
+A direct upload is a session whose bytes never pass through Django: the
+client sends the file straight to media storage using a short-lived
+signed target (uploads.direct), and storage_name records where it lands.
+
+StorageUsage is the per-creator ledger of stored bytes (uploads.quota).
+"""
+import uuid
+from django.db import models
+from django.conf import settings
+
+
+class UploadSession(models.Model):
+    STATUS_CHOICES = [
+        ("UPLOADING", "Uploading"),
+        ("ASSEMBLING", "Assembling"),
+        ("COMPLETE", "Complete"),
+        ("CONSUMED", "Consumed"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="upload_sessions",
+    )
+    file_name = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True)
+    total_size = models.BigIntegerField()
+    chunk_size = models.BigIntegerField()  # A direct upload is one chunk of total_size
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="UPLOADING")
+    sha256 = models.CharField(max_length=64, blank=True)
+    storage_name = models.CharField(max_length=500, blank=True)  # Direct uploads only
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.file_name} ({self.status})"
+
+    @property
+    def is_direct(self):
+        return bool(self.storage_name)
+
+    @property
+    def chunk_count(self):
+        return -(-self.total_size // self.chunk_size)
+
+    def chunk_bounds(self, index):
+        """(offset, length) of chunk `index`; the last chunk may be short."""
+        offset = index * self.chunk_size
+        return offset, min(self.chunk_size, self.total_size - offset)
+
+
+class UploadChunk(models.Model):
+    """One received chunk; its bytes are already in place in the spool file."""
+
+    session = models.ForeignKey(
+        UploadSession,
+        on_delete=models.CASCADE,
+        related_name="chunks",
+    )
+    index = models.IntegerField()
+    size = models.IntegerField()
+    received_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["index"]
+        constraints = [
+            models.UniqueConstraint(fields=["session", "index"], name="upload_chunk_unique_index"),
+        ]
+
+    def __str__(self):
+        return f"{self.session_id} #{self.index}"
+
+
+class StorageUsage(models.Model):
+    """
+    Bytes stored in a creator's workspace, kept current by uploads.quota as
+    files are added, replaced and deleted. Files uploaded by clients or
+    team members into a creator's projects count against that creator.
+    """
+
+    owner = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="storage_usage",
+    )
+    library_bytes = models.BigIntegerField(default=0)  # Documents and their archived versions
+    deliverable_bytes = models.BigIntegerField(default=0)
+    attachment_bytes = models.BigIntegerField(default=0)  # Task and portal message attachments
+    quota_bytes = models.BigIntegerField(null=True, blank=True)  # Overrides STORAGE_QUOTA_BYTES
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.owner_id}: {self.used_bytes} bytes"
+
+    @property
+    def used_bytes(self):
+        return self.library_bytes + self.deliverable_bytes + self.attachment_bytes
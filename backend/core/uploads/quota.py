@@ -0,0 +1,200 @@
+"""
+Storage quota — a per-creator ledger of stored bytes, and enforcement.
+
+Every model that stores files for a creator's workspace is registered
+with track() (see library.signals, project.signals, portal.signals).
+Its saves and deletes adjust the owner's StorageUsage row by the change
+in size, inside the same transaction as the write, so uploads,
+re-uploads, archived versions, permanent deletes and trash purges are
+all accounted for without ever summing the file tables.
+
+Upload flows call ensure_room() with the incoming size before storing
+anything; it raises QuotaExceeded when the owner's quota (their own
+quota_bytes, else STORAGE_QUOTA_BYTES; unset means unlimited) would be
+exceeded. It locks the owner's row (select_for_update), so when called
+inside the upload's transaction, concurrent uploads for the same owner
+wait for it to commit and see its adjust() before checking. The reconcile_storage_usage command rebuilds the ledger from
+the file tables if it ever drifts.
+"""
+import logging
+
+from django.apps import apps
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.db.models.signals import post_delete, post_init, post_save
+from django.utils import timezone
+
+from .models import StorageUsage
+from .services import UploadError
+
+logger = logging.getLogger(__name__)
+
+CATEGORIES = ("library", "deliverable", "attachment")
+
+
+class QuotaExceeded(UploadError):
+    pass
+
+
+def default_quota():
+    return getattr(settings, "STORAGE_QUOTA_BYTES", None)
+
+
+def usage_for(owner_id):
+    """The owner's ledger row, or an unsaved empty one if nothing is stored yet."""
+    return StorageUsage.objects.filter(owner_id=owner_id).first() or StorageUsage(owner_id=owner_id)
+
+
+def quota_of(usage):
+    return usage.quota_bytes if usage.quota_bytes is not None else default_quota()
+
+
+def _locked_usage(owner_id):
+    """The owner's ledger row locked for update, created first if missing; None if unlimited and absent."""
+    usage = StorageUsage.objects.select_for_update().filter(owner_id=owner_id).first()
+    if usage is None and default_quota() is not None:
+        StorageUsage.objects.get_or_create(owner_id=owner_id)
+        usage = StorageUsage.objects.select_for_update().get(owner_id=owner_id)
+    return usage
+
+
+def ensure_room(owner_id, incoming_bytes):
+    """
+    Raise QuotaExceeded if `incoming_bytes` more would put the owner over
+    quota. The row lock lasts until the caller's transaction ends.
+    """
+    with transaction.atomic():
+        usage = _locked_usage(owner_id)
+    if usage is None:
+        return
+    limit = quota_of(usage)
+    if limit is None:
+        return
+    if usage.used_bytes + incoming_bytes > limit:
+        available = max(limit - usage.used_bytes, 0)
+        raise QuotaExceeded(
+            f"Storage quota exceeded: this upload needs {incoming_bytes} bytes "
+            f"but only {available} of {limit} remain"
+        )
+
+
+def adjust(owner_id, category, delta):
+    """Add `delta` bytes (negative to release) to one category of the owner's usage."""
+    if not delta or owner_id is None:
+        return
+    field = f"{category}_bytes"
+    changes = {field: F(field) + delta, "updated_at": timezone.now()}
+    if StorageUsage.objects.filter(owner_id=owner_id).update(**changes):
+        return
+    if delta < 0:
+        return  # Nothing recorded yet (or the owner is being deleted); reconcile fixes drift
+    try:
+        with transaction.atomic():
+            StorageUsage.objects.create(owner_id=owner_id, **{field: delta})
+    except IntegrityError:  # Created concurrently
+        StorageUsage.objects.filter(owner_id=owner_id).update(**changes)
+
+
+def track(model, category, size_field, owner_of, scale=1):
+    """
+    Keep the ledger in step with `model`. `size_field` holds the stored
+    size (multiplied by `scale` to get bytes); owner_of(instance) returns
+    the id of the creator the bytes count against.
+    """
+    assert category in CATEGORIES
+    label = model._meta.label
+
+    def size_of(instance):
+        return round((getattr(instance, size_field) or 0) * scale)
+
+    def on_init(sender, instance, **kwargs):
+        if size_field in instance.__dict__:  # Not deferred
+            instance._stored_bytes = size_of(instance)
+
+    def on_save(sender, instance, created, **kwargs):
+        size = size_of(instance)
+        before = 0 if created else getattr(instance, "_stored_bytes", size)
+        instance._stored_bytes = size
+        if size != before:
+            adjust(owner_of(instance), category, size - before)
+
+    def on_delete(sender, instance, **kwargs):
+        adjust(owner_of(instance), category, -getattr(instance, "_stored_bytes", size_of(instance)))
+
+    post_init.connect(on_init, sender=model, weak=False, dispatch_uid=f"quota-init:{label}")
+    post_save.connect(on_save, sender=model, weak=False, dispatch_uid=f"quota-save:{label}")
+    post_delete.connect(on_delete, sender=model, weak=False, dispatch_uid=f"quota-delete:{label}")
+
+
+# ── Reconciliation ────────────────────────────────────────────────────
+
+def _sources():
+    """(category, queryset of stored files, owner lookup, size field, scale) per tracked table."""
+    Document = apps.get_model("library", "Document")
+    DocumentVersion = apps.get_model("library", "DocumentVersion")
+    DeliverableFile = apps.get_model("project", "DeliverableFile")
+    TaskAttachment = apps.get_model("project", "TaskAttachment")
+    PortalMessage = apps.get_model("portal", "PortalMessage")
+    return [
+        ("library", Document.objects.all(), "creator", "size_kb", 1024),
+        ("library", DocumentVersion.objects.all(), "document__creator", "stored_kb", 1024),
+        ("deliverable", DeliverableFile.objects.all(), "deliverable__task__project__creator", "size", 1),
+        ("attachment", TaskAttachment.objects.all(), "task__project__creator", "size", 1),
+        ("attachment", PortalMessage.objects.all(), "project__creator", "file_size", 1),
+    ]
+
+
+def measure_missing_sizes():
+    """Record sizes of attachments stored before sizes were tracked; returns rows updated."""
+    updated = 0
+    for model_label, size_field in (("project.TaskAttachment", "size"), ("portal.PortalMessage", "file_size")):
+        model = apps.get_model(model_label)
+        rows = model.objects.filter(**{size_field: 0}).exclude(file="").exclude(file__isnull=True)
+        for pk, name in rows.values_list("pk", "file").iterator():
+            try:
+                size = model._meta.get_field("file").storage.size(name)
+            except Exception as exc:  # Missing from storage; it then counts as zero
+                logger.warning("Cannot measure %s %s: %s", model_label, pk, exc)
+                continue
+            updated += model.objects.filter(pk=pk).update(**{size_field: size})
+    return updated
+
+
+def measure(owner_id):
+    """Actual bytes per category for one owner, summed from the file tables."""
+    totals = dict.fromkeys(CATEGORIES, 0)
+    for category, qs, owner_path, size_field, scale in _sources():
+        total = qs.filter(**{owner_path: owner_id}).aggregate(total=Sum(size_field))["total"] or 0
+        totals[category] += round(total * scale)
+    return totals
+
+
+def reconcile(dry_run=False):
+    """
+    Compare every owner's ledger with the file tables and correct it.
+    Each owner is fixed under a lock on their ledger row, so uploads
+    committing meanwhile are neither lost nor double counted.
+    Returns [(owner_id, recorded, actual)] for owners whose ledger had drifted.
+    """
+    owners = set(StorageUsage.objects.values_list("owner_id", flat=True))
+    for _, qs, owner_path, _, _ in _sources():
+        owners.update(qs.filter(**{f"{owner_path}__isnull": False}).values_list(owner_path, flat=True).distinct())
+
+    drifted = []
+    for owner_id in owners:
+        with transaction.atomic():
+            usage = StorageUsage.objects.select_for_update().filter(owner_id=owner_id).first()
+            actual = measure(owner_id)
+            recorded = {c: getattr(usage, f"{c}_bytes") if usage else 0 for c in CATEGORIES}
+            if recorded == actual:
+                continue
+            drifted.append((owner_id, recorded, actual))
+            if dry_run:
+                continue
+            fields = {f"{c}_bytes": actual[c] for c in CATEGORIES}
+            if usage:
+                StorageUsage.objects.filter(owner_id=owner_id).update(**fields, updated_at=timezone.now())
+            else:
+                StorageUsage.objects.create(owner_id=owner_id, **fields)
+    return drifted
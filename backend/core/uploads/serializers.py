@@ -0,0 +1,75 @@
+"""
+Uploads serializers — request/response schemas for chunked and direct
+upload sessions and storage usage.
+"""
+from rest_framework import serializers
+
+from . import quota, services
+from .models import StorageUsage, UploadSession
+
+
+class UploadSessionCreateSerializer(serializers.Serializer):
+    """Input schema for starting an upload."""
+    file_name = serializers.CharField(max_length=255)
+    content_type = serializers.CharField(max_length=100, required=False, allow_blank=True, default="")
+    total_size = serializers.IntegerField(min_value=1, max_value=services.MAX_UPLOAD_SIZE)
+    chunk_size = serializers.IntegerField(
+        required=False,
+        min_value=services.MIN_CHUNK_SIZE,
+        max_value=services.MAX_CHUNK_SIZE,
+    )
+
+
+class DirectUploadCreateSerializer(serializers.Serializer):
+    """Input schema for starting a direct-to-storage upload; sha256 is enforced where storage can."""
+    file_name = serializers.CharField(max_length=255)
+    content_type = serializers.CharField(max_length=100, required=False, allow_blank=True, default="")
+    total_size = serializers.IntegerField(min_value=1, max_value=services.MAX_UPLOAD_SIZE)
+    sha256 = serializers.RegexField(r"^[0-9a-fA-F]{64}$", required=False, allow_blank=True, default="")
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Session state, including which chunks have arrived (for resuming)."""
+    chunk_count = serializers.IntegerField(read_only=True)
+    received_chunks = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = [
+            "id", "file_name", "content_type", "total_size",
+            "chunk_size", "chunk_count", "received_chunks",
+            "status", "sha256", "expires_at", "created_at", "completed_at",
+        ]
+        read_only_fields = fields
+
+    def get_received_chunks(self, obj):
+        if obj.status != "UPLOADING":
+            return list(range(obj.chunk_count))
+        return list(obj.chunks.values_list("index", flat=True))
+
+
+class UploadCompleteSerializer(serializers.Serializer):
+    """Input schema for completing an upload; sha256 is verified if given."""
+    sha256 = serializers.RegexField(r"^[0-9a-fA-F]{64}$", required=False, allow_blank=True, default="")
+
+
+class StorageUsageSerializer(serializers.ModelSerializer):
+    """A creator's stored bytes by category, against their effective quota."""
+    used_bytes = serializers.IntegerField(read_only=True)
+    quota_bytes = serializers.SerializerMethodField()
+    available_bytes = serializers.SerializerMethodField()
+
+    class Meta:
+        model = StorageUsage
+        fields = [
+            "library_bytes", "deliverable_bytes", "attachment_bytes",
+            "used_bytes", "quota_bytes", "available_bytes", "updated_at",
+        ]
+        read_only_fields = fields
+
+    def get_quota_bytes(self, obj):
+        return quota.quota_of(obj)
+
+    def get_available_bytes(self, obj):
+        limit = quota.quota_of(obj)
+        return None if limit is None else max(limit - obj.used_bytes, 0)
@@ -0,0 +1,284 @@
+"""
+Upload services — spool I/O for chunked upload sessions and the
+single-use hand-off of a finished upload to the flow that attaches it.
+
+Each session spools into one file, UPLOAD_SPOOL_DIR/<session id>/data.
+Chunks are streamed straight into their byte range as they arrive, so
+there is no separate assembly copy and no step holds more than a small
+buffer in memory; completing a session only hashes the file once. The
+spool directory must be shared by every process serving upload requests.
+Direct uploads, which skip the spool entirely, are in uploads.direct.
+"""
+import contextlib
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
+from django.utils import timezone
+
+from .models import UploadChunk, UploadSession
+
+logger = logging.getLogger(__name__)
+
+SPOOL_DIR = getattr(
+    settings, "UPLOAD_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "onswift-uploads"),
+)
+SESSION_TTL = timedelta(hours=getattr(settings, "UPLOAD_SESSION_TTL_HOURS", 24))
+MAX_UPLOAD_SIZE = getattr(settings, "UPLOAD_MAX_SIZE", 5 * 1024 ** 3)
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+MIN_CHUNK_SIZE = 256 * 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+COPY_BUFFER = 1024 * 1024
+STORE_WORKERS = getattr(settings, "UPLOAD_STORE_WORKERS", 4)
+
+
+class UploadError(ValueError):
+    """A chunk or upload that cannot be accepted; the message is safe to show clients."""
+
+
+def spool_path(session):
+    return os.path.join(SPOOL_DIR, str(session.id), "data")
+
+
+def discard_spool(session_id):
+    shutil.rmtree(os.path.join(SPOOL_DIR, str(session_id)), ignore_errors=True)
+
+
+def create_session(owner, file_name, total_size, content_type="", chunk_size=None):
+    return UploadSession.objects.create(
+        owner=owner,
+        file_name=file_name,
+        content_type=content_type,
+        total_size=total_size,
+        chunk_size=chunk_size or DEFAULT_CHUNK_SIZE,
+        expires_at=timezone.now() + SESSION_TTL,
+    )
+
+
+def write_chunk(session, index, stream, offset=None):
+    """
+    Stream one chunk from `stream` into its byte range of the spool file.
+    Re-sending a chunk simply overwrites it. Returns the chunk size.
+    """
+    if session.is_direct:
+        raise UploadError("This upload goes straight to storage, not in chunks")
+    if session.status != "UPLOADING":
+        raise UploadError("Upload is no longer accepting chunks")
+    if not 0 <= index < session.chunk_count:
+        raise UploadError("Chunk index out of range")
+    expected_offset, expected_length = session.chunk_bounds(index)
+    if offset is not None and offset != expected_offset:
+        raise UploadError(f"Chunk {index} starts at offset {expected_offset}")
+
+    path = spool_path(session)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    written = 0
+    with os.fdopen(fd, "r+b") as out:
+        out.seek(expected_offset)
+        # Never write past this chunk's range, even if the body is too long
+        while written <= expected_length:
+            data = stream.read(min(COPY_BUFFER, expected_length + 1 - written))
+            if not data:
+                break
+            out.write(data[:expected_length - written])
+            written += len(data)
+    if written != expected_length:
+        raise UploadError(f"Chunk {index} must be exactly {expected_length} bytes")
+
+    UploadChunk.objects.update_or_create(
+        session=session, index=index, defaults={"size": written},
+    )
+    return written
+
+
+def complete_session(session, expected_sha256=""):
+    """
+    Check every chunk has arrived and fingerprint the spooled file.
+    The row is claimed with a conditional UPDATE rather than held locked
+    while a large file is hashed. Returns the refreshed session.
+    """
+    if session.status != "UPLOADING":
+        return session
+    received = session.chunks.count()
+    if received != session.chunk_count:
+        missing = sorted(
+            set(range(session.chunk_count)) - set(session.chunks.values_list("index", flat=True))
+        )
+        raise UploadError(f"Missing chunks: {missing[:50]}")
+    if not UploadSession.objects.filter(id=session.id, status="UPLOADING").update(status="ASSEMBLING"):
+        session.refresh_from_db()
+        return session
+
+    path = spool_path(session)
+    hasher = hashlib.sha256()
+    try:
+        with open(path, "r+b") as spooled:
+            spooled.truncate(session.total_size)
+            while data := spooled.read(COPY_BUFFER):
+                hasher.update(data)
+        digest = hasher.hexdigest()
+        if expected_sha256 and expected_sha256.lower() != digest:
+            raise UploadError("Checksum does not match the uploaded bytes")
+    except (UploadError, OSError):
+        UploadSession.objects.filter(id=session.id).update(status="UPLOADING")
+        raise
+
+    session.status = "COMPLETE"
+    session.sha256 = digest
+    session.completed_at = timezone.now()
+    session.save(update_fields=["status", "sha256", "completed_at"])
+    session.chunks.all().delete()
+    return session
+
+
+class ChunkedUpload(UploadedFile):
+    """
+    A completed session's spooled file, usable anywhere a request.FILES
+    value is. temporary_file_path() lets FileSystemStorage move the file
+    into place instead of copying it; sha256 spares library.blobs a re-hash.
+    """
+
+    def __init__(self, session):
+        self._path = spool_path(session)
+        super().__init__(
+            open(self._path, "rb"),
+            name=session.file_name,
+            content_type=session.content_type or "application/octet-stream",
+            size=session.total_size,
+        )
+        self.sha256 = session.sha256
+
+    def temporary_file_path(self):
+        return self._path
+
+
+@contextlib.contextmanager
+def claim_upload(upload_id, user):
+    """
+    Yield a completed upload as a ChunkedUpload (or, for a direct upload,
+    an uploads.direct.StoredUpload), for use exactly once. The session is
+    marked consumed in the caller's transaction and its spool is removed
+    after commit; if the caller fails, it stays usable.
+    """
+    from .direct import StoredUpload
+
+    with transaction.atomic():
+        try:
+            session = UploadSession.objects.select_for_update().get(
+                id=upload_id, owner=user,
+            )
+        except (UploadSession.DoesNotExist, DjangoValidationError, ValueError):
+            raise UploadError("Upload not found")
+        if session.status == "CONSUMED":
+            raise UploadError("Upload has already been attached")
+        if session.status != "COMPLETE":
+            raise UploadError("Upload is not complete")
+        if session.expires_at <= timezone.now() or (
+            not session.is_direct and not os.path.exists(spool_path(session))
+        ):
+            raise UploadError("Upload has expired")
+
+        upload = StoredUpload(session) if session.is_direct else ChunkedUpload(session)
+        try:
+            yield upload
+        finally:
+            upload.close()
+
+        session.status = "CONSUMED"
+        session.save(update_fields=["status"])
+        session_id = session.id
+        if not session.is_direct:
+            transaction.on_commit(lambda: discard_spool(session_id))
+        elif not upload.adopted:  # Stored as something else; the object is surplus
+            transaction.on_commit(lambda: default_storage.delete(upload.stored_name))
+
+
+def expire_sessions(batch_size=500):
+    """Delete sessions past their expiry, and their unclaimed bytes; returns the count."""
+    from .direct import discard
+
+    removed = 0
+    while True:
+        sessions = list(
+            UploadSession.objects.filter(expires_at__lt=timezone.now())
+            .only("id", "status", "storage_name")[:batch_size]
+        )
+        if not sessions:
+            return removed
+        UploadSession.objects.filter(id__in=[session.id for session in sessions]).delete()
+        for session in sessions:
+            discard_spool(session.id)
+            discard(session)
+        removed += len(sessions)
+
+
+@contextlib.contextmanager
+def incoming_file(user, file=None, upload_id=None):
+    """
+    The file for an upload flow that accepts either a multipart `file` or
+    the `upload_id` of a completed chunked upload.
+    """
+    if file is not None:
+        yield file
+        return
+    if not upload_id:
+        raise UploadError("Either a file or an upload_id is required")
+    with claim_upload(upload_id, user) as upload:
+        yield upload
+
+
+# ── Storing several files at once ─────────────────────────────────────
+
+def _store(field_file, content):
+    field_file.save(content.name, content, save=False)
+    return field_file.name
+
+
+def discard_stored(storage, names):
+    for name in names:
+        try:
+            storage.delete(name)
+        except Exception as exc:  # Orphaned; nothing references it
+            logger.warning("Could not delete %s from storage: %s", name, exc)
+
+
+def store_concurrently(pairs, max_workers=STORE_WORKERS):
+    """
+    Write each (field_file, content) pair to storage, as
+    field_file.save(content.name, content, save=False) would, on a
+    bounded thread pool, so a batch takes about as long as its slowest
+    file. All or nothing: if any write fails the others are deleted and
+    UploadError is raised. Returns the names written, for the caller to
+    discard if its own transaction then fails; files that were already
+    in storage (adopted direct uploads) are left out.
+    """
+    if not pairs:
+        return []
+    storage = pairs[0][0].storage
+    written, failed = [], []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(pairs))) as pool:
+        futures = {pool.submit(_store, field_file, content): content for field_file, content in pairs}
+        for future in as_completed(futures):
+            content = futures[future]
+            try:
+                name = future.result()
+            except Exception as exc:
+                logger.warning("Could not store %s: %s", content.name, exc)
+                failed.append(content.name)
+                continue
+            if not getattr(content, "adopted", False):
+                written.append(name)
+    if failed:
+        discard_stored(storage, written)
+        raise UploadError(f"Could not store {', '.join(sorted(failed))}; nothing was saved")
+    return written
@@ -0,0 +1,573 @@
+"""
+Chunked upload test suite.
+Covers: session lifecycle, chunk validation, resume state, checksum,
+single-use attachment to upload flows, and expiry; direct uploads;
+image derivatives.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from account.models import User
+from . import services
+from .models import UploadSession
+
+CHUNK = services.MIN_CHUNK_SIZE
+
+
+class ChunkedUploadTest(TestCase):
+
+    def setUp(self):
+        self.spool = tempfile.mkdtemp()
+        patcher = mock.patch.object(services, "SPOOL_DIR", self.spool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.spool, ignore_errors=True)
+
+        self.api = APIClient()
+        self.creator = User.objects.create_user(
+            email="creator@test.com",
+            full_name="Creator",
+            password="testpass123",
+            role="creator",
+        )
+        self.api.force_authenticate(self.creator)
+        self.payload = os.urandom(CHUNK * 2 + 1000)
+
+    def start(self, name="video.mp4"):
+        response = self.api.post(
+            "/api/v9/uploads/",
+            {"file_name": name, "total_size": len(self.payload), "chunk_size": CHUNK, "content_type": "video/mp4"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data["chunk_count"], 3)
+        return response.data["id"]
+
+    def put_chunk(self, upload_id, index, body=None, offset=None):
+        if body is None:
+            body = self.payload[index * CHUNK:(index + 1) * CHUNK]
+        url = f"/api/v9/uploads/{upload_id}/chunks/{index}/"
+        if offset is not None:
+            url += f"?offset={offset}"
+        return self.api.put(url, body, content_type="application/octet-stream")
+
+    def upload_all(self, upload_id):
+        for index in (2, 0, 1):  # Any order
+            self.assertEqual(self.put_chunk(upload_id, index, offset=index * CHUNK).status_code, 200)
+        response = self.api.post(
+            f"/api/v9/uploads/{upload_id}/complete/",
+            {"sha256": hashlib.sha256(self.payload).hexdigest()},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data["status"], "COMPLETE")
+
+    def test_resume_state_and_chunk_validation(self):
+        upload_id = self.start()
+        self.assertEqual(self.put_chunk(upload_id, 1).status_code, 200)
+
+        response = self.api.get(f"/api/v9/uploads/{upload_id}/")
+        self.assertEqual(response.data["received_chunks"], [1])
+
+        self.assertEqual(self.put_chunk(upload_id, 0, body=b"short").status_code, 400)
+        self.assertEqual(self.put_chunk(upload_id, 0, offset=5).status_code, 400)
+        self.assertEqual(self.put_chunk(upload_id, 3).status_code, 400)
+
+        response = self.api.post(f"/api/v9/uploads/{upload_id}/complete/", {}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("[0, 2]", response.data["error"])
+
+    def test_content_range_header_and_retried_chunk(self):
+        upload_id = self.start()
+        first = self.payload[:CHUNK]
+        response = self.api.put(
+            f"/api/v9/uploads/{upload_id}/chunks/0/",
+            first,
+            content_type="application/octet-stream",
+            HTTP_CONTENT_RANGE=f"bytes 0-{CHUNK - 1}/{len(self.payload)}",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.put_chunk(upload_id, 0).status_code, 200)  # Retry overwrites
+        self.assertEqual(response.data["received"], 1)
+
+    def test_checksum_mismatch_reopens_session(self):
+        upload_id = self.start()
+        for index in range(3):
+            self.put_chunk(upload_id, index)
+        response = self.api.post(
+            f"/api/v9/uploads/{upload_id}/complete/", {"sha256": "0" * 64}, format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(UploadSession.objects.get(id=upload_id).status, "UPLOADING")
+
+    @override_settings(LIBRARY_EXTRACTION_IN_BACKGROUND=False, DERIVATIVES_IN_BACKGROUND=False)
+    def test_attach_to_library_upload_once(self):
+        from library import activity
+        from library.models import Document, Folder
+
+        self.addCleanup(activity.flush)  # Write the UPLOADED event while the test database exists
+
+        folder = Folder.objects.create(creator=self.creator, name="Footage")
+        upload_id = self.start()
+        self.upload_all(upload_id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api.post(
+                "/api/v6/documents/upload/",
+                {"folder_id": str(folder.id), "upload_id": upload_id},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 201, response.data)
+        doc = Document.objects.get(id=response.data["id"])
+        self.assertEqual(doc.name, "video.mp4")
+        self.assertEqual(doc.blob.sha256, hashlib.sha256(self.payload).hexdigest())
+        with doc.file.open("rb") as fh:
+            self.assertEqual(fh.read(), self.payload)
+        self.assertEqual(UploadSession.objects.get(id=upload_id).status, "CONSUMED")
+        self.assertFalse(os.path.exists(os.path.join(self.spool, upload_id)))
+
+        response = self.api.post(
+            "/api/v6/documents/upload/",
+            {"folder_id": str(folder.id), "upload_id": upload_id},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_attach_to_portal_message(self):
+        from project.models import Project
+
+        project = Project.objects.create(creator=self.creator, name="Launch")
+        upload_id = self.start("cut.mp4")
+        self.upload_all(upload_id)
+
+        response = self.api.post(
+            f"/api/v5/projects/{project.id}/messages/send/",
+            {"content": "Final cut", "upload_id": upload_id},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data["file_name"], "cut.mp4")
+
+    def test_other_users_cannot_use_a_session(self):
+        other = User.objects.create_user(
+            email="other@test.com", full_name="Other", password="testpass123", role="creator",
+        )
+        upload_id = self.start()
+        self.api.force_authenticate(other)
+        self.assertEqual(self.api.get(f"/api/v9/uploads/{upload_id}/").status_code, 404)
+        self.assertEqual(self.put_chunk(upload_id, 0).status_code, 404)
+
+    def test_expired_sessions_are_removed(self):
+        upload_id = self.start()
+        self.put_chunk(upload_id, 0)
+        UploadSession.objects.filter(id=upload_id).update(expires_at=timezone.now() - timedelta(minutes=1))
+
+        call_command("expire_upload_sessions", stdout=StringIO())
+        self.assertFalse(UploadSession.objects.filter(id=upload_id).exists())
+        self.assertFalse(os.path.exists(os.path.join(self.spool, upload_id)))
+
+
+@override_settings(LIBRARY_EXTRACTION_IN_BACKGROUND=False, DERIVATIVES_IN_BACKGROUND=False)
+class DirectUploadTest(TestCase):
+    """Files sent straight to storage through a presigned target (LocalMediaStorage stand-in)."""
+
+    def setUp(self):
+        self.api = APIClient()
+        self.creator = User.objects.create_user(
+            email="creator@test.com",
+            full_name="Creator",
+            password="testpass123",
+            role="creator",
+        )
+        self.api.force_authenticate(self.creator)
+        self.payload = os.urandom(5000)
+
+    def start(self, name="brief.pdf", size=None, sha256=None):
+        response = self.api.post(
+            "/api/v9/uploads/direct/",
+            {
+                "file_name": name,
+                "total_size": size or len(self.payload),
+                "content_type": "application/pdf",
+                "sha256": hashlib.sha256(self.payload).hexdigest() if sha256 is None else sha256,
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data
+
+    def send(self, target, body=None):
+        # Anonymous: the signed URL is the only credential the storage needs
+        return APIClient().generic(
+            target["method"], target["url"].replace("http://testserver", ""),
+            self.payload if body is None else body, content_type=target["headers"]["Content-Type"],
+        )
+
+    def complete(self, upload_id):
+        return self.api.post(
+            f"/api/v9/uploads/{upload_id}/complete/",
+            {"sha256": hashlib.sha256(self.payload).hexdigest()},
+            format="json",
+        )
+
+    def test_upload_verify_and_attach_without_copying(self):
+        from django.core.files.storage import default_storage
+        from project.models import Project, Task, TaskAttachment
+
+        session = self.start()
+        self.assertEqual(session["upload"]["method"], "PUT")
+        self.assertEqual(self.complete(session["id"]).status_code, 400)  # Nothing uploaded yet
+
+        self.assertEqual(self.send(session["upload"]).status_code, 204)
+        with mock.patch.object(default_storage, "open", side_effect=AssertionError("read back")):
+            response = self.complete(session["id"])
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data["sha256"], hashlib.sha256(self.payload).hexdigest())
+
+        task = Task.objects.create(project=Project.objects.create(creator=self.creator, name="Launch"), name="Brief")
+        response = self.api.post(
+            f"/api/v2/tasks/{task.id}/attachments/", {"name": "Brief", "upload_id": session["id"]}, format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        attachment = TaskAttachment.objects.get(id=response.data["id"])
+        stored_name = UploadSession.objects.get(id=session["id"]).storage_name
+        self.assertEqual(attachment.file.name, stored_name)  # Adopted in place
+        self.assertEqual(attachment.size, len(self.payload))
+        with default_storage.open(stored_name, "rb") as fh:
+            self.assertEqual(fh.read(), self.payload)
+
+    def test_duplicate_library_upload_drops_surplus_object(self):
+        from django.core.files.storage import default_storage
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from library import activity
+        from library.models import Document, Folder
+
+        self.addCleanup(activity.flush)
+        folder = Folder.objects.create(creator=self.creator, name="Briefs")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api.post(
+                "/api/v6/documents/upload/",
+                {"folder_id": str(folder.id), "file": SimpleUploadedFile("old.pdf", self.payload)},
+                format="multipart",
+            )
+        existing = Document.objects.get(id=response.data["id"])
+        session = self.start()
+        self.send(session["upload"])
+        self.complete(session["id"])
+        stored_name = UploadSession.objects.get(id=session["id"]).storage_name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.api.post(
+                "/api/v6/documents/upload/", {"folder_id": str(folder.id), "upload_id": session["id"]}, format="json",
+            )
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(Document.objects.get(id=response.data["id"]).file.name, existing.file.name)
+        self.assertFalse(default_storage.exists(stored_name))
+
+    def test_target_rejects_tampering_and_wrong_sizes(self):
+        session = self.start()
+        target = dict(session["upload"], url=session["upload"]["url"] + "x")
+        self.assertEqual(self.send(target).status_code, 403)
+        self.assertEqual(self.send(session["upload"], body=self.payload[:-1]).status_code, 403)
+        self.assertEqual(self.send(session["upload"], body=self.payload + b"!").status_code, 403)
+        self.assertEqual(
+            self.api.put(f"/api/v9/uploads/{session['id']}/chunks/0/", self.payload,
+                         content_type="application/octet-stream").status_code,
+            400,
+        )
+
+    def test_target_is_single_use(self):
+        from django.core.files.storage import default_storage
+
+        session = self.start(sha256="")
+        self.assertEqual(self.send(session["upload"]).status_code, 204)
+        self.assertEqual(self.send(session["upload"], body=os.urandom(len(self.payload))).status_code, 403)
+        self.assertEqual(self.complete(session["id"]).status_code, 400)  # sha256 wasn't declared
+        self.assertEqual(self.api.post(f"/api/v9/uploads/{session['id']}/complete/", {}, format="json").status_code, 200)
+
+        stored_name = UploadSession.objects.get(id=session["id"]).storage_name
+        swapped = os.urandom(len(self.payload))
+        self.assertEqual(self.send(session["upload"], body=swapped).status_code, 403)
+        with default_storage.open(stored_name, "rb") as fh:
+            self.assertEqual(fh.read(), self.payload)
+
+        # An abandoned session's target can't re-create its file either
+        session = self.start()
+        self.api.delete(f"/api/v9/uploads/{session['id']}/")
+        self.assertEqual(self.send(session["upload"]).status_code, 403)
+
+    def test_expired_and_abandoned_uploads_are_deleted(self):
+        from django.core.files.storage import default_storage
+
+        session = self.start()
+        self.send(session["upload"])
+        stored_name = UploadSession.objects.get(id=session["id"]).storage_name
+        self.assertTrue(default_storage.exists(stored_name))
+        self.assertEqual(self.api.delete(f"/api/v9/uploads/{session['id']}/").status_code, 204)
+        self.assertFalse(default_storage.exists(stored_name))
+
+        session = self.start()
+        self.send(session["upload"])
+        stored_name = UploadSession.objects.get(id=session["id"]).storage_name
+        UploadSession.objects.filter(id=session["id"]).update(expires_at=timezone.now() - timedelta(minutes=1))
+        call_command("expire_upload_sessions", stdout=StringIO())
+        self.assertFalse(default_storage.exists(stored_name))
+
+    def test_declared_checksum_is_enforced_by_the_target(self):
+        session = self.start()
+        self.assertEqual(self.send(session["upload"], body=os.urandom(len(self.payload))).status_code, 403)
+        self.assertEqual(self.complete(session["id"]).status_code, 400)  # Nothing stored
+
+        wrong = self.api.post(f"/api/v9/uploads/{session['id']}/complete/", {"sha256": "0" * 64}, format="json")
+        self.assertEqual(wrong.status_code, 400)
+
+        # Undeclared: completed on size alone, with no digest taken on trust
+        session = self.start(sha256="")
+        self.send(session["upload"])
+        self.assertEqual(self.complete(session["id"]).status_code, 400)
+        response = self.api.post(f"/api/v9/uploads/{session['id']}/complete/", {}, format="json")
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data["sha256"], "")
+
+    def test_sizes_past_32_bits(self):
+        from . import direct
+
+        session, _ = direct.create(self.creator, "cut.mov", 5 * 1024 ** 3)
+        session.refresh_from_db()
+        self.assertEqual(session.chunk_size, 5 * 1024 ** 3)
+        self.assertEqual(session.chunk_count, 1)
+
+    def test_quota_is_checked_up_front(self):
+        from .models import StorageUsage
+
+        StorageUsage.objects.create(owner=self.creator, quota_bytes=100)
+        response = self.api.post(
+            "/api/v9/uploads/direct/", {"file_name": "big.mov", "total_size": 1000}, format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class DerivativeTest(TestCase):
+
+    def setUp(self):
+        from library.models import Folder
+
+        self.api = APIClient()
+        self.creator = User.objects.create_user(
+            email="creator@test.com",
+            full_name="Creator",
+            password="testpass123",
+            role="creator",
+        )
+        self.folder = Folder.objects.create(creator=self.creator, name="Designs")
+        self.api.force_authenticate(self.creator)
+
+    def png(self, size=(1600, 900), color=(200, 30, 30, 128)):
+        from io import BytesIO
+        from PIL import Image
+
+        buffer = BytesIO()
+        Image.new("RGBA", size, color).save(buffer, "PNG")
+        return buffer.getvalue()
+
+    def make(self, name, data):
+        from django.core.files.base import ContentFile
+        from library.models import Document
+
+        return Document.objects.create(
+            creator=self.creator, folder=self.folder, name=name, file=ContentFile(data, name=name),
+        )
+
+    def test_renders_sizes_and_exposes_urls(self):
+        from django.core.files.storage import default_storage
+        from PIL import Image
+        from . import derivatives
+
+        doc = self.make("hero.png", self.png())
+        self.assertEqual(doc.previews, {"source": doc.file.name})  # Pending
+        derivatives.generate("library.Document", doc.pk)
+        doc.refresh_from_db()
+
+        with default_storage.open(doc.previews["thumbnail"]) as fh:
+            self.assertEqual(Image.open(fh).size, (256, 144))
+        with default_storage.open(doc.previews["preview"]) as fh:
+            self.assertEqual(Image.open(fh).size, (1024, 576))
+
+        response = self.api.get("/api/v6/documents/")
+        self.assertTrue(response.data["results"][0]["thumbnail_url"].endswith(doc.previews["thumbnail"]))
+
+    def test_same_bytes_reuse_cached_derivatives(self):
+        from django.core.files.storage import default_storage
+        from . import derivatives
+
+        data = self.png(color=(10, 20, 30, 255))
+        first = self.make("a.png", data)
+        derivatives.generate("library.Document", first.pk)
+        second = self.make("b.png", data)
+        with mock.patch.object(default_storage, "save", wraps=default_storage.save) as save:
+            derivatives.generate("library.Document", second.pk)
+        save.assert_not_called()
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.previews["thumbnail"], second.previews["thumbnail"])
+
+    def test_new_file_resets_previews_and_others_are_unsupported(self):
+        from django.core.files.base import ContentFile
+        from . import derivatives
+
+        doc = self.make("logo.png", self.png())
+        derivatives.generate("library.Document", doc.pk)
+        doc.refresh_from_db()
+        doc.file = ContentFile(b"%PDF-1.4", name="logo.pdf")
+        doc.save()
+        doc.refresh_from_db()
+        self.assertNotIn("thumbnail", doc.previews)
+
+        derivatives.generate("library.Document", doc.pk)
+        doc.refresh_from_db()
+        self.assertTrue(doc.previews["unsupported"])
+        self.assertFalse(derivatives.pending(type(doc)).filter(pk=doc.pk).exists())
+
+    def test_deliverable_files_are_tracked(self):
+        from django.core.files.base import ContentFile
+        from project.models import Project, Task, Deliverable, DeliverableFile
+        from project.serializers import DeliverableFileSerializer
+        from . import derivatives
+
+        task = Task.objects.create(project=Project.objects.create(creator=self.creator, name="P"), name="T")
+        deliverable = Deliverable.objects.create(task=task, submitted_by=self.creator, title="D")
+        f = DeliverableFile.objects.create(
+            deliverable=deliverable, file=ContentFile(self.png(), name="mock.png"), name="mock.png",
+        )
+        self.assertIsNone(DeliverableFileSerializer(f).data["thumbnail_url"])
+        derivatives.generate("project.DeliverableFile", f.pk)
+        f.refresh_from_db()
+        self.assertIn("derivatives/", DeliverableFileSerializer(f).data["thumbnail_url"])
+
+
+@override_settings(LIBRARY_EXTRACTION_IN_BACKGROUND=False, DERIVATIVES_IN_BACKGROUND=False)
+class StorageQuotaTest(TestCase):
+
+    def setUp(self):
+        from library.models import Folder
+
+        self.api = APIClient()
+        self.creator = User.objects.create_user(
+            email="creator@test.com",
+            full_name="Creator",
+            password="testpass123",
+            role="creator",
+        )
+        self.folder = Folder.objects.create(creator=self.creator, name="Briefs")
+        self.api.force_authenticate(self.creator)
+
+    def usage(self):
+        return self.api.get("/api/v9/storage/usage/").data
+
+    def upload(self, name, size, url="/api/v6/documents/upload/"):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        return self.api.post(
+            url,
+            {"folder_id": str(self.folder.id), "file": SimpleUploadedFile(name, os.urandom(size))},
+            format="multipart",
+        )
+
+    def test_upload_reupload_and_permanent_delete(self):
+        from library.models import Document
+
+        self.assertEqual(self.upload("brief.pdf", 1000).status_code, 201)
+        self.assertEqual(self.usage()["library_bytes"], 1000)
+
+        doc = Document.objects.get(name="brief.pdf")
+        self.assertEqual(self.upload("x.pdf", 300, f"/api/v6/documents/{doc.id}/reupload/").status_code, 200)
+        self.assertEqual(self.upload("brief.pdf", 200).status_code, 201)  # Same name: archives a version
+        self.assertEqual(doc.versions.count(), 2)
+        self.assertEqual(self.usage()["library_bytes"], 1500)
+
+        self.api.delete(f"/api/v6/documents/{doc.id}/")
+        self.assertEqual(self.usage()["library_bytes"], 1500)  # Trash still counts
+        self.api.delete(f"/api/v6/documents/{doc.id}/permanent/")
+        self.assertEqual(self.usage()["used_bytes"], 0)
+
+    @override_settings(STORAGE_QUOTA_BYTES=1500)
+    def test_uploads_over_quota_are_rejected_before_storing(self):
+        from library.models import StoredBlob
+
+        self.assertEqual(self.upload("a.bin", 1000).status_code, 201)
+        response = self.upload("b.bin", 600)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("quota", response.data["error"])
+        self.assertEqual(StoredBlob.objects.count(), 1)
+
+        response = self.api.post(
+            "/api/v9/uploads/", {"file_name": "c.bin", "total_size": 600}, format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        usage = self.usage()
+        self.assertEqual((usage["quota_bytes"], usage["available_bytes"]), (1500, 500))
+
+    @override_settings(STORAGE_QUOTA_BYTES=1500)
+    def test_quota_check_locks_the_usage_row(self):
+        from django.db import transaction
+        from django.db.models import QuerySet
+        from . import quota
+        from .models import StorageUsage
+
+        lock = QuerySet.select_for_update
+        with mock.patch.object(QuerySet, "select_for_update", autospec=True, side_effect=lock) as locked, \
+                transaction.atomic():
+            quota.ensure_room(self.creator.id, 1000)
+        locked.assert_called()
+        # Created first, so there is always a row to lock
+        self.assertTrue(StorageUsage.objects.filter(owner=self.creator).exists())
+        with self.assertRaises(quota.QuotaExceeded):
+            quota.ensure_room(self.creator.id, 2000)
+
+    def test_project_files_count_against_the_project_creator(self):
+        from django.core.files.base import ContentFile
+        from project.models import Project, Task, Deliverable, DeliverableFile, TaskAttachment
+
+        talent = User.objects.create_user(
+            email="talent@test.com", full_name="Talent", password="testpass123", role="talent",
+        )
+        task = Task.objects.create(project=Project.objects.create(creator=self.creator, name="P"), name="T")
+        deliverable = Deliverable.objects.create(task=task, submitted_by=talent, title="D")
+        DeliverableFile.objects.create(
+            deliverable=deliverable, file=ContentFile(b"x" * 700, name="cut.mov"), name="cut.mov", size=700,
+        )
+        attachment = TaskAttachment.objects.create(
+            task=task, uploaded_by=talent, name="ref.txt", file=ContentFile(b"y" * 50, name="ref.txt"),
+        )
+        self.assertEqual(attachment.size, 50)
+        usage = self.usage()
+        self.assertEqual((usage["deliverable_bytes"], usage["attachment_bytes"]), (700, 50))
+
+        deliverable.delete()
+        self.assertEqual(self.usage()["deliverable_bytes"], 0)
+
+    def test_reconcile_corrects_drift(self):
+        from .models import StorageUsage
+
+        self.upload("a.bin", 1000)
+        StorageUsage.objects.filter(owner=self.creator).update(library_bytes=5, attachment_bytes=9)
+
+        out = StringIO()
+        call_command("reconcile_storage_usage", "--dry-run", stdout=out)
+        self.assertIn("Found drift for 1", out.getvalue())
+        self.assertEqual(self.usage()["library_bytes"], 5)
+
+        call_command("reconcile_storage_usage", stdout=StringIO())
+        usage = self.usage()
+        self.assertEqual((usage["library_bytes"], usage["attachment_bytes"]), (1000, 0))
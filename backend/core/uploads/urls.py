@@ -0,0 +1,12 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("uploads/", views.UploadSessionCreateView.as_view(), name="upload-session-create"),
+    path("uploads/direct/", views.DirectUploadCreateView.as_view(), name="upload-direct-create"),
+    path("uploads/direct/receive/", views.DirectUploadReceiveView.as_view(), name="upload-direct-receive"),
+    path("uploads/<uuid:pk>/", views.UploadSessionDetailView.as_view(), name="upload-session-detail"),
+    path("uploads/<uuid:pk>/chunks/<int:index>/", views.UploadChunkView.as_view(), name="upload-chunk"),
+    path("uploads/<uuid:pk>/complete/", views.UploadCompleteView.as_view(), name="upload-session-complete"),
+    path("storage/usage/", views.StorageUsageView.as_view(), name="storage-usage"),
+]
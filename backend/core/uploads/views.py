@@ -0,0 +1,211 @@
+"""
+Uploads views — resumable chunked uploads for large files.
+
+Flow: create a session, PUT each chunk (any order; retry or resume by
+checking received_chunks), then complete it. The returned id is then
+passed as upload_id (or upload_ids) to the library, deliverable, task
+attachment or portal message endpoints instead of a multipart file.
+
+Direct uploads skip the app server: create one at uploads/direct/, send
+the file to the returned signed target, then complete it the same way
+(see uploads.direct).
+
+Storage usage against the creator's quota is reported at storage/usage/.
+"""
+import io
+import re
+
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from utils.storage import DirectUploadRejected
+from . import direct, quota, services
+from .models import UploadSession
+from .serializers import (
+    UploadSessionCreateSerializer,
+    DirectUploadCreateSerializer,
+    UploadSessionSerializer,
+    UploadCompleteSerializer,
+    StorageUsageSerializer,
+)
+
+_CONTENT_RANGE_RE = re.compile(r"^bytes (\d+)-(\d+)/(\d+|\*)$")
+
+
+def _get_session(request, pk):
+    try:
+        return UploadSession.objects.get(id=pk, owner=request.user)
+    except UploadSession.DoesNotExist:
+        return None
+
+
+class UploadSessionCreateView(APIView):
+    """
+    POST /api/v9/uploads/
+    Start a chunked upload: {file_name, total_size, content_type?, chunk_size?}.
+    A creator's upload is refused up front if it cannot fit in their quota.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = UploadSessionCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        if request.user.role == "creator":
+            try:
+                quota.ensure_room(request.user.id, serializer.validated_data["total_size"])
+            except quota.QuotaExceeded as exc:
+                return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        session = services.create_session(request.user, **serializer.validated_data)
+        return Response(UploadSessionSerializer(session).data, status=status.HTTP_201_CREATED)
+
+
+class DirectUploadCreateView(APIView):
+    """
+    POST /api/v9/uploads/direct/
+    Start a direct upload: {file_name, total_size, content_type?, sha256?}.
+    A declared sha256 is signed into the target (see uploads.direct). Returns
+    the session plus "upload": {method, url, headers, fields}, a signed
+    target valid for a few minutes. Send the file there (as the body of a
+    PUT, or as "file" in a multipart POST with the fields), then complete.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = DirectUploadCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            if request.user.role == "creator":
+                quota.ensure_room(request.user.id, serializer.validated_data["total_size"])
+            session, target = direct.create(request.user, **serializer.validated_data)
+        except services.UploadError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        target["url"] = request.build_absolute_uri(target["url"])
+        return Response(
+            {**UploadSessionSerializer(session).data, "upload": target},
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class DirectUploadReceiveView(APIView):
+    """
+    PUT /api/v9/uploads/direct/receive/?token=...
+    The signed target LocalMediaStorage issues, standing in for an object
+    store: the token authorizes writing the body to its file once, while
+    its upload session is still UPLOADING.
+    """
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+
+    def put(self, request):
+        from django.core.files.storage import default_storage
+
+        if not hasattr(default_storage, "receive_upload"):
+            return Response({"error": "Upload not found"}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            default_storage.receive_upload(
+                request.query_params.get("token", ""),
+                request.stream or io.BytesIO(),
+                accept=lambda name: UploadSession.objects.filter(storage_name=name, status="UPLOADING").exists(),
+            )
+        except DirectUploadRejected as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_403_FORBIDDEN)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadSessionDetailView(APIView):
+    """
+    GET    /api/v9/uploads/<id>/  — Session state, including received chunks
+    DELETE /api/v9/uploads/<id>/  — Abandon the upload and discard its bytes
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        session = _get_session(request, pk)
+        if session is None:
+            return Response({"error": "Upload not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(UploadSessionSerializer(session).data)
+
+    def delete(self, request, pk):
+        session = _get_session(request, pk)
+        if session is None:
+            return Response({"error": "Upload not found"}, status=status.HTTP_404_NOT_FOUND)
+        session.delete()
+        services.discard_spool(pk)
+        direct.discard(session)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadChunkView(APIView):
+    """
+    PUT /api/v9/uploads/<id>/chunks/<index>/
+    Raw chunk bytes as the request body. The offset may be given as
+    Content-Range: bytes <start>-<end>/<total> or ?offset=, and is checked.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def put(self, request, pk, index):
+        session = _get_session(request, pk)
+        if session is None:
+            return Response({"error": "Upload not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        offset = request.query_params.get("offset")
+        content_range = request.headers.get("Content-Range")
+        if content_range:
+            match = _CONTENT_RANGE_RE.match(content_range.strip())
+            if not match:
+                return Response({"error": "Malformed Content-Range header"}, status=status.HTTP_400_BAD_REQUEST)
+            offset = match.group(1)
+        try:
+            offset = int(offset) if offset is not None else None
+        except ValueError:
+            return Response({"error": "offset must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Read the body as a stream; request.data would buffer it
+        try:
+            size = services.write_chunk(session, index, request.stream or io.BytesIO(), offset=offset)
+        except services.UploadError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            "index": index,
+            "size": size,
+            "received": session.chunks.count(),
+            "chunk_count": session.chunk_count,
+        })
+
+
+class UploadCompleteView(APIView):
+    """
+    POST /api/v9/uploads/<id>/complete/
+    Finish the upload once every chunk has arrived (or, for a direct
+    upload, once the file is in storage). Optional {sha256} is checked
+    against the assembled file, or for a direct upload against the one
+    declared when it started.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk):
+        session = _get_session(request, pk)
+        if session is None:
+            return Response({"error": "Upload not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        serializer = UploadCompleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            complete = direct.complete if session.is_direct else services.complete_session
+            session = complete(session, serializer.validated_data["sha256"])
+        except services.UploadError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(UploadSessionSerializer(session).data)
+
+
+class StorageUsageView(APIView):
+    """
+    GET /api/v9/storage/usage/
+    Bytes stored in the user's workspace by category, with their quota.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response(StorageUsageSerializer(quota.usage_for(request.user.id)).data)
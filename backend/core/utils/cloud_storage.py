@@ -0,0 +1,43 @@
+"""
+Cloudinary media storage with direct uploads.
+
+Selected by MEDIA_STORAGE_BACKEND=cloudinary. Presigned targets are
+Cloudinary's signed upload form: the client POSTs the file with the
+returned fields to the upload API, under the public id the server chose
+(which is also the file's name in storage).
+Cloudinary accepts a signature for an hour from its timestamp, so the
+target outlives expires_in by at most that much; the upload session
+still has to be completed before it expires.
+The signature covers overwrite=false, so a target is single-use: once
+the file is stored, uploading to it again cannot replace the bytes.
+Cloudinary does not check a declared SHA-256, so uploads here are
+completed on their reported size alone (verifies_upload_sha256 is off).
+"""
+import time
+
+import cloudinary
+import cloudinary.utils
+from cloudinary_storage.storage import MediaCloudinaryStorage
+
+from .storage import DirectUploadMixin
+
+
+class DirectCloudinaryStorage(DirectUploadMixin, MediaCloudinaryStorage):
+
+    def presign_upload(self, name, content_type, size, expires_in, sha256=""):
+        params = {
+            "public_id": self._prepend_prefix(self._normalise_name(name)),
+            "overwrite": "false",  # Signed as sent in the form
+            "tags": self.TAG,
+            "timestamp": int(time.time()),
+        }
+        config = cloudinary.config()
+        params["signature"] = cloudinary.utils.api_sign_request(params, config.api_secret)
+        params["api_key"] = config.api_key
+        return {
+            "name": params["public_id"],
+            "method": "POST",
+            "url": cloudinary.utils.cloudinary_api_url("upload", resource_type=self._get_resource_type(name)),
+            "headers": {},
+            "fields": params,
+        }
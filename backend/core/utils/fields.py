@@ -0,0 +1,105 @@
+"""
+Model fields shared across apps.
+
+CompressedJSONField is a JSONField whose value is stored as bytes: one
+version byte, then the compact JSON text — zlib-compressed (FORMAT_ZLIB)
+once it reaches COMPRESS_MIN_BYTES and compression actually shrinks it,
+raw (FORMAT_RAW) otherwise, since small payloads gain nothing and still
+pay the CPU. Reads check the version byte, so the threshold can change
+and new formats can be added without rewriting existing rows.
+
+Values are opaque to the database: JSON lookups and icontains on the
+column don't work, so anything that searches the content keeps its own
+plain-text copy (e.g. Doc.search_text). Existing JSON columns are
+converted with copy_json_column() in a data migration; see
+docs/migrations/0003_compress_content.py for the pattern.
+"""
+import json
+import zlib
+
+from django.conf import settings
+from django.db import models
+
+FORMAT_RAW = 0
+FORMAT_ZLIB = 1
+
+COMPRESS_MIN_BYTES = getattr(settings, "COMPRESSED_JSON_MIN_BYTES", 1024)
+COMPRESS_LEVEL = getattr(settings, "COMPRESSED_JSON_LEVEL", 6)
+
+
+def pack(value, encoder=None, min_bytes=None):
+    """Stored bytes for a JSON-serializable value."""
+    data = json.dumps(value, cls=encoder, separators=(",", ":"), ensure_ascii=False).encode()
+    if len(data) >= (COMPRESS_MIN_BYTES if min_bytes is None else min_bytes):
+        compressed = zlib.compress(data, COMPRESS_LEVEL)
+        if len(compressed) < len(data):
+            return bytes([FORMAT_ZLIB]) + compressed
+    return bytes([FORMAT_RAW]) + data
+
+
+def unpack(raw, decoder=None):
+    """The value stored by pack()."""
+    raw = bytes(raw)
+    if not raw:
+        raise ValueError("Empty compressed JSON value")
+    fmt, body = raw[0], raw[1:]
+    if fmt == FORMAT_ZLIB:
+        body = zlib.decompress(body)
+    elif fmt != FORMAT_RAW:
+        raise ValueError(f"Unknown compressed JSON format {fmt}")
+    return json.loads(body, cls=decoder)
+
+
+class CompressedJSONField(models.JSONField):
+    """JSONField stored as version-tagged, optionally zlib-compressed bytes (see module docstring)."""
+
+    description = "A JSON object, compressed when large"
+
+    def get_internal_type(self):
+        return "BinaryField"
+
+    def db_check(self, connection):
+        return None  # No JSON_VALID-style constraint on a binary column
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        return unpack(value, self.decoder)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if hasattr(value, "as_sql"):
+            return value
+        if not prepared:
+            value = self.get_prep_value(value)
+        if value is None and self.null:
+            return None
+        return connection.Database.Binary(pack(value, self.encoder))
+
+    def get_db_prep_save(self, value, connection):
+        return self.get_db_prep_value(value, connection)
+
+
+def copy_json_column(apps, app_label, model_name, source, target, batch_size=500, extra=None):
+    """
+    Copy every row's `source` value into `target` in primary-key batches,
+    for data migrations that swap a JSON column for a CompressedJSONField
+    (or back). extra(value), if given, returns other fields to set on the
+    row from the same value. Returns the number of rows copied.
+    """
+    Model = apps.get_model(app_label, model_name)
+    copied, last_pk = 0, None
+    while True:
+        qs = Model.objects.order_by("pk")
+        if last_pk is not None:
+            qs = qs.filter(pk__gt=last_pk)
+        rows = list(qs.values_list("pk", source)[:batch_size])
+        if not rows:
+            return copied
+        batch, fields = [], {target}
+        for pk, value in rows:
+            updates = {target: value, **(extra(value) if extra else {})}
+            fields.update(updates)
+            batch.append(Model(pk=pk, **updates))
+        Model.objects.bulk_update(batch, sorted(fields))
+        copied += len(batch)
+        last_pk = rows[-1][0]
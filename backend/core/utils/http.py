@@ -0,0 +1,29 @@
+"""
+Conditional-GET helpers for API views that serve cacheable payloads.
+"""
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def etag_matches(request, etag: str) -> bool:
+    """True if the request's If-None-Match header already names this ETag."""
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    tags = parse_etags(header)
+    return "*" in tags or quote_etag(etag) in tags
+
+
+def conditional_response(request, etag: str, data, cache_control="private, no-cache", **kwargs):
+    """
+    Return a 304 if the client already holds this version, otherwise a
+    Response carrying the data, with ETag and Cache-Control set on both.
+    """
+    if etag_matches(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data, **kwargs)
+    response["ETag"] = quote_etag(etag)
+    response["Cache-Control"] = cache_control
+    return response
@@ -0,0 +1,43 @@
+"""
+Keyset (cursor) pagination helpers shared by list endpoints.
+
+A cursor is an opaque, URL-safe token wrapping the sort key of the last
+row on the previous page, e.g. ``(created_at, id)``. Clients pass it back
+verbatim; they never build or parse it themselves.
+"""
+import base64
+import json
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor that cannot be decoded."""
+
+
+def encode_cursor(*values) -> str:
+    """Pack sort-key values (datetimes, UUIDs, numbers) into an opaque token."""
+    payload = json.dumps(
+        [v.isoformat() if hasattr(v, "isoformat") else str(v) if v is not None else None for v in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, size: int) -> list:
+    """Unpack a token produced by encode_cursor into its raw string values."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise InvalidCursor("Invalid cursor") from exc
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor("Invalid cursor")
+    return values
+
+
+def parse_limit(raw, default=50, maximum=100) -> int:
+    """Clamp a ?limit= query param to [1, maximum], falling back to default."""
+    try:
+        limit = int(raw) if raw is not None else default
+    except (TypeError, ValueError):
+        limit = default
+    return max(1, min(limit, maximum))
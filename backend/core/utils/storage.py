@@ -0,0 +1,260 @@
+"""
+Local media storage and file delivery.
+
+LocalMediaStorage is the filesystem backend selected by
+MEDIA_STORAGE_BACKEND=local (see core.settings). Besides storing files
+under MEDIA_ROOT it knows how to serve them:
+  - MEDIA_OFFLOAD="x-sendfile": hand the absolute path to Apache/lighttpd
+    in an X-Sendfile header;
+  - MEDIA_OFFLOAD="x-accel-redirect": hand nginx an internal URI,
+    MEDIA_ACCEL_PREFIX + name, in X-Accel-Redirect;
+  - otherwise stream it from Python through a read-only memory map, one
+    chunk at a time, honouring a single HTTP Range (206/416) so video
+    players can seek.
+The front server handles ranges itself when the file is offloaded.
+
+serve_file() is what download views call: it uses the backend's serve()
+when there is one and otherwise streams the file from the storage API,
+so nothing is ever read into memory whole.
+
+Backends that take direct uploads (see uploads.direct) implement
+presign_upload(name, content_type, size, expires_in, sha256=""), returning
+the signed target a client sends the file to as {name, method, url,
+headers, fields} (name being where the file will be stored), and
+include DirectUploadMixin so a file already uploaded that way is
+adopted in place when a model saves it, rather than copied. LocalMediaStorage is its own stand-in for
+an object store: its targets point at a signed PUT endpoint of this app,
+handled by receive_upload(). A backend whose targets refuse bytes that
+don't match the declared sha256 sets verifies_upload_sha256, so the
+digest can be trusted without reading the file back.
+"""
+import hashlib
+import mimetypes
+import mmap
+import os
+import re
+import tempfile
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import FileSystemStorage
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.http import content_disposition_header, http_date, parse_etags, parse_http_date_safe, quote_etag
+
+CHUNK_SIZE = 512 * 1024
+_UPLOAD_SALT = "utils.storage.direct-upload"
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single-range Range header, None to send
+    the whole file (no header, multiple ranges, or a unit we don't speak),
+    or False if the range cannot be satisfied.
+    """
+    if not header:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:  # Suffix: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _mmap_chunks(path, start, end, chunk_size=CHUNK_SIZE):
+    """Yield bytes start..end (inclusive) of a file through a read-only memory map."""
+    if end < start:
+        return
+    with open(path, "rb") as fh:
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            position = start
+            while position <= end:
+                stop = min(position + chunk_size, end + 1)
+                yield mapped[position:stop]
+                position = stop
+
+
+def _disposition(response, filename, as_attachment):
+    if filename or as_attachment:
+        response["Content-Disposition"] = content_disposition_header(as_attachment, filename or "")
+
+
+class DirectUploadRejected(ValueError):
+    """A direct upload the storage refused; the message is safe to show clients."""
+
+
+class DirectUploadMixin:
+    """
+    Adopt files that are already in this storage. Saving a field from
+    content with a stored_name (uploads.direct.StoredUpload) records that
+    name instead of writing the bytes again.
+    """
+    verifies_upload_sha256 = False
+
+    def _save(self, name, content):
+        stored_name = getattr(content, "stored_name", None)
+        if stored_name:
+            content.adopted = True
+            return stored_name
+        return super()._save(name, content)
+
+
+class LocalMediaStorage(DirectUploadMixin, FileSystemStorage):
+    """FileSystemStorage that can also deliver its files efficiently (see module docstring)."""
+    verifies_upload_sha256 = True  # receive_upload() hashes the body as it writes it
+
+    def __init__(self, *args, offload=None, accel_prefix=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.offload = offload if offload is not None else getattr(settings, "MEDIA_OFFLOAD", "")
+        self.accel_prefix = accel_prefix if accel_prefix is not None else getattr(
+            settings, "MEDIA_ACCEL_PREFIX", "/protected-media/",
+        )
+
+    def serve(self, request, name, filename=None, as_attachment=True, content_type=None):
+        path = self.path(name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        content_type = content_type or mimetypes.guess_type(filename or name)[0] or "application/octet-stream"
+
+        if self.offload in ("x-sendfile", "x-accel-redirect"):
+            response = HttpResponse(content_type=content_type)
+            if self.offload == "x-sendfile":
+                response["X-Sendfile"] = path
+            else:
+                response["X-Accel-Redirect"] = self.accel_prefix.rstrip("/") + "/" + name.lstrip("/")
+            _disposition(response, filename, as_attachment)
+            return response
+
+        size = stat.st_size
+        etag = quote_etag(f"{stat.st_mtime_ns:x}-{size:x}")
+        last_modified = http_date(stat.st_mtime)
+
+        byte_range = parse_range(request.headers.get("Range"), size)
+        if byte_range is not None and not self._if_range_matches(request, etag, stat.st_mtime):
+            byte_range = None  # The client's partial copy is stale; send it all
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+        start, end = byte_range or (0, size - 1)
+        response = StreamingHttpResponse(
+            _mmap_chunks(path, start, end),
+            status=206 if byte_range else 200,
+            content_type=content_type,
+        )
+        response["Content-Length"] = str(end - start + 1 if size else 0)
+        if byte_range:
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Accept-Ranges"] = "bytes"
+        response["ETag"] = etag
+        response["Last-Modified"] = last_modified
+        _disposition(response, filename, as_attachment)
+        return response
+
+    def presign_upload(self, name, content_type, size, expires_in, sha256=""):
+        token = signing.dumps(
+            {"n": name, "s": size, "e": int(time.time()) + expires_in, "h": sha256}, salt=_UPLOAD_SALT,
+        )
+        return {
+            "name": name,
+            "method": "PUT",
+            "url": f"{reverse('upload-direct-receive')}?token={token}",
+            "headers": {"Content-Type": content_type or "application/octet-stream"},
+            "fields": {},
+        }
+
+    def receive_upload(self, token, stream, accept=None):
+        """
+        Write a request body to the name a presigned target was issued for.
+        The bytes go to a temporary file beside it and are linked into place
+        only if exactly the signed size (and digest, if one was signed)
+        arrived. A target is single-use: the name is never overwritten once
+        it exists, and accept(name), if given, can refuse it (e.g. once its
+        upload session has moved on). Returns the stored name.
+        """
+        try:
+            claims = signing.loads(token, salt=_UPLOAD_SALT)
+        except signing.BadSignature:
+            raise DirectUploadRejected("Invalid upload link")
+        if claims["e"] <= time.time():
+            raise DirectUploadRejected("This upload link has expired")
+
+        name, size, digest = claims["n"], claims["s"], claims.get("h")
+        if accept is not None and not accept(name):
+            raise DirectUploadRejected("This upload link is no longer valid")
+        hasher = hashlib.sha256()
+        path = self.path(name)
+        if os.path.exists(path):
+            raise DirectUploadRejected("This upload link has already been used")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, partial = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+        try:
+            written = 0
+            with os.fdopen(fd, "wb") as out:
+                while written <= size:
+                    data = stream.read(min(CHUNK_SIZE, size + 1 - written))
+                    if not data:
+                        break
+                    out.write(data)
+                    hasher.update(data)
+                    written += len(data)
+            if written != size:
+                raise DirectUploadRejected(f"Expected exactly {size} bytes")
+            if digest and hasher.hexdigest() != digest:
+                raise DirectUploadRejected("Checksum does not match the uploaded bytes")
+            if self.file_permissions_mode is not None:
+                os.chmod(partial, self.file_permissions_mode)
+            try:
+                os.link(partial, path)  # Fails, unlike a rename, if the name exists meanwhile
+            except FileExistsError:
+                raise DirectUploadRejected("This upload link has already been used")
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+        return name
+
+    @staticmethod
+    def _if_range_matches(request, etag, mtime):
+        header = request.headers.get("If-Range")
+        if not header:
+            return True
+        if header.startswith(('"', "W/")):
+            return etag in parse_etags(header)
+        since = parse_http_date_safe(header)
+        return since is not None and int(mtime) <= since
+
+
+def serve_file(request, storage, name, filename=None, as_attachment=True, content_type=None):
+    """
+    Response delivering the stored file `name` without buffering it, or
+    None if it is missing from storage.
+    """
+    if not name:
+        return None
+    if hasattr(storage, "serve"):
+        return storage.serve(request, name, filename, as_attachment, content_type)
+    try:
+        handle = storage.open(name, "rb")
+    except (FileNotFoundError, OSError):
+        return None
+    response = FileResponse(handle, as_attachment=as_attachment, filename=filename or os.path.basename(name))
+    if content_type:
+        response["Content-Type"] = content_type
+    return response
@@ -5,7 +5,9 @@ import "@blocknote/core/fonts/inter.css";
 import "@blocknote/shadcn/style.css";
 import { useTheme } from "next-themes";
 import { cn } from "@/lib/utils";
-import { saveDoc } from "@/hooks/useDocs";
+import { fetchDoc, patchDocBlocks, saveDoc } from "@/hooks/useDocs";
+import { diffBlocks, mergeBlocks } from "@/lib/blockDiff";
+import { toast } from "sonner";
 import type { DocDetail } from "@/hooks/useDocs";
 import {
   Check,
@@ -42,6 +44,11 @@ export function DocEditor({ doc, onTitleChange, onToggleSidebar }: DocEditorProp
   const [shareOpen, setShareOpen] = useState(false);
   const debounceRef = useRef<ReturnType<typeof setTimeout>>();
   const titleDebounceRef = useRef<ReturnType<typeof setTimeout>>();
+  const contentDebounceRef = useRef<ReturnType<typeof setTimeout>>();
+  // Content as the server last stored it, and the revision it is at
+  const savedContentRef = useRef<object[]>(doc.content ?? []);
+  const revisionRef = useRef(doc.revision);
+  const contentSaveRef = useRef<Promise<void>>(Promise.resolve());
 
   const readOnly = doc.user_role === "viewer";
 
@@ -80,10 +87,77 @@ export function DocEditor({ doc, onTitleChange, onToggleSidebar }: DocEditorProp
     [doc.id, readOnly],
   );
 
+  useEffect(() => {
+    savedContentRef.current = doc.content ?? [];
+    revisionRef.current = doc.revision;
+  }, [doc.id]); // eslint-disable-line react-hooks/exhaustive-deps
+
+  // Sends only the blocks that changed. If the server has moved on (someone
+  // else edited blocks we touched), our changes are merged onto its latest
+  // content — theirs win where both edited a block — and sent again, so a
+  // concurrent edit is never overwritten.
+  const saveContent = useCallback(async () => {
+    const snapshot = () => JSON.parse(JSON.stringify(editor.document)) as object[];
+    const edited = snapshot();
+    let base = savedContentRef.current;
+    let content = edited;
+    let revision = revisionRef.current;
+    let saved = false;
+    const conflicts = new Set<string>();
+
+    for (let attempt = 0; attempt < 3 && !saved; attempt++) {
+      const ops = diffBlocks(base, content);
+      const result = ops.length
+        ? await patchDocBlocks(doc.id, revision, ops)
+        : ({ status: "saved", revision } as const);
+
+      if (result.status === "saved") {
+        savedContentRef.current = content;
+        revisionRef.current = result.revision;
+        saved = true;
+        break;
+      }
+      const latest = result.status === "conflict" ? result : await fetchDoc(doc.id);
+      if (!latest) break;
+      const merged = mergeBlocks(base, content, latest.content);
+      merged.conflicts.forEach((id) => conflicts.add(id));
+      base = latest.content;
+      revision = latest.revision;
+      content = merged.blocks;
+      // What the server holds, so the next save diffs against it
+      savedContentRef.current = base;
+      revisionRef.current = revision;
+    }
+
+    if (content !== edited) {
+      // Show the merged content, keeping anything typed since the save began
+      const current = snapshot();
+      const { blocks } = mergeBlocks(edited, content, current);
+      if (JSON.stringify(blocks) !== JSON.stringify(current)) {
+        // eslint-disable-next-line @typescript-eslint/no-explicit-any
+        editor.replaceBlocks(editor.document, blocks as any);
+      }
+    }
+    if (conflicts.size) {
+      toast.warning("Someone else edited this page at the same time — their changes to the same blocks were kept.");
+    }
+    if (saved) {
+      setSaveState("saved");
+      setTimeout(() => setSaveState("idle"), 2000);
+    } else {
+      setSaveState("idle");
+    }
+  }, [doc.id, editor]);
+
   const handleEditorChange = useCallback(() => {
     if (readOnly) return;
-    triggerSave({ content: editor.document as object[] });
-  }, [editor, triggerSave, readOnly]);
+    clearTimeout(contentDebounceRef.current);
+    setSaveState("saving");
+    contentDebounceRef.current = setTimeout(() => {
+      // One content save in flight at a time, so each diffs against the last
+      contentSaveRef.current = contentSaveRef.current.then(saveContent);
+    }, 1500);
+  }, [saveContent, readOnly]);
 
   const handleTitleChange = useCallback(
     (e: React.ChangeEvent<HTMLInputElement>) => {
@@ -26,8 +26,17 @@ export interface DocDetail {
   created_at: string;
   updated_at: string;
   user_role: "owner" | "editor" | "viewer";
+  revision: number;
 }
 
+// One edit for PATCH /api/v8/docs/<id>/blocks/; blocks are addressed by id,
+// parent null is the top level and after null means first among siblings.
+export type BlockOp =
+  | { op: "insert"; block: object; parent?: string | null; after: string | null }
+  | { op: "update"; id: string; block: { type?: string; props?: unknown; content?: unknown; children?: unknown } }
+  | { op: "delete"; id: string }
+  | { op: "move"; id: string; parent?: string | null; after: string | null };
+
 // ── Share / Access types ──────────────────────────────────────────────────────
 
 export interface DocAccessUser {
@@ -150,6 +159,36 @@ export async function saveDoc(id: string, patch: Partial<Omit<DocDetail, "id" |
   }
 }
 
+export type BlockPatchResult =
+  | { status: "saved"; revision: number }
+  | { status: "conflict"; revision: number; content: object[] }
+  | { status: "failed" };
+
+// Applies block ops on top of `baseRevision`. A "conflict" carries the
+// server's current revision and content (someone else changed blocks the
+// ops touch); "failed" is anything else, e.g. an op the server refused.
+export async function patchDocBlocks(
+  id: string,
+  baseRevision: number,
+  ops: BlockOp[],
+): Promise<BlockPatchResult> {
+  try {
+    const res = await secureFetch(`/api/v8/docs/${id}/blocks/`, {
+      method: "PATCH",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ base_revision: baseRevision, ops }),
+    });
+    if (res.ok) return { status: "saved", revision: (await res.json()).revision };
+    if (res.status === 409) {
+      const body = await res.json();
+      return { status: "conflict", revision: body.revision, content: body.content };
+    }
+    return { status: "failed" };
+  } catch {
+    return { status: "failed" };
+  }
+}
+
 export async function fetchDocChildren(id: string): Promise<DocListItem[]> {
   try {
     const res = await secureFetch(`/api/v8/docs/${id}/children/`);
@@ -0,0 +1,109 @@
+import type { BlockOp } from "@/hooks/useDocs";
+
+// Minimal BlockNote block shape the diff needs; everything else rides along.
+interface Block {
+  id: string;
+  type?: string;
+  props?: unknown;
+  content?: unknown;
+  children?: unknown;
+}
+
+/**
+ * Block operations that turn `prev` into `next` for the docs block patch
+ * endpoint (PATCH /api/v8/docs/<id>/blocks/). Top-level blocks are matched
+ * by id: removed ones are deleted, new ones inserted after their
+ * predecessor, reordered ones moved, and changed ones updated whole
+ * (children included), so a typical keystroke autosave is one small update.
+ */
+export function diffBlocks(prev: object[], next: object[]): BlockOp[] {
+  const before = prev as Block[];
+  const after = next as Block[];
+  const prevById = new Map(before.map((block) => [block.id, block]));
+  const nextIds = new Set(after.map((block) => block.id));
+  const ops: BlockOp[] = [];
+
+  // Simulated top-level order on the server as operations are applied
+  const current: string[] = [];
+  for (const block of before) {
+    if (nextIds.has(block.id)) current.push(block.id);
+    else ops.push({ op: "delete", id: block.id });
+  }
+
+  after.forEach((block, i) => {
+    const anchor = i === 0 ? null : after[i - 1].id;
+    const place = () => current.splice(anchor === null ? 0 : current.indexOf(anchor) + 1, 0, block.id);
+    const old = prevById.get(block.id);
+
+    if (!old) {
+      ops.push({ op: "insert", block, parent: null, after: anchor });
+      place();
+      return;
+    }
+    const at = current.indexOf(block.id);
+    if ((at === 0 ? null : current[at - 1]) !== anchor) {
+      ops.push({ op: "move", id: block.id, parent: null, after: anchor });
+      current.splice(at, 1);
+      place();
+    }
+    if (JSON.stringify(old) !== JSON.stringify(block)) {
+      const { type, props, content, children } = block;
+      ops.push({ op: "update", id: block.id, block: { type, props, content, children } });
+    }
+  });
+  return ops;
+}
+
+/**
+ * Three-way merge of top-level blocks: the changes `mine` made to `base`,
+ * replayed onto `theirs`. A block both sides changed (or that one side
+ * removed) keeps its `theirs` version and is listed in `conflicts`, so a
+ * concurrent edit is never overwritten. Blocks are placed after the
+ * nearest block that precedes them in `mine`.
+ */
+export function mergeBlocks(
+  base: object[],
+  mine: object[],
+  theirs: object[],
+): { blocks: object[]; conflicts: string[] } {
+  const baseJson = new Map((base as Block[]).map((block) => [block.id, JSON.stringify(block)]));
+  const theirJson = new Map((theirs as Block[]).map((block) => [block.id, JSON.stringify(block)]));
+  const changedByThem = (id: string) => baseJson.get(id) !== theirJson.get(id);
+  const mineBlocks = mine as Block[];
+  const merged = [...(theirs as Block[])];
+  const conflicts: string[] = [];
+
+  const indexOf = (id: string) => merged.findIndex((block) => block.id === id);
+  const place = (block: Block) => {
+    let at = 0;
+    for (let i = mineBlocks.findIndex((b) => b.id === block.id) - 1; i >= 0; i--) {
+      const found = indexOf(mineBlocks[i].id);
+      if (found !== -1) {
+        at = found + 1;
+        break;
+      }
+    }
+    merged.splice(at, 0, block);
+  };
+
+  for (const op of diffBlocks(base, mine)) {
+    if (op.op === "insert") {
+      if (indexOf((op.block as Block).id) === -1) place(op.block as Block);
+    } else if (op.op === "move") {
+      const at = indexOf(op.id);
+      if (at === -1) {
+        conflicts.push(op.id); // They removed it
+        continue;
+      }
+      const [block] = merged.splice(at, 1);
+      place(block);
+    } else if (changedByThem(op.id)) {
+      conflicts.push(op.id);
+    } else if (op.op === "delete") {
+      merged.splice(indexOf(op.id), 1);
+    } else {
+      merged[indexOf(op.id)] = mineBlocks.find((block) => block.id === op.id)!;
+    }
+  }
+  return { blocks: merged, conflicts };
+}
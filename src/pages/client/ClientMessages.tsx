@@ -37,6 +37,7 @@ export default function ClientMessages() {
   const [content, setContent] = useState("");
   const [file, setFile] = useState<File | null>(null);
   const [hasMore, setHasMore] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
 
   useEffect(() => {
     loadMessages();
@@ -58,6 +59,7 @@ export default function ClientMessages() {
         const data = await response.json();
         setMessages(data.messages || []);
         setHasMore(!!data.has_more);
+        setNextCursor(data.next_cursor || null);
         markMessagesRead();
       } else if (response.status === 403) {
         toast.error("You don't have access to this project");
@@ -95,15 +97,16 @@ export default function ClientMessages() {
   };
 
   const loadOlderMessages = async () => {
-    if (!hasMore || messages.length === 0) return;
+    if (!hasMore || !nextCursor) return;
     try {
       const response = await secureFetch(
-        `/api/v5/projects/${projectId}/messages/?before=${messages[0].id}&limit=50`
+        `/api/v5/projects/${projectId}/messages/?cursor=${encodeURIComponent(nextCursor)}&limit=50`
       );
       if (response.ok) {
         const data = await response.json();
         setMessages((prev) => [...(data.messages || []), ...prev]);
         setHasMore(!!data.has_more);
+        setNextCursor(data.next_cursor || null);
       }
     } catch {
       toast.error("Failed to load older messages");
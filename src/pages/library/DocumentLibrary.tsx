@@ -49,7 +49,7 @@ import {
   Table2,
 } from "lucide-react";
 import { format, formatDistanceToNow } from "date-fns";
-import type { LibraryDocument } from "@/types/library";
+import type { DocumentPage, LibraryDocument, LibraryDocumentListItem } from "@/types/library";
 import type { DocListItem } from "@/hooks/useDocs";
 
 // ── Unified item type ─────────────────────────────────────────────────────────
@@ -70,7 +70,7 @@ interface UnifiedItem {
   folderName?: string;
 }
 
-function fileToUnified(d: LibraryDocument): UnifiedItem {
+function fileToUnified(d: LibraryDocumentListItem): UnifiedItem {
   return {
     kind: "file",
     id: d.id,
@@ -396,11 +396,17 @@ export default function DocumentLibrary() {
 
   const loadFiles = useCallback(async () => {
     try {
-      const res = await secureFetch("/api/v6/documents/");
-      if (res.ok) {
-        const data: LibraryDocument[] = await res.json();
-        setFiles(data.map(fileToUnified));
-      }
+      const all: LibraryDocumentListItem[] = [];
+      let cursor: string | null = null;
+      do {
+        const query = cursor ? `&cursor=${encodeURIComponent(cursor)}` : "";
+        const res = await secureFetch(`/api/v6/documents/?limit=100${query}`);
+        if (!res.ok) return;
+        const data: DocumentPage = await res.json();
+        all.push(...data.results);
+        cursor = data.next_cursor;
+      } while (cursor);
+      setFiles(all.map(fileToUnified));
     } catch { /* ignore */ }
   }, []);
 
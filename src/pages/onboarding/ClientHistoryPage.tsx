@@ -63,13 +63,20 @@ export default function ClientHistoryPage() {
 
   const loadClientHistory = async () => {
     try {
-      const response = await secureFetch("/api/v5/clients/history/");
-      if (response.ok) {
-        const data = await response.json();
-        setClients(data.clients || []);
-      } else {
-        toast.error("Failed to load client history");
-      }
+      const all: Client[] = [];
+      let cursor: string | null = null;
+      do {
+        const query = cursor ? `&cursor=${encodeURIComponent(cursor)}` : "";
+        const response = await secureFetch(`/api/v5/clients/history/?limit=100${query}`);
+        if (!response.ok) {
+          toast.error("Failed to load client history");
+          return;
+        }
+        const data: { clients: Client[]; next_cursor: string | null } = await response.json();
+        all.push(...(data.clients || []));
+        cursor = data.next_cursor;
+      } while (cursor);
+      setClients(all);
     } catch (error) {
       console.error("Error loading client history:", error);
       toast.error("Something went wrong");
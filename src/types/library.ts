@@ -34,6 +34,15 @@ export interface LibraryDocument {
   updated_at: string;
 }
 
+/** A row of GET /api/v6/documents/, which leaves out what the grid doesn't show. */
+export type LibraryDocumentListItem = Omit<LibraryDocument, "creator" | "is_deleted" | "deleted_at">;
+
+export interface DocumentPage {
+  results: LibraryDocumentListItem[];
+  has_more: boolean;
+  next_cursor: string | null;
+}
+
 export interface DocumentVersion {
   id: string;
   document: string;